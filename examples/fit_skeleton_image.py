@@ -1,12 +1,10 @@
 """Example of fitting a skeleton graph to a skeleton image."""
 
-from itertools import cycle
-
 import napari
-import numpy as np
 
 from skeleplex.data import big_t
 from skeleplex.graph import SkeletonGraph
+from skeleplex.visualize import EdgePolylines
 
 # load an example skeleton image
 skeleton_image = big_t()
@@ -22,20 +20,13 @@ viewer = napari.view_image(skeleton_image)
 viewer.add_points(node_coordinates)
 
 # draw the edge splines
-sample_points = np.linspace(0, 1, 5, endpoint=True)
-colors = cycle(["magenta", "green", "blue", "yellow", "purple"])
-for edge_key, edge_spline in skeleton_graph.edge_splines.items():
-    # get points along the edge spline
-    edge_points = edge_spline.eval(sample_points)
-
-    # add a shapes layer for the edge
-    viewer.add_shapes(
-        edge_points,
-        shape_type="path",
-        edge_color=next(colors),
-        edge_width=0.2,
-        name=f"edge {edge_key}",
-    )
+# all edges are drawn in a single layer from precomputed polylines
+edge_polylines = EdgePolylines(skeleton_graph)
+viewer.add_shapes(
+    **edge_polylines.shapes_data(level=0),
+    edge_width=0.2,
+    name="edges",
+)
 
 viewer.dims.ndisplay = 3
 
@@ -0,0 +1,180 @@
+"""Run skeleplex from asyncio code without blocking the event loop.
+
+The CPU-bound work is run in a thread or process pool and the number of
+jobs submitted to the pool is bounded, so many requests can share a pool
+without oversubscribing the cores. File reads and writes are run with
+asyncio.to_thread, so they never wait behind the CPU-bound jobs.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+from skeleplex.graph.spline import B3Spline
+
+
+class AsyncExecutor:
+    """Run blocking skeleplex functions from asyncio code.
+
+    Cancelling a task that awaits a job cancels the job if it has not
+    started yet. Jobs that are already running cannot be interrupted and
+    keep their slot of the concurrency limit until they finish.
+
+    Parameters
+    ----------
+    executor : Executor | None
+        The pool to run the CPU-bound work in. With a
+        ProcessPoolExecutor, the arguments and results are pickled, so
+        volumes must be arrays rather than open files. If None, a
+        ThreadPoolExecutor with max_concurrency workers is created and
+        shut down by close(). Default value is None.
+    max_concurrency : int
+        The maximum number of jobs submitted to the pool at the same time.
+        Further jobs wait in the event loop. Default value is 4.
+    """
+
+    def __init__(self, executor: Executor | None = None, max_concurrency: int = 4):
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """Run a function in the pool and return its result.
+
+        Parameters
+        ----------
+        function : Callable
+            The function to run. It must be picklable when
+            a process pool is used.
+        *args
+            The positional arguments of the function.
+        **kwargs
+            The keyword arguments of the function.
+
+        Returns
+        -------
+        Any
+            The return value of the function.
+        """
+        loop = asyncio.get_running_loop()
+        await self._semaphore.acquire()
+        try:
+            job = self.executor.submit(partial(function, *args, **kwargs))
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        def release_slot(_):
+            # the job finishes in a worker, so release from the event loop
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                # the event loop has been closed
+                pass
+
+        job.add_done_callback(release_slot)
+        return await asyncio.wrap_future(job)
+
+    async def from_skeleton_image(
+        self, skeleton_image: np.ndarray, **kwargs
+    ) -> SkeletonGraph:
+        """Return a SkeletonGraph from a skeleton image.
+
+        Parameters
+        ----------
+        skeleton_image : np.ndarray
+            The skeleton image to convert to a graph.
+        **kwargs
+            The options of SkeletonGraph.from_skeleton_image.
+
+        Returns
+        -------
+        SkeletonGraph
+            The skeleton graph.
+        """
+        return await self.run(
+            SkeletonGraph.from_skeleton_image, skeleton_image, **kwargs
+        )
+
+    async def from_json_file(self, file_path: str) -> SkeletonGraph:
+        """Return a SkeletonGraph from a JSON file.
+
+        The file is read in a thread and decoded in the pool.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file to read.
+
+        Returns
+        -------
+        SkeletonGraph
+            The skeleton graph.
+        """
+        json_string = await asyncio.to_thread(Path(file_path).read_text)
+        return await self.run(SkeletonGraph.from_json, json_string)
+
+    async def to_json_file(
+        self, skeleton_graph: SkeletonGraph, file_path: str, compact: bool = False
+    ) -> None:
+        """Write a JSON representation of a graph.
+
+        The graph is encoded in the pool and the file is written in a thread.
+
+        Parameters
+        ----------
+        skeleton_graph : SkeletonGraph
+            The graph to write.
+        file_path : str
+            The path to the file to write.
+        compact : bool
+            If True, write the graph in the compact JSON format.
+            Default value is False.
+        """
+        json_string = await self.run(skeleton_graph.to_json, compact=compact)
+        await asyncio.to_thread(Path(file_path).write_text, json_string)
+
+    async def sample_volume_2d(
+        self, spline: B3Spline, volume: np.ndarray, positions: np.ndarray, **kwargs
+    ) -> np.ndarray:
+        """Sample a 3D image with 2D planes normal to a spline.
+
+        Parameters
+        ----------
+        spline : B3Spline
+            The spline to sample along.
+        volume : np.ndarray
+            3D image to sample.
+        positions : np.ndarray
+            (n,) array of positions to sample at.
+            The positions are normalized to the range [0, 1].
+        **kwargs
+            The options of B3Spline.sample_volume_2d.
+
+        Returns
+        -------
+        np.ndarray
+            The sampled planes.
+        """
+        return await self.run(spline.sample_volume_2d, volume, positions, **kwargs)
+
+    def close(self) -> None:
+        """Shut down the pool if it was created by this executor."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncExecutor":
+        """Return the executor for use as an async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Shut down the pool without blocking the event loop."""
+        await asyncio.to_thread(self.close)
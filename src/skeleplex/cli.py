@@ -0,0 +1,418 @@
+"""Command line interface for skeleplex."""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+logger = logging.getLogger(__name__)
+
+# file extensions of the skeleton images that can be converted
+NUMPY_EXTENSIONS = (".npy",)
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+
+_MEMORY_UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_memory_size(memory_size: str) -> int:
+    """Parse a memory size such as "512M" or "4G" to bytes.
+
+    Parameters
+    ----------
+    memory_size : str
+        The memory size. A number without a unit is interpreted as bytes.
+
+    Returns
+    -------
+    int
+        The memory size in bytes.
+    """
+    memory_size = memory_size.strip().upper().removesuffix("B")
+    if memory_size and memory_size[-1] in _MEMORY_UNITS:
+        return int(float(memory_size[:-1]) * _MEMORY_UNITS[memory_size[-1]])
+    return int(memory_size)
+
+
+def find_skeleton_files(inputs: list[str]) -> list[Path]:
+    """Return the skeleton image files from a list of files and directories.
+
+    Directories are searched (non-recursively) for numpy and HDF5 files.
+
+    Parameters
+    ----------
+    inputs : list[str]
+        The paths to the files and directories.
+
+    Returns
+    -------
+    list[Path]
+        The paths to the skeleton image files.
+    """
+    extensions = NUMPY_EXTENSIONS + HDF5_EXTENSIONS
+    file_paths = []
+    for input_path in map(Path, inputs):
+        if input_path.is_dir():
+            file_paths.extend(
+                sorted(
+                    path
+                    for path in input_path.iterdir()
+                    if path.suffix.lower() in extensions
+                )
+            )
+        else:
+            file_paths.append(input_path)
+    return file_paths
+
+
+def load_skeleton_image(file_path: Path, dataset: str | None = None) -> np.ndarray:
+    """Load a skeleton image from a numpy or HDF5 file.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the file.
+    dataset : str | None
+        The name of the dataset in HDF5 files. If None, the file must
+        contain exactly one dataset. Default value is None.
+
+    Returns
+    -------
+    np.ndarray
+        The skeleton image.
+    """
+    if file_path.suffix.lower() in NUMPY_EXTENSIONS:
+        return np.load(file_path)
+    elif file_path.suffix.lower() in HDF5_EXTENSIONS:
+        with h5py.File(file_path, "r") as file:
+            if dataset is None:
+                dataset_names = []
+
+                def _collect_dataset(name, item):
+                    if isinstance(item, h5py.Dataset):
+                        dataset_names.append(name)
+
+                file.visititems(_collect_dataset)
+                if len(dataset_names) != 1:
+                    raise ValueError(
+                        f"{file_path} contains {len(dataset_names)} datasets. "
+                        "Specify the dataset to convert."
+                    )
+                dataset = dataset_names[0]
+            return file[dataset][()]
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def _limit_memory(memory_limit: int | None) -> None:
+    """Limit the address space of the current worker process."""
+    if memory_limit is None:
+        return
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Memory limits are not supported on this platform.")
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except (ValueError, OverflowError, OSError) as error:
+        # e.g. the limit is above the hard limit of the process
+        logger.warning(f"Failed to limit the memory to {memory_limit} bytes: {error}")
+
+
+def convert_skeleton_file(
+    input_path: Path,
+    output_path: Path,
+    max_spline_knots: int = 10,
+    dataset: str | None = None,
+    compact: bool = False,
+) -> dict:
+    """Convert a skeleton image file to a SkeletonGraph file.
+
+    The graph is written to a temporary file in the output directory
+    which is then renamed, so an output file is either complete or absent.
+
+    Parameters
+    ----------
+    input_path : Path
+        The path to the skeleton image file.
+    output_path : Path
+        The path to write the SkeletonGraph JSON file to.
+    max_spline_knots : int
+        The maximum number of knots to use for the spline fits.
+        Default value is 10.
+    dataset : str | None
+        The name of the dataset in HDF5 files. Default value is None.
+    compact : bool
+        If True, write the graph in the compact JSON format.
+        Default value is False.
+
+    Returns
+    -------
+    dict
+        The timing of the conversion steps in seconds.
+    """
+    start_time = time.perf_counter()
+    skeleton_image = load_skeleton_image(input_path, dataset=dataset)
+    load_time = time.perf_counter()
+
+    skeleton_graph = SkeletonGraph.from_skeleton_image(
+        skeleton_image, max_spline_knots=max_spline_knots
+    )
+    convert_time = time.perf_counter()
+
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        skeleton_graph.to_json_file(temporary_path, compact=compact)
+        os.replace(temporary_path, output_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    write_time = time.perf_counter()
+
+    return {
+        "n_nodes": skeleton_graph.graph.number_of_nodes(),
+        "n_edges": skeleton_graph.graph.number_of_edges(),
+        "load_seconds": load_time - start_time,
+        "convert_seconds": convert_time - load_time,
+        "write_seconds": write_time - convert_time,
+        "total_seconds": write_time - start_time,
+    }
+
+
+def convert_skeleton_files(
+    input_paths: list[Path],
+    output_directory: Path,
+    max_spline_knots: int = 10,
+    dataset: str | None = None,
+    n_workers: int = 1,
+    memory_limit: int | None = None,
+    overwrite: bool = False,
+    compact: bool = False,
+) -> list[dict]:
+    """Convert skeleton image files to SkeletonGraph files in parallel.
+
+    Parameters
+    ----------
+    input_paths : list[Path]
+        The paths to the skeleton image files.
+    output_directory : Path
+        The directory to write the SkeletonGraph JSON files to.
+        The output file has the name of the input file with a .json suffix.
+        Input files that would have the same output file are rejected.
+    max_spline_knots : int
+        The maximum number of knots to use for the spline fits.
+        Default value is 10.
+    dataset : str | None
+        The name of the dataset in HDF5 files. Default value is None.
+    n_workers : int
+        The number of worker processes. Default value is 1.
+    memory_limit : int | None
+        The maximum memory in bytes each worker process may allocate.
+        If None, the memory is not limited. Default value is None.
+    overwrite : bool
+        If True, convert files that already have an output file.
+        Otherwise, they are skipped. Default value is False.
+    compact : bool
+        If True, write the graphs in the compact JSON format.
+        Default value is False.
+
+    Returns
+    -------
+    list[dict]
+        The summary for each input file in the order of input_paths.
+
+    Raises
+    ------
+    ValueError
+        If several input files have the same output file.
+    """
+    output_paths = [
+        output_directory / f"{input_path.stem}.json" for input_path in input_paths
+    ]
+    inputs_by_output = {}
+    for input_path, output_path in zip(input_paths, output_paths, strict=True):
+        inputs_by_output.setdefault(output_path, []).append(str(input_path))
+    collisions = [
+        f"{', '.join(inputs)} -> {output_path}"
+        for output_path, inputs in inputs_by_output.items()
+        if len(inputs) > 1
+    ]
+    if len(collisions) > 0:
+        raise ValueError(
+            "Several input files have the same output file: " + "; ".join(collisions)
+        )
+
+    output_directory.mkdir(parents=True, exist_ok=True)
+    summaries = [
+        {"input": str(input_path), "output": "", "status": ""}
+        for input_path in input_paths
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_limit_memory, initargs=(memory_limit,)
+    ) as executor:
+        futures = {}
+        for index, (input_path, output_path) in enumerate(
+            zip(input_paths, output_paths, strict=True)
+        ):
+            summaries[index]["output"] = str(output_path)
+            if output_path.exists() and not overwrite:
+                summaries[index]["status"] = "skipped"
+                continue
+            future = executor.submit(
+                convert_skeleton_file,
+                input_path,
+                output_path,
+                max_spline_knots=max_spline_knots,
+                dataset=dataset,
+                compact=compact,
+            )
+            futures[future] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                summaries[index].update(future.result())
+                summaries[index]["status"] = "converted"
+            except Exception as error:
+                logger.error(f"Failed to convert {input_paths[index]}: {error!r}")
+                summaries[index]["status"] = f"failed: {error!r}"
+    return summaries
+
+
+def _print_summary(summaries: list[dict]) -> None:
+    """Print a table of the conversion timings."""
+    print(f"{'status':<10} {'total (s)':>10} {'edges':>8}  input")
+    for summary in summaries:
+        status = summary["status"].split(":")[0]
+        total_seconds = summary.get("total_seconds")
+        total = f"{total_seconds:.2f}" if total_seconds is not None else "-"
+        n_edges = summary.get("n_edges", "-")
+        print(f"{status:<10} {total:>10} {n_edges:>8}  {summary['input']}")
+
+
+def _write_summary(summaries: list[dict], file_path: str) -> None:
+    """Write the conversion summaries to a CSV file."""
+    field_names = [
+        "input",
+        "output",
+        "status",
+        "n_nodes",
+        "n_edges",
+        "load_seconds",
+        "convert_seconds",
+        "write_seconds",
+        "total_seconds",
+    ]
+    with open(file_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=field_names)
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog="skeleplex", description="Tools for analyzing skeletons."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert skeleton images to SkeletonGraph files."
+    )
+    convert_parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Skeleton image files (.npy, .h5, .hdf5) or directories containing them.",
+    )
+    convert_parser.add_argument(
+        "-o", "--output", required=True, help="Directory to write the graphs to."
+    )
+    convert_parser.add_argument(
+        "-j", "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    convert_parser.add_argument(
+        "--memory-limit",
+        type=parse_memory_size,
+        default=None,
+        help="Maximum memory per worker process (e.g., 4G).",
+    )
+    convert_parser.add_argument(
+        "--max-spline-knots",
+        type=int,
+        default=10,
+        help="Maximum number of knots for the spline fits.",
+    )
+    convert_parser.add_argument(
+        "--dataset", default=None, help="Name of the dataset in HDF5 files."
+    )
+    convert_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Convert files that already have an output file.",
+    )
+    convert_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write the graphs in the compact JSON format.",
+    )
+    convert_parser.add_argument(
+        "--summary", default=None, help="Path to write a CSV timing summary to."
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the skeleplex command line interface.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The command line arguments. If None, sys.argv is used.
+
+    Returns
+    -------
+    int
+        The exit code. This is 1 if any file failed to convert
+        and 2 if the inputs are invalid.
+    """
+    parser = _make_parser()
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == "convert":
+        try:
+            summaries = convert_skeleton_files(
+                find_skeleton_files(arguments.inputs),
+                output_directory=Path(arguments.output),
+                max_spline_knots=arguments.max_spline_knots,
+                dataset=arguments.dataset,
+                n_workers=arguments.workers,
+                memory_limit=arguments.memory_limit,
+                overwrite=arguments.overwrite,
+                compact=arguments.compact,
+            )
+        except ValueError as error:
+            print(f"{parser.prog}: error: {error}", file=sys.stderr)
+            return 2
+        _print_summary(summaries)
+        if arguments.summary is not None:
+            _write_summary(summaries, arguments.summary)
+        if any(summary["status"].startswith("failed") for summary in summaries):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
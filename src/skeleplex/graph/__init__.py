@@ -1,5 +1,13 @@
 """Tools to create a graph of a skeleton."""
 
+from skeleplex.graph.cache import SkeletonGraphCache
+from skeleplex.graph.shared import SharedSkeletonGraph
 from skeleplex.graph.skeleton_graph import SkeletonGraph
+from skeleplex.graph.volume import ChunkedVolumeReader
 
-__all__ = ["SkeletonGraph"]
+__all__ = [
+    "ChunkedVolumeReader",
+    "SharedSkeletonGraph",
+    "SkeletonGraph",
+    "SkeletonGraphCache",
+]
@@ -0,0 +1,156 @@
+"""Persistent on-disk cache for skeleton graphs."""
+
+import logging
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from skeleplex import __version__
+from skeleplex.graph.fingerprint import new_hasher, update_hash
+
+logger = logging.getLogger(__name__)
+
+
+def skeleton_image_cache_key(skeleton_image: np.ndarray, **parameters) -> str:
+    """Return the cache key for converting a skeleton image to a graph.
+
+    The key is a hash of the image content, the conversion parameters
+    and the skeleplex version.
+
+    Parameters
+    ----------
+    skeleton_image : np.ndarray
+        The skeleton image to be converted.
+    **parameters
+        The parameters of the conversion (e.g., max_spline_knots).
+
+    Returns
+    -------
+    str
+        The hexadecimal cache key.
+    """
+    hasher = new_hasher()
+    hasher.update(f"skeleplex:{__version__}".encode())
+    update_hash(hasher, np.asarray(skeleton_image))
+    update_hash(hasher, parameters)
+    return hasher.hexdigest()
+
+
+class SkeletonGraphCache:
+    """Size-bounded on-disk cache with least recently used eviction.
+
+    Each entry is stored as a single file in the cache directory.
+    The modification time of the files is used to track when an entry
+    was last used. When the total size of the cache exceeds the maximum
+    size, the least recently used entries are removed.
+
+    Parameters
+    ----------
+    directory : str | os.PathLike
+        The directory to store the cached files in.
+        The directory is created if it does not exist.
+    max_size : int
+        The maximum total size of the cached files in bytes.
+        Default value is 1 GB.
+    """
+
+    _suffix = ".json"
+
+    def __init__(self, directory: str | os.PathLike, max_size: int = 1_000_000_000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def _entry_path(self, key: str) -> Path:
+        """Return the path of the file for a cache key."""
+        return self.directory / f"{key}{self._suffix}"
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        """Return all cache entries with their file status."""
+        entries = []
+        for path in self.directory.glob(f"*{self._suffix}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                # the entry was removed by another process
+                continue
+        return entries
+
+    @property
+    def size(self) -> int:
+        """Return the total size of the cached files in bytes."""
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        """Check if an entry for the key is in the cache."""
+        return self._entry_path(key).exists()
+
+    def get(self, key: str) -> Path | None:
+        """Return the path to the cached file for a key.
+
+        Looking up an entry marks it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        Path | None
+            The path to the cached file or None if the key is not cached.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return entry_path
+
+    def put(self, key: str, write_function: Callable[[str], None]) -> None:
+        """Add an entry to the cache.
+
+        The entry is written to a temporary file that is then moved into
+        place, so concurrent readers never see a partially written entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        write_function : Callable[[str], None]
+            Function that writes the entry to the file path it is passed
+            (e.g., SkeletonGraph.to_json_file).
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        os.close(file_descriptor)
+        try:
+            write_function(temporary_path)
+            os.replace(temporary_path, self._entry_path(key))
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total_size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+                logger.info(f"Evicted {path.name} from the skeleton graph cache.")
+            except FileNotFoundError:
+                pass
+            total_size -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
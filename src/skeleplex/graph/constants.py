@@ -6,3 +6,20 @@ Generally, these are property or key names.
 NODE_COORDINATE_KEY = "node_coordinate"
 EDGE_SPLINE_KEY = "spline"
 EDGE_COORDINATES_KEY = "path"
+
+# radius measurements of the edges
+EDGE_RADIUS_KEY = "radius"
+EDGE_RADIUS_MEAN_KEY = "radius_mean"
+EDGE_RADIUS_MEDIAN_KEY = "radius_median"
+EDGE_RADIUS_MIN_KEY = "radius_min"
+EDGE_RADIUS_MAX_KEY = "radius_max"
+
+# tree metrics of the nodes and edges of a directed graph
+NODE_GENERATION_KEY = "generation"
+EDGE_GENERATION_KEY = "generation"
+NODE_STRAHLER_ORDER_KEY = "strahler_order"
+EDGE_STRAHLER_ORDER_KEY = "strahler_order"
+NODE_SUBTREE_SIZE_KEY = "subtree_size"
+EDGE_SUBTREE_SIZE_KEY = "subtree_size"
+NODE_PATH_LENGTH_KEY = "path_length"
+EDGE_PATH_LENGTH_KEY = "path_length"
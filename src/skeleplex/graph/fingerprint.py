@@ -0,0 +1,49 @@
+"""Utilities for computing content hashes of graph data."""
+
+import hashlib
+
+import numpy as np
+
+# number of bytes in each digest
+FINGERPRINT_DIGEST_SIZE = 16
+
+
+def new_hasher():
+    """Return a new hash object used for the fingerprints."""
+    return hashlib.blake2b(digest_size=FINGERPRINT_DIGEST_SIZE)
+
+
+def update_hash(hasher, value) -> None:
+    """Update a hash object with the content of a value.
+
+    Arrays are hashed from their raw buffer together with their
+    dtype and shape. Objects with a fingerprint method (e.g., B3Spline)
+    are hashed by their fingerprint. Sequences of numbers are hashed
+    as arrays so that values loaded from JSON match the original arrays.
+    All other values are hashed by their repr.
+
+    Parameters
+    ----------
+    hasher : hashlib._Hash
+        The hash object to update.
+    value : Any
+        The value to add to the hash.
+    """
+    if isinstance(value, (list, tuple)):
+        array_value = np.asarray(value)
+        if array_value.dtype.kind in "biuf":
+            value = array_value
+
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        hasher.update(f"ndarray:{array.dtype.str}:{array.shape}".encode())
+        hasher.update(array.data)
+    elif hasattr(value, "fingerprint"):
+        hasher.update(f"{type(value).__name__}:{value.fingerprint()}".encode())
+    elif isinstance(value, dict):
+        hasher.update(b"dict")
+        for key in sorted(value, key=repr):
+            hasher.update(repr(key).encode())
+            update_hash(hasher, value[key])
+    else:
+        hasher.update(repr(value).encode())
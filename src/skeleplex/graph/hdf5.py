@@ -0,0 +1,243 @@
+"""Read and write skeleton graphs as HDF5 files with a spatial index.
+
+The graph is stored in the packed representation (see skeleplex.graph.packed).
+The nodes and edges are sorted along a Z-order curve and grouped into blocks
+of consecutive rows. The bounding box of every block is stored, so a region
+of the graph can be loaded by reading only the blocks that intersect it.
+"""
+
+import json
+
+import h5py
+import networkx as nx
+import numpy as np
+
+from skeleplex.graph.packed import (
+    EDGE_ARRAY_NAMES,
+    NODE_ARRAY_NAMES,
+    edge_bounding_boxes,
+    morton_order,
+    pack_skeleton_graph,
+    take_edges,
+    take_nodes,
+    unpack_skeleton_graph,
+)
+
+# version of the HDF5 layout
+HDF5_FORMAT_VERSION = 1
+
+# (values, offsets) names of the ragged arrays
+_NODE_RAGGED_ARRAYS = (("node_attributes", "node_attribute_offsets"),)
+_EDGE_RAGGED_ARRAYS = (
+    ("path_coordinates", "path_offsets"),
+    ("control_points", "control_point_offsets"),
+    ("edge_attributes", "edge_attribute_offsets"),
+)
+
+
+def _block_bounding_boxes(bounding_boxes: np.ndarray, block_size: int) -> np.ndarray:
+    """Compute the bounding box of each block of consecutive rows."""
+    if len(bounding_boxes) == 0:
+        return np.zeros((0, *bounding_boxes.shape[1:]))
+    block_starts = np.arange(0, len(bounding_boxes), block_size)
+    lower = np.minimum.reduceat(bounding_boxes[:, 0], block_starts, axis=0)
+    upper = np.maximum.reduceat(bounding_boxes[:, 1], block_starts, axis=0)
+    return np.stack([lower, upper], axis=1)
+
+
+def _intersects(bounding_boxes: np.ndarray, bbox: np.ndarray) -> np.ndarray:
+    """Return a mask of the bounding boxes that intersect bbox."""
+    return np.all(
+        (bounding_boxes[:, 0] <= bbox[1]) & (bounding_boxes[:, 1] >= bbox[0]), axis=1
+    )
+
+
+def _contiguous_runs(rows: np.ndarray) -> list[tuple[int, int]]:
+    """Split sorted rows into (start, stop) ranges of consecutive rows."""
+    if len(rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    starts = rows[np.concatenate([[0], breaks])]
+    stops = rows[np.concatenate([breaks - 1, [len(rows) - 1]])] + 1
+    return list(zip(starts.tolist(), stops.tolist(), strict=True))
+
+
+def _read_rows(dataset: h5py.Dataset, runs: list[tuple[int, int]]) -> np.ndarray:
+    """Read the rows of a dataset given as ranges of consecutive rows."""
+    if len(runs) == 0:
+        return np.zeros((0, *dataset.shape[1:]), dtype=dataset.dtype)
+    return np.concatenate([dataset[start:stop] for start, stop in runs])
+
+
+def _read_ragged_rows(
+    values: h5py.Dataset, offsets: h5py.Dataset, runs: list[tuple[int, int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Read the elements of a ragged array given as ranges of consecutive rows."""
+    value_chunks = [np.zeros((0, *values.shape[1:]), dtype=values.dtype)]
+    lengths = [np.zeros(0, dtype=np.int64)]
+    for start, stop in runs:
+        run_offsets = offsets[start : stop + 1]
+        value_chunks.append(values[run_offsets[0] : run_offsets[-1]])
+        lengths.append(np.diff(run_offsets))
+    new_offsets = np.concatenate([[0], np.cumsum(np.concatenate(lengths))])
+    return np.concatenate(value_chunks), new_offsets.astype(np.int64)
+
+
+def write_skeleton_graph_hdf5(
+    graph: nx.Graph, file_path: str, block_size: int = 1024
+) -> None:
+    """Write a skeleton graph to an HDF5 file with a spatial index.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The skeleton graph to write. The nodes must be integers.
+    file_path : str
+        The path to the file to write.
+    block_size : int
+        The number of nodes and edges per block of the spatial index.
+        Smaller blocks allow reading smaller regions more precisely
+        at the cost of a larger index. Default value is 1024.
+    """
+    metadata, arrays = pack_skeleton_graph(graph)
+
+    # sort the nodes and edges so that nearby elements are in the same block
+    bounding_boxes = edge_bounding_boxes(arrays)
+    edge_order = morton_order(bounding_boxes.mean(axis=1))
+    arrays = take_edges(arrays, edge_order)
+    bounding_boxes = bounding_boxes[edge_order]
+    arrays = take_nodes(arrays, morton_order(arrays["node_coordinates"]))
+
+    node_coordinates = arrays["node_coordinates"].astype(np.float64)
+    node_bounding_boxes = np.stack([node_coordinates, node_coordinates], axis=1)
+
+    with h5py.File(file_path, "w") as file:
+        file.attrs["format_version"] = HDF5_FORMAT_VERSION
+        file.attrs["metadata"] = json.dumps(metadata)
+        file.attrs["block_size"] = block_size
+        for name, array in arrays.items():
+            file.create_dataset(name, data=array)
+        file.create_dataset("edge_bounding_boxes", data=bounding_boxes)
+        file.create_dataset(
+            "edge_block_bounding_boxes",
+            data=_block_bounding_boxes(bounding_boxes, block_size),
+        )
+        file.create_dataset(
+            "node_block_bounding_boxes",
+            data=_block_bounding_boxes(node_bounding_boxes, block_size),
+        )
+
+
+def _select_rows(
+    block_bounding_boxes: np.ndarray,
+    row_bounding_boxes: h5py.Dataset,
+    bbox: np.ndarray,
+    block_size: int,
+) -> np.ndarray:
+    """Return the rows whose bounding box intersects bbox.
+
+    Only the row bounding boxes in the intersecting blocks are read.
+    """
+    n_rows = len(row_bounding_boxes)
+    selected_rows = [np.zeros(0, dtype=np.int64)]
+    for block in np.flatnonzero(_intersects(block_bounding_boxes, bbox)).tolist():
+        start = block * block_size
+        stop = min(start + block_size, n_rows)
+        block_mask = _intersects(row_bounding_boxes[start:stop], bbox)
+        selected_rows.append(start + np.flatnonzero(block_mask))
+    return np.concatenate(selected_rows)
+
+
+def read_skeleton_graph_hdf5(
+    file_path: str, bbox: np.ndarray | None = None
+) -> nx.Graph:
+    """Read a skeleton graph from an HDF5 file written by write_skeleton_graph_hdf5.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file to read.
+    bbox : np.ndarray | None
+        (2, d) array of the lower and upper corners of the region to read.
+        All edges whose bounding box intersects the region are read
+        together with their nodes, as well as all nodes inside the region.
+        If None, the whole graph is read. Default value is None.
+
+    Returns
+    -------
+    nx.Graph
+        The skeleton graph.
+    """
+    with h5py.File(file_path, "r") as file:
+        metadata = json.loads(file.attrs["metadata"])
+        if bbox is None:
+            arrays = {
+                name: file[name][()] for name in NODE_ARRAY_NAMES + EDGE_ARRAY_NAMES
+            }
+            return unpack_skeleton_graph(metadata, arrays)
+
+        bbox = np.asarray(bbox, dtype=np.float64)
+        block_size = int(file.attrs["block_size"])
+
+        # read the edges in the region
+        edge_rows = _select_rows(
+            file["edge_block_bounding_boxes"][()],
+            file["edge_bounding_boxes"],
+            bbox,
+            block_size,
+        )
+        edge_runs = _contiguous_runs(edge_rows)
+        arrays = {
+            name: _read_rows(file[name], edge_runs)
+            for name in (
+                "edge_start_rows",
+                "edge_end_rows",
+                "edge_keys",
+                "spline_n_knots",
+                "spline_closed",
+            )
+        }
+        for values_name, offsets_name in _EDGE_RAGGED_ARRAYS:
+            arrays[values_name], arrays[offsets_name] = _read_ragged_rows(
+                file[values_name], file[offsets_name], edge_runs
+            )
+
+        # read the nodes in the region and the nodes of the edges
+        node_coordinates = file["node_coordinates"]
+        node_rows = _select_rows(
+            file["node_block_bounding_boxes"][()],
+            _PointBoundingBoxes(node_coordinates),
+            bbox,
+            block_size,
+        )
+        node_rows = np.unique(
+            np.concatenate(
+                [node_rows, arrays["edge_start_rows"], arrays["edge_end_rows"]]
+            )
+        )
+        node_runs = _contiguous_runs(node_rows)
+        arrays["node_ids"] = _read_rows(file["node_ids"], node_runs)
+        arrays["node_coordinates"] = _read_rows(node_coordinates, node_runs)
+        for values_name, offsets_name in _NODE_RAGGED_ARRAYS:
+            arrays[values_name], arrays[offsets_name] = _read_ragged_rows(
+                file[values_name], file[offsets_name], node_runs
+            )
+
+    # renumber the edge nodes to the rows that were read
+    arrays["edge_start_rows"] = np.searchsorted(node_rows, arrays["edge_start_rows"])
+    arrays["edge_end_rows"] = np.searchsorted(node_rows, arrays["edge_end_rows"])
+    return unpack_skeleton_graph(metadata, arrays)
+
+
+class _PointBoundingBoxes:
+    """View the rows of a point dataset as degenerate bounding boxes."""
+
+    def __init__(self, points: h5py.Dataset):
+        self._points = points
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        points = self._points[rows].astype(np.float64)
+        return np.stack([points, points], axis=1)
@@ -2,15 +2,66 @@
 
 import networkx as nx
 import numpy as np
+from numpy.typing import DTypeLike
 from skan.csr import Skeleton as SkanSkeleton
 from skan.csr import summarize
 
-from skeleplex.graph.constants import NODE_COORDINATE_KEY
-from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.simplify import simplify_graph
+from skeleplex.graph.spline import fit_b3_splines
+from skeleplex.graph.trace import trace_skeleton, unique_coordinates
+
+
+def fit_edge_splines(
+    graph: nx.Graph,
+    max_spline_knots: int = 10,
+    dtype: DTypeLike = np.float64,
+) -> nx.Graph:
+    """Fit a spline to the path of each edge in a graph.
+
+    The splines are stored under EDGE_SPLINE_KEY.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The graph. Each edge must have a path stored under
+        EDGE_COORDINATES_KEY. The graph is modified in place.
+    max_spline_knots : int
+        The maximum number of knots to use for the spline fit to the branch path.
+        If the number of data points in the branch is less than this number,
+        the spline will use n_data_points - 1 knots.
+    dtype : DTypeLike
+        The floating point type of the spline control points.
+        Default value is np.float64.
+
+    Returns
+    -------
+    nx.Graph
+        The graph with the splines added.
+    """
+    edge_data_list = [edge_data for *_, edge_data in graph.edges(data=True)]
+    spline_paths = [edge_data[EDGE_COORDINATES_KEY] for edge_data in edge_data_list]
+    # todo: reconsider how the number of knots is set
+    n_spline_knots = [
+        n_points - 1 if n_points <= max_spline_knots else max_spline_knots
+        for n_points in map(len, spline_paths)
+    ]
+    splines = fit_b3_splines(spline_paths, n_knots=n_spline_knots, dtype=dtype)
+    for edge_data, spline in zip(edge_data_list, splines, strict=True):
+        edge_data[EDGE_SPLINE_KEY] = spline
+    return graph
 
 
 def image_to_graph_skan(
-    skeleton_image: np.ndarray, max_spline_knots: int = 10
+    skeleton_image: np.ndarray,
+    max_spline_knots: int = 10,
+    dtype: DTypeLike = np.float64,
+    min_spur_length: float | None = None,
+    merge_degree_2_nodes: bool = False,
 ) -> nx.MultiGraph:
     """Convert a skeleton image to a graph using skan.
 
@@ -24,17 +75,21 @@ def image_to_graph_skan(
         If the number of data points in the branch is less than this number,
         the spline will use n_data_points - 1 knots.
         See the splinebox Spline class docs for more information.
+    dtype : DTypeLike
+        The floating point type of the node coordinates, edge paths
+        and spline control points. Default value is np.float64.
+    min_spur_length : float | None
+        Terminal branches shorter than this length are removed before
+        the splines are fit. If None, no branches are removed.
+        Default value is None.
+    merge_degree_2_nodes : bool
+        If True, the branches connected by nodes with degree 2 are merged
+        into a single edge before the splines are fit. Default value is False.
     """
     # make the skeleton
     skeleton = SkanSkeleton(skeleton_image=skeleton_image)
     summary_table = summarize(skeleton, separator="_")
 
-    # get all of the nodes
-    # this might be slow - may need to speed up
-    # source_nodes = set(summary_table["node_id_src"])
-    # destination_nodes = set(summary_table["node_id_dst"])
-    # all_nodes = source_nodes.union(destination_nodes)
-
     skeleton_graph = nx.MultiGraph()
     for row in summary_table.itertuples(name="Edge"):
         # Iterate over the rows in the table.
@@ -43,32 +98,179 @@ def image_to_graph_skan(
         i = row.node_id_src
         j = row.node_id_dst
 
-        # fit a spline to the path
-        # todo: factor our to spline module
-        # todo: reconsider how the number of knots is set
-        spline_path = skeleton.path_coordinates(index)
-        n_points = len(spline_path)
-        if n_points <= max_spline_knots:
-            n_spline_knots = n_points - 1
-        else:
-            n_spline_knots = max_spline_knots
-        spline = B3Spline.from_points(
-            points=spline_path,
-            n_knots=n_spline_knots,
-        )
         # Nodes are added if they don't exist so only need to add edges
         skeleton_graph.add_edge(
             i,
             j,
-            **{"path": spline_path, "spline": spline},
+            **{EDGE_COORDINATES_KEY: skeleton.path_coordinates(index).astype(dtype)},
         )
 
     # add the node coordinates
-    new_node_data = {}
-    for node_index, node_data in skeleton_graph.nodes(data=True):
-        node_data[NODE_COORDINATE_KEY] = np.asarray(skeleton.coordinates[node_index])
-        new_node_data[node_index] = node_data
+    node_coordinates = {
+        node_index: np.asarray(skeleton.coordinates[node_index], dtype=dtype)
+        for node_index in skeleton_graph.nodes
+    }
+    nx.set_node_attributes(skeleton_graph, node_coordinates, NODE_COORDINATE_KEY)
 
-    nx.set_node_attributes(skeleton_graph, new_node_data)
+    return _simplify_and_fit(
+        skeleton_graph,
+        max_spline_knots=max_spline_knots,
+        dtype=dtype,
+        min_spur_length=min_spur_length,
+        merge_degree_2_nodes=merge_degree_2_nodes,
+    )
 
-    return skeleton_graph
+
+def _simplify_and_fit(
+    skeleton_graph: nx.MultiGraph,
+    max_spline_knots: int,
+    dtype: DTypeLike,
+    min_spur_length: float | None,
+    merge_degree_2_nodes: bool,
+) -> nx.MultiGraph:
+    """Simplify a traced path graph and fit the edge splines."""
+    # remove spurious branches before fitting the splines
+    simplify_graph(
+        skeleton_graph,
+        min_spur_length=min_spur_length,
+        merge_degree_2=merge_degree_2_nodes,
+    )
+
+    return fit_edge_splines(
+        skeleton_graph, max_spline_knots=max_spline_knots, dtype=dtype
+    )
+
+
+def _sparse_to_coordinates(skeleton) -> np.ndarray:
+    """Return the (n_voxels, 3) coordinates of a sparse skeleton.
+
+    Sparse COO arrays (for example from the sparse package or
+    scipy.sparse.coo_array) are converted using their nonzero entries.
+    Anything else is interpreted as an array of coordinates.
+    """
+    if not hasattr(skeleton, "coords"):
+        return np.asarray(skeleton)
+    coords = skeleton.coords
+    if isinstance(coords, tuple):
+        # scipy.sparse.coo_array stores a tuple of index arrays
+        coordinates = np.stack(coords, axis=1)
+    else:
+        # sparse.COO stores an (ndim, nnz) array
+        coordinates = np.asarray(coords).T
+    data = getattr(skeleton, "data", None)
+    if data is not None:
+        coordinates = coordinates[np.asarray(data) != 0]
+    return coordinates
+
+
+def coordinates_to_graph(
+    skeleton_coordinates,
+    max_spline_knots: int = 10,
+    dtype: DTypeLike = np.float64,
+    min_spur_length: float | None = None,
+    merge_degree_2_nodes: bool = False,
+) -> nx.MultiGraph:
+    """Convert the voxel coordinates of a skeleton to a graph.
+
+    The branches are traced directly from the coordinates, so no dense
+    image is allocated and the memory scales with the number of skeleton
+    voxels. Adjacent junction voxels are merged into a single node
+    placed at the junction voxel closest to their centroid.
+
+    Parameters
+    ----------
+    skeleton_coordinates : np.ndarray
+        (n_voxels, 3) array of the integer coordinates of the skeleton
+        voxels or a sparse COO array of the skeleton image.
+    max_spline_knots : int
+        The maximum number of knots to use for the spline fit to the branch path.
+        If the number of data points in the branch is less than this number,
+        the spline will use n_data_points - 1 knots.
+    dtype : DTypeLike
+        The floating point type of the node coordinates, edge paths
+        and spline control points. Default value is np.float64.
+    min_spur_length : float | None
+        Terminal branches shorter than this length are removed before
+        the splines are fit. If None, no branches are removed.
+        Default value is None.
+    merge_degree_2_nodes : bool
+        If True, the branches connected by nodes with degree 2 are merged
+        into a single edge before the splines are fit. Default value is False.
+    """
+    coordinates = unique_coordinates(_sparse_to_coordinates(skeleton_coordinates))
+    edge_nodes, path_offsets, path_voxels = trace_skeleton(coordinates)
+
+    skeleton_graph = nx.MultiGraph()
+    path_coordinates = coordinates[path_voxels].astype(dtype)
+    for (start_node, end_node), path_start, path_end in zip(
+        edge_nodes.tolist(),
+        path_offsets[:-1].tolist(),
+        path_offsets[1:].tolist(),
+        strict=True,
+    ):
+        skeleton_graph.add_edge(
+            start_node,
+            end_node,
+            **{EDGE_COORDINATES_KEY: path_coordinates[path_start:path_end]},
+        )
+
+    node_coordinates = {
+        node_index: coordinates[node_index].astype(dtype)
+        for node_index in skeleton_graph.nodes
+    }
+    nx.set_node_attributes(skeleton_graph, node_coordinates, NODE_COORDINATE_KEY)
+
+    return _simplify_and_fit(
+        skeleton_graph,
+        max_spline_knots=max_spline_knots,
+        dtype=dtype,
+        min_spur_length=min_spur_length,
+        merge_degree_2_nodes=merge_degree_2_nodes,
+    )
+
+
+def image_to_graph_numba(
+    skeleton_image: np.ndarray,
+    max_spline_knots: int = 10,
+    dtype: DTypeLike = np.float64,
+    min_spur_length: float | None = None,
+    merge_degree_2_nodes: bool = False,
+) -> nx.MultiGraph:
+    """Convert a skeleton image to a graph using the numba branch tracer.
+
+    This is a faster and leaner alternative to image_to_graph_skan.
+    The branches are traced from the coordinates of the skeleton voxels
+    (see coordinates_to_graph) without building the skan summary table.
+    Unlike skan, adjacent junction voxels are merged into a single node,
+    so the graphs of the two backends can differ around junctions.
+
+    Parameters
+    ----------
+    skeleton_image : np.ndarray
+        The image to convert to a skeleton graph.
+        The image should be a 3D binary image and already skeletonized.
+    max_spline_knots : int
+        The maximum number of knots to use for the spline fit to the branch path.
+        If the number of data points in the branch is less than this number,
+        the spline will use n_data_points - 1 knots.
+    dtype : DTypeLike
+        The floating point type of the node coordinates, edge paths
+        and spline control points. Default value is np.float64.
+    min_spur_length : float | None
+        Terminal branches shorter than this length are removed before
+        the splines are fit. If None, no branches are removed.
+        Default value is None.
+    merge_degree_2_nodes : bool
+        If True, the branches connected by nodes with degree 2 are merged
+        into a single edge before the splines are fit. Default value is False.
+    """
+    skeleton_image = np.asarray(skeleton_image)
+    if skeleton_image.ndim != 3:
+        raise ValueError("The numba backend only supports 3D skeleton images.")
+    return coordinates_to_graph(
+        np.argwhere(skeleton_image),
+        max_spline_knots=max_spline_knots,
+        dtype=dtype,
+        min_spur_length=min_spur_length,
+        merge_degree_2_nodes=merge_degree_2_nodes,
+    )
@@ -0,0 +1,266 @@
+"""Find corresponding nodes and edges between two skeleton graphs.
+
+The nodes and densely sampled spline points of the target graph are put
+in k-d trees, so each reference node and spline sample is matched with a
+nearest-neighbour query. The cost is O(n log n) in the number of nodes
+and samples instead of comparing all pairs.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import networkx as nx
+import numpy as np
+from scipy.spatial import cKDTree
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY, NODE_COORDINATE_KEY
+from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.voxelize import sample_splines_densely
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+NODE_MATCH_DTYPE = np.dtype(
+    [
+        ("reference_node", np.int64),
+        ("target_node", np.int64),
+        ("distance", np.float64),
+    ]
+)
+
+EDGE_MATCH_DTYPE = np.dtype(
+    [
+        ("reference_start_node", np.int64),
+        ("reference_end_node", np.int64),
+        ("reference_key", np.int64),
+        ("target_start_node", np.int64),
+        ("target_end_node", np.int64),
+        ("target_key", np.int64),
+        ("overlap", np.float64),
+        ("matched_overlap", np.float64),
+        ("mean_distance", np.float64),
+    ]
+)
+
+
+def _graph_edges(graph: nx.Graph) -> list[tuple]:
+    """Return the (u, v, key, data) tuples of the edges of a graph."""
+    if graph.is_multigraph():
+        return list(graph.edges(keys=True, data=True))
+    return [(u, v, 0, data) for u, v, data in graph.edges(data=True)]
+
+
+def _sample_weights(points: np.ndarray, spline_indices: np.ndarray) -> np.ndarray:
+    """Return the arc length represented by each spline sample.
+
+    The samples of each spline are consecutive, so each sample gets half
+    of the distance to its neighbours on the same spline.
+    """
+    weights = np.zeros(len(points))
+    if len(points) < 2:
+        return weights
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    steps[spline_indices[1:] != spline_indices[:-1]] = 0
+    weights[1:] += steps / 2
+    weights[:-1] += steps / 2
+    return weights
+
+
+def _match_edge_batch(
+    splines: list[B3Spline],
+    target_tree: cKDTree,
+    target_sample_edges: np.ndarray,
+    n_target_edges: int,
+    max_distance: float,
+    sample_spacing: float,
+) -> dict[str, np.ndarray]:
+    """Match a batch of reference splines to the target edges."""
+    n_splines = len(splines)
+    points, spline_indices = sample_splines_densely(splines, max_spacing=sample_spacing)
+    weights = _sample_weights(points, spline_indices)
+    distances, nearest_samples = target_tree.query(
+        points, distance_upper_bound=max_distance
+    )
+    is_matched = np.isfinite(distances)
+    matched_splines = spline_indices[is_matched]
+    matched_weights = weights[is_matched]
+
+    total_weights = np.bincount(spline_indices, weights=weights, minlength=n_splines)
+    overlap_weights = np.bincount(
+        matched_splines, weights=matched_weights, minlength=n_splines
+    )
+    distance_sums = np.bincount(
+        matched_splines,
+        weights=matched_weights * distances[is_matched],
+        minlength=n_splines,
+    )
+
+    # the matched target edge is the one closest to the most arc length
+    pair_keys = (
+        matched_splines * n_target_edges
+        + target_sample_edges[nearest_samples[is_matched]]
+    )
+    unique_pairs, pair_index = np.unique(pair_keys, return_inverse=True)
+    pair_weights = np.bincount(pair_index, weights=matched_weights)
+    pair_splines = unique_pairs // n_target_edges
+    best_pairs = np.lexsort((-pair_weights, pair_splines))
+    first_of_spline = np.ones(len(best_pairs), dtype=bool)
+    first_of_spline[1:] = pair_splines[best_pairs[1:]] != pair_splines[best_pairs[:-1]]
+    best_pairs = best_pairs[first_of_spline]
+
+    target_edges = np.full(n_splines, -1, dtype=np.int64)
+    target_edges[pair_splines[best_pairs]] = unique_pairs[best_pairs] % n_target_edges
+    matched_weights_of_best = np.zeros(n_splines)
+    matched_weights_of_best[pair_splines[best_pairs]] = pair_weights[best_pairs]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "target_edge": target_edges,
+            "overlap": overlap_weights / total_weights,
+            "matched_overlap": matched_weights_of_best / total_weights,
+            "mean_distance": np.where(
+                overlap_weights > 0, distance_sums / overlap_weights, np.nan
+            ),
+        }
+
+
+def match_skeleton_graphs(
+    reference: "SkeletonGraph",
+    target: "SkeletonGraph",
+    max_distance: float,
+    sample_spacing: float = 0.5,
+    batch_size: int = 4096,
+    n_workers: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the nodes and edges of a target graph matching a reference graph.
+
+    Each reference node is matched to the closest target node. Each reference
+    edge is sampled densely along its spline and every sample is matched to
+    the closest sample of the target splines. The reference edge is matched
+    to the target edge that is closest to the largest part of its arc length.
+    Matches are only made within max_distance. The matching is not symmetric;
+    swap the graphs to match the target graph to the reference graph.
+
+    Parameters
+    ----------
+    reference : SkeletonGraph
+        The graph whose nodes and edges are matched. The nodes must be
+        integers and all edges must have open splines.
+    target : SkeletonGraph
+        The graph to find the matches in. The nodes must be integers
+        and all edges must have open splines.
+    max_distance : float
+        The maximum distance between matched nodes and spline samples.
+    sample_spacing : float
+        The maximum distance between consecutive samples of the splines.
+        Default value is 0.5.
+    batch_size : int
+        The maximum number of reference edges processed together.
+        Default value is 4096.
+    n_workers : int
+        The number of threads used to process the batches of
+        reference edges. Default value is 1.
+
+    Returns
+    -------
+    node_matches : np.ndarray
+        Structured array with one row per reference node and the fields
+        of NODE_MATCH_DTYPE. Unmatched nodes have target_node -1 and
+        distance inf.
+    edge_matches : np.ndarray
+        Structured array with one row per reference edge and the fields
+        of EDGE_MATCH_DTYPE. overlap is the fraction of the arc length of
+        the reference edge within max_distance of any target edge and
+        matched_overlap the fraction closest to the matched target edge.
+        mean_distance is the mean distance of the overlapping arc length.
+        Unmatched edges have target nodes and key -1 and mean_distance nan.
+    """
+    # match the nodes
+    reference_nodes = list(reference.graph.nodes)
+    target_nodes = np.array(list(target.graph.nodes), dtype=np.int64)
+    node_matches = np.zeros(len(reference_nodes), dtype=NODE_MATCH_DTYPE)
+    node_matches["reference_node"] = reference_nodes
+    node_matches["target_node"] = -1
+    node_matches["distance"] = np.inf
+    if len(reference_nodes) > 0 and len(target_nodes) > 0:
+        target_node_tree = cKDTree(
+            [target.graph.nodes[node][NODE_COORDINATE_KEY] for node in target_nodes]
+        )
+        distances, nearest_nodes = target_node_tree.query(
+            [
+                reference.graph.nodes[node][NODE_COORDINATE_KEY]
+                for node in reference_nodes
+            ],
+            distance_upper_bound=max_distance,
+            workers=n_workers,
+        )
+        is_matched = np.isfinite(distances)
+        node_matches["target_node"][is_matched] = target_nodes[
+            nearest_nodes[is_matched]
+        ]
+        node_matches["distance"] = distances
+
+    # match the edges
+    reference_edges = _graph_edges(reference.graph)
+    target_edges = _graph_edges(target.graph)
+    edge_matches = np.zeros(len(reference_edges), dtype=EDGE_MATCH_DTYPE)
+    edge_matches["reference_start_node"] = [u for u, *_ in reference_edges]
+    edge_matches["reference_end_node"] = [v for _, v, *_ in reference_edges]
+    edge_matches["reference_key"] = [key for _, _, key, _ in reference_edges]
+    edge_matches["mean_distance"] = np.nan
+    for name in ("target_start_node", "target_end_node", "target_key"):
+        edge_matches[name] = -1
+    if len(reference_edges) == 0 or len(target_edges) == 0:
+        return node_matches, edge_matches
+
+    target_points, target_sample_edges = sample_splines_densely(
+        [edge_data[EDGE_SPLINE_KEY] for *_, edge_data in target_edges],
+        max_spacing=sample_spacing,
+    )
+    target_tree = cKDTree(target_points)
+    reference_splines = [
+        edge_data[EDGE_SPLINE_KEY] for *_, edge_data in reference_edges
+    ]
+    batches = [
+        reference_splines[batch_start : batch_start + batch_size]
+        for batch_start in range(0, len(reference_splines), batch_size)
+    ]
+
+    def match_batch(batch: list[B3Spline]) -> dict[str, np.ndarray]:
+        return _match_edge_batch(
+            batch,
+            target_tree=target_tree,
+            target_sample_edges=target_sample_edges,
+            n_target_edges=len(target_edges),
+            max_distance=max_distance,
+            sample_spacing=sample_spacing,
+        )
+
+    if n_workers > 1 and len(batches) > 1:
+        # the k-d tree queries release the GIL,
+        # so threads are sufficient to use multiple cores.
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(match_batch, batches))
+    else:
+        results = [match_batch(batch) for batch in batches]
+    matches = {
+        name: np.concatenate([result[name] for result in results])
+        for name in results[0]
+    }
+
+    is_matched = matches["target_edge"] >= 0
+    matched_target_edges = [
+        target_edges[index] for index in matches["target_edge"][is_matched].tolist()
+    ]
+    edge_matches["target_start_node"][is_matched] = [
+        u for u, *_ in matched_target_edges
+    ]
+    edge_matches["target_end_node"][is_matched] = [
+        v for _, v, *_ in matched_target_edges
+    ]
+    edge_matches["target_key"][is_matched] = [
+        key for _, _, key, _ in matched_target_edges
+    ]
+    for name in ("overlap", "matched_overlap", "mean_distance"):
+        edge_matches[name] = matches[name]
+    return node_matches, edge_matches
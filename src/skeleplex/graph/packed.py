@@ -0,0 +1,467 @@
+"""Pack a skeleton graph into flat arrays.
+
+The packed representation stores the nodes and edges of a graph as a
+small number of contiguous arrays. Variable length data, such as the
+edge paths and the spline control points, are concatenated and indexed
+by offset arrays: the values of element i are values[offsets[i]:offsets[i + 1]].
+Edges refer to their nodes by their row in the node arrays.
+Attributes other than the coordinates, paths and splines are stored as
+UTF-8 encoded JSON or, for pickling, kept as Python objects.
+"""
+
+import json
+from functools import partial
+
+import networkx as nx
+import numpy as np
+import splinebox
+
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.spline import B3Spline
+
+# names of the node arrays
+NODE_ARRAY_NAMES = (
+    "node_ids",
+    "node_coordinates",
+    "node_attributes",
+    "node_attribute_offsets",
+)
+# names of the edge arrays
+EDGE_ARRAY_NAMES = (
+    "edge_start_rows",
+    "edge_end_rows",
+    "edge_keys",
+    "path_coordinates",
+    "path_offsets",
+    "spline_n_knots",
+    "spline_closed",
+    "control_points",
+    "control_point_offsets",
+    "edge_attributes",
+    "edge_attribute_offsets",
+)
+
+
+def ragged_take(
+    values: np.ndarray, offsets: np.ndarray, indices: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select elements of a ragged array stored as values and offsets.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The concatenated values of all elements.
+    offsets : np.ndarray
+        (n_elements + 1,) array of the offsets of the elements in values.
+    indices : np.ndarray
+        The indices of the elements to select.
+
+    Returns
+    -------
+    values : np.ndarray
+        The concatenated values of the selected elements.
+    offsets : np.ndarray
+        (n_selected + 1,) array of the offsets of the selected elements.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    lengths = offsets[indices + 1] - offsets[indices]
+    new_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    value_indices = np.arange(new_offsets[-1]) + np.repeat(
+        offsets[indices] - new_offsets[:-1], lengths
+    )
+    return values[value_indices], new_offsets
+
+
+def _encode_attributes(attribute_dicts: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Encode attribute dictionaries as concatenated UTF-8 JSON bytes."""
+    # imported here to avoid a circular import with skeleton_graph
+    from skeleplex.graph.skeleton_graph import skeleton_graph_encoder
+
+    encoder = partial(skeleton_graph_encoder, compact=True)
+    encoded = [
+        json.dumps(attributes, separators=(",", ":"), default=encoder).encode()
+        if attributes
+        else b""
+        for attributes in attribute_dicts
+    ]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets
+
+
+def _decode_attributes(values: np.ndarray, offsets: np.ndarray) -> list[dict]:
+    """Decode the attribute dictionaries made by _encode_attributes."""
+    from skeleplex.graph.skeleton_graph import skeleton_graph_decoder
+
+    buffer = np.asarray(values, dtype=np.uint8).tobytes()
+    return [
+        json.loads(buffer[start:end], object_hook=skeleton_graph_decoder)
+        if end > start
+        else {}
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist(), strict=True)
+    ]
+
+
+def _concatenate(arrays: list[np.ndarray], n_dims: int, dtype) -> np.ndarray:
+    """Concatenate arrays of points, allowing the list to be empty."""
+    if len(arrays) == 0:
+        return np.empty((0, n_dims), dtype=dtype)
+    return np.concatenate(arrays, axis=0)
+
+
+def pack_skeleton_graph(
+    graph: nx.Graph, encode_attributes: bool = True
+) -> tuple[dict, dict[str, np.ndarray]]:
+    """Pack a skeleton graph into flat arrays.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The skeleton graph. The nodes must be integers and have coordinates.
+    encode_attributes : bool
+        If True, the graph, node and edge attributes other than the
+        coordinates, paths and splines are encoded as JSON and the node
+        and edge attributes are stored in the node_attributes and
+        edge_attributes arrays. If False, the attribute dictionaries are
+        returned unchanged in the metadata under the keys
+        "graph_attributes", "node_attributes" and "edge_attributes" and
+        the attribute arrays are omitted. Use False to pickle the packed
+        graph without converting the attributes. Default value is True.
+
+    Returns
+    -------
+    metadata : dict
+        The graph type and the graph attributes. With encode_attributes,
+        the metadata is JSON serializable.
+    arrays : dict[str, np.ndarray]
+        The packed node and edge arrays.
+    """
+    nodes = list(graph.nodes(data=True))
+    if not all(isinstance(node, int | np.integer) for node, _ in nodes):
+        raise TypeError("Only graphs with integer nodes can be packed.")
+    node_rows = {node: row for row, (node, _) in enumerate(nodes)}
+    if graph.is_multigraph():
+        edges = list(graph.edges(keys=True, data=True))
+    else:
+        edges = [(u, v, 0, edge_data) for u, v, edge_data in graph.edges(data=True)]
+
+    node_coordinates = [
+        np.asarray(node_data[NODE_COORDINATE_KEY]) for _, node_data in nodes
+    ]
+    n_dims = len(node_coordinates[0]) if len(node_coordinates) > 0 else 3
+    coordinate_dtype = (
+        np.result_type(*node_coordinates) if len(nodes) > 0 else np.float64
+    )
+    node_attribute_dicts = [
+        {key: value for key, value in node_data.items() if key != NODE_COORDINATE_KEY}
+        for _, node_data in nodes
+    ]
+
+    paths = []
+    splines = []
+    edge_attribute_dicts = []
+    for *_, edge_data in edges:
+        paths.append(
+            np.asarray(edge_data.get(EDGE_COORDINATES_KEY, np.empty((0, n_dims))))
+        )
+        splines.append(edge_data.get(EDGE_SPLINE_KEY))
+        edge_attribute_dicts.append(
+            {
+                key: value
+                for key, value in edge_data.items()
+                if key not in (EDGE_COORDINATES_KEY, EDGE_SPLINE_KEY)
+            }
+        )
+    control_points = [
+        spline.model.control_points
+        if spline is not None
+        else np.empty((0, n_dims), dtype=coordinate_dtype)
+        for spline in splines
+    ]
+    arrays = {
+        "node_ids": np.array([node for node, _ in nodes], dtype=np.int64),
+        "node_coordinates": _concatenate(
+            [coordinate[None] for coordinate in node_coordinates],
+            n_dims,
+            coordinate_dtype,
+        ),
+        "edge_start_rows": np.array([node_rows[u] for u, *_ in edges], dtype=np.int64),
+        "edge_end_rows": np.array([node_rows[v] for _, v, *_ in edges], dtype=np.int64),
+        "edge_keys": np.array([key for _, _, key, _ in edges], dtype=np.int64),
+        "path_coordinates": _concatenate(paths, n_dims, coordinate_dtype),
+        "path_offsets": np.concatenate(
+            [[0], np.cumsum([len(path) for path in paths], dtype=np.int64)]
+        ),
+        "spline_n_knots": np.array(
+            [spline.model.M if spline is not None else 0 for spline in splines],
+            dtype=np.int64,
+        ),
+        "spline_closed": np.array(
+            [spline is not None and spline.model.closed for spline in splines],
+            dtype=bool,
+        ),
+        "control_points": _concatenate(control_points, n_dims, coordinate_dtype),
+        "control_point_offsets": np.concatenate(
+            [[0], np.cumsum([len(points) for points in control_points], dtype=np.int64)]
+        ),
+    }
+    metadata = {
+        "directed": graph.is_directed(),
+        "multigraph": graph.is_multigraph(),
+    }
+    if not encode_attributes:
+        metadata["graph_attributes"] = dict(graph.graph)
+        metadata["node_attributes"] = node_attribute_dicts
+        metadata["edge_attributes"] = edge_attribute_dicts
+        return metadata, arrays
+
+    metadata["graph_attributes"] = (
+        _encode_attributes([graph.graph])[0].tobytes().decode()
+    )
+    arrays["node_attributes"], arrays["node_attribute_offsets"] = _encode_attributes(
+        node_attribute_dicts
+    )
+    arrays["edge_attributes"], arrays["edge_attribute_offsets"] = _encode_attributes(
+        edge_attribute_dicts
+    )
+    return metadata, arrays
+
+
+def take_edges(
+    arrays: dict[str, np.ndarray], edge_indices: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Return the packed arrays with a subset of the edges.
+
+    All nodes are kept.
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The packed arrays.
+    edge_indices : np.ndarray
+        The indices of the edges to keep in the order to keep them in.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The packed arrays of the selected edges.
+    """
+    edge_indices = np.asarray(edge_indices, dtype=np.int64)
+    subset = {name: arrays[name] for name in NODE_ARRAY_NAMES}
+    for name in ("edge_start_rows", "edge_end_rows", "edge_keys"):
+        subset[name] = arrays[name][edge_indices]
+    subset["spline_n_knots"] = arrays["spline_n_knots"][edge_indices]
+    subset["spline_closed"] = arrays["spline_closed"][edge_indices]
+    for values_name, offsets_name in (
+        ("path_coordinates", "path_offsets"),
+        ("control_points", "control_point_offsets"),
+        ("edge_attributes", "edge_attribute_offsets"),
+    ):
+        subset[values_name], subset[offsets_name] = ragged_take(
+            arrays[values_name], arrays[offsets_name], edge_indices
+        )
+    return subset
+
+
+def take_nodes(
+    arrays: dict[str, np.ndarray], node_rows: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Return the packed arrays with a subset of the nodes.
+
+    The edge node rows are renumbered to the new node order. All nodes
+    of the edges must be in the subset.
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The packed arrays.
+    node_rows : np.ndarray
+        The rows of the nodes to keep in the order to keep them in.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The packed arrays of the selected nodes.
+    """
+    node_rows = np.asarray(node_rows, dtype=np.int64)
+    subset = {name: arrays[name] for name in EDGE_ARRAY_NAMES}
+    subset["node_ids"] = arrays["node_ids"][node_rows]
+    subset["node_coordinates"] = arrays["node_coordinates"][node_rows]
+    subset["node_attributes"], subset["node_attribute_offsets"] = ragged_take(
+        arrays["node_attributes"], arrays["node_attribute_offsets"], node_rows
+    )
+
+    new_rows = np.full(len(arrays["node_ids"]), -1, dtype=np.int64)
+    new_rows[node_rows] = np.arange(len(node_rows))
+    subset["edge_start_rows"] = new_rows[arrays["edge_start_rows"]]
+    subset["edge_end_rows"] = new_rows[arrays["edge_end_rows"]]
+    if np.any(subset["edge_start_rows"] < 0) or np.any(subset["edge_end_rows"] < 0):
+        raise ValueError("All nodes of the edges must be selected.")
+    return subset
+
+
+def edge_bounding_boxes(arrays: dict[str, np.ndarray]) -> np.ndarray:
+    """Compute the bounding box of each edge.
+
+    The bounding box contains the edge nodes, the path and the spline
+    control points. Since a B-spline lies in the convex hull of its
+    control points, the bounding box contains the whole spline.
+
+    Parameters
+    ----------
+    arrays : dict[str, np.ndarray]
+        The packed arrays.
+
+    Returns
+    -------
+    np.ndarray
+        (n_edges, 2, d) array of the lower and upper corners of the boxes.
+    """
+    node_coordinates = arrays["node_coordinates"]
+    start = node_coordinates[arrays["edge_start_rows"]]
+    end = node_coordinates[arrays["edge_end_rows"]]
+    lower = np.minimum(start, end).astype(np.float64)
+    upper = np.maximum(start, end).astype(np.float64)
+
+    for values_name, offsets_name in (
+        ("path_coordinates", "path_offsets"),
+        ("control_points", "control_point_offsets"),
+    ):
+        values = arrays[values_name]
+        offsets = arrays[offsets_name]
+        has_values = np.diff(offsets) > 0
+        if not np.any(has_values) or len(values) == 0:
+            continue
+        starts = offsets[:-1][has_values]
+        lower[has_values] = np.minimum(
+            lower[has_values], np.minimum.reduceat(values, starts, axis=0)
+        )
+        upper[has_values] = np.maximum(
+            upper[has_values], np.maximum.reduceat(values, starts, axis=0)
+        )
+    return np.stack([lower, upper], axis=1)
+
+
+def morton_order(points: np.ndarray, n_bits: int = 16) -> np.ndarray:
+    """Return the order of the points along a Z-order (Morton) curve.
+
+    Points that are close in space tend to be close in this order.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        (n_points, d) array of the points.
+    n_bits : int
+        The number of bits each coordinate is quantized to.
+        Default value is 16.
+
+    Returns
+    -------
+    np.ndarray
+        (n_points,) array of the indices that sort the points.
+    """
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+    n_dims = points.shape[1]
+    if n_bits * n_dims > 63:
+        raise ValueError("The Morton code does not fit in 64 bits.")
+    lower = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lower, np.finfo(float).eps)
+    quantized = ((points - lower) / extent * (2**n_bits - 1)).astype(np.uint64)
+
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for bit in range(n_bits):
+        for axis in range(n_dims):
+            codes |= ((quantized[:, axis] >> np.uint64(bit)) & np.uint64(1)) << (
+                np.uint64(bit * n_dims + axis)
+            )
+    return np.argsort(codes, kind="stable")
+
+
+def unpack_skeleton_graph(metadata: dict, arrays: dict[str, np.ndarray]) -> nx.Graph:
+    """Build a skeleton graph from packed arrays.
+
+    Parameters
+    ----------
+    metadata : dict
+        The graph type and attributes made by pack_skeleton_graph,
+        with the attributes either encoded or as dictionaries.
+    arrays : dict[str, np.ndarray]
+        The packed arrays.
+
+    Returns
+    -------
+    nx.Graph
+        The skeleton graph.
+    """
+    if metadata["multigraph"]:
+        graph = nx.MultiDiGraph() if metadata["directed"] else nx.MultiGraph()
+    else:
+        graph = nx.DiGraph() if metadata["directed"] else nx.Graph()
+    graph_attributes = metadata.get("graph_attributes", "")
+    if isinstance(graph_attributes, str):
+        graph_attributes = graph_attributes.encode()
+        graph_attributes = _decode_attributes(
+            np.frombuffer(graph_attributes, dtype=np.uint8),
+            np.array([0, len(graph_attributes)]),
+        )[0]
+    graph.graph.update(graph_attributes)
+
+    node_ids = arrays["node_ids"].tolist()
+    if "node_attributes" in metadata:
+        node_attributes = [
+            dict(attributes) for attributes in metadata["node_attributes"]
+        ]
+    else:
+        node_attributes = _decode_attributes(
+            arrays["node_attributes"], arrays["node_attribute_offsets"]
+        )
+    for node, coordinate, attributes in zip(
+        node_ids, arrays["node_coordinates"], node_attributes, strict=True
+    ):
+        attributes[NODE_COORDINATE_KEY] = coordinate
+        graph.add_node(node, **attributes)
+
+    if "edge_attributes" in metadata:
+        edge_attributes = [
+            dict(attributes) for attributes in metadata["edge_attributes"]
+        ]
+    else:
+        edge_attributes = _decode_attributes(
+            arrays["edge_attributes"], arrays["edge_attribute_offsets"]
+        )
+    path_offsets = arrays["path_offsets"].tolist()
+    control_point_offsets = arrays["control_point_offsets"].tolist()
+    basis_function = splinebox.B3()
+    for index, attributes in enumerate(edge_attributes):
+        path_start, path_end = path_offsets[index], path_offsets[index + 1]
+        if path_end > path_start:
+            attributes[EDGE_COORDINATES_KEY] = arrays["path_coordinates"][
+                path_start:path_end
+            ]
+        n_knots = int(arrays["spline_n_knots"][index])
+        if n_knots > 0:
+            attributes[EDGE_SPLINE_KEY] = B3Spline(
+                model=splinebox.Spline(
+                    M=n_knots,
+                    basis_function=basis_function,
+                    closed=bool(arrays["spline_closed"][index]),
+                    control_points=arrays["control_points"][
+                        control_point_offsets[index] : control_point_offsets[index + 1]
+                    ],
+                )
+            )
+        start_node = node_ids[arrays["edge_start_rows"][index]]
+        end_node = node_ids[arrays["edge_end_rows"][index]]
+        if metadata["multigraph"]:
+            graph.add_edge(
+                start_node, end_node, key=int(arrays["edge_keys"][index]), **attributes
+            )
+        else:
+            graph.add_edge(start_node, end_node, **attributes)
+    return graph
@@ -2,12 +2,16 @@
 
 import einops
 import numpy as np
+from numpy.typing import DTypeLike
 from scipy.ndimage import map_coordinates
 
+from skeleplex.graph.volume import ChunkedVolumeReader
+
 
 def generate_3d_grid(
     grid_shape: tuple[int, int, int] = (10, 10, 10),
     grid_spacing: tuple[float, float, float] = (1, 1, 1),
+    dtype: DTypeLike = np.float64,
 ) -> np.ndarray:
     """
     Generate a 3D sampling grid with specified shape and spacing.
@@ -21,6 +25,9 @@ def generate_3d_grid(
         The number of grid points along each axis.
     grid_spacing : Tuple[float, float, float]
         Spacing between points in the sampling grid.
+    dtype : DTypeLike
+        The floating point type of the grid coordinates.
+        Default value is np.float64.
 
     Returns
     -------
@@ -28,7 +35,7 @@ def generate_3d_grid(
         Coordinate of points forming the 3D grid.
     """
     # generate a grid of points at each integer from 0 to grid_shape for each dimension
-    grid = np.indices(grid_shape).astype(float)
+    grid = np.indices(grid_shape).astype(dtype)
     grid = einops.rearrange(grid, "xyz w h d -> w h d xyz")
     # shift the grid to be centered on the origin
     grid_offset = (np.array(grid_shape)) // 2
@@ -39,7 +46,9 @@ def generate_3d_grid(
 
 
 def generate_2d_grid(
-    grid_shape: tuple[int, int] = (10, 10), grid_spacing: tuple[float, float] = (1, 1)
+    grid_shape: tuple[int, int] = (10, 10),
+    grid_spacing: tuple[float, float] = (1, 1),
+    dtype: DTypeLike = np.float64,
 ) -> np.ndarray:
     """
     Generate a 2D sampling grid with specified shape and spacing.
@@ -54,6 +63,9 @@ def generate_2d_grid(
         The number of grid points along each axis.
     grid_spacing : Tuple[float, float]
         Spacing between points in the sampling grid.
+    dtype : DTypeLike
+        The floating point type of the grid coordinates.
+        Default value is np.float64.
 
     Returns
     -------
@@ -61,28 +73,30 @@ def generate_2d_grid(
         Coordinate of points forming the 2D grid.
     """
     grid = generate_3d_grid(
-        grid_shape=(1, *grid_shape), grid_spacing=(1, *grid_spacing)
+        grid_shape=(1, *grid_shape), grid_spacing=(1, *grid_spacing), dtype=dtype
     )
     return einops.rearrange(grid, "1 w h xyz -> w h xyz")
 
 
 def sample_volume_at_coordinates(
-    volume: np.ndarray,
+    volume: np.ndarray | ChunkedVolumeReader,
     coordinates: np.ndarray,
     interpolation_order: int = 3,
     fill_value: float = np.nan,
+    dtype: DTypeLike | None = None,
 ) -> np.ndarray:
     """
     Sample a volume with spline interpolation at specific coordinates.
 
     The output shape is determined by the input coordinate shape such that
     if coordinates have shape (batch, *grid_shape, 3), the output array will have
-    shape (*grid_shape, batch).
+    shape (batch, *grid_shape).
 
     Parameters
     ----------
-    volume : np.ndarray
-        Volume to be sampled.
+    volume : np.ndarray | ChunkedVolumeReader
+        Volume to be sampled. If a ChunkedVolumeReader is given, only
+        the chunks around the coordinates are read.
     coordinates : np.ndarray
         Array of coordinates at which to sample the volume. The shape of this array
         should be (batch, *grid_shape, 3) to allow reshaping back correctly
@@ -90,21 +104,30 @@ def sample_volume_at_coordinates(
         Spline order for image interpolation.
     fill_value : float
         Value to fill in for sample coordinates past the edges of the volume.
+    dtype : DTypeLike | None
+        The type of the sampled values. If None, the dtype of the
+        volume is used. Default value is None.
 
     Returns
     -------
     np.ndarray
-        Array of shape (*grid_shape)
+        Array of shape (batch, *grid_shape)
     """
-    batch, *grid_shape, _ = coordinates.shape
+    if isinstance(volume, ChunkedVolumeReader):
+        return volume.sample(
+            coordinates,
+            interpolation_order=interpolation_order,
+            fill_value=fill_value,
+            dtype=dtype,
+        )
+
     # map_coordinates wants transposed coordinate array
     sampled_volume = map_coordinates(
         volume,
         coordinates.reshape(-1, 3).T,
+        output=dtype,
         order=interpolation_order,
         cval=fill_value,
     )
-    # reshape back (need to invert due to previous transposition)
-    sampled_volume = sampled_volume.reshape(*grid_shape, batch)
-    # and retranspose to get batch back to the 0th dimension
-    return einops.rearrange(sampled_volume, "... batch -> batch ...")
+    # the flattened coordinates are in (batch, *grid_shape) order
+    return sampled_volume.reshape(coordinates.shape[:-1])
@@ -0,0 +1,62 @@
+"""Utilities for serializing arrays to JSON."""
+
+import base64
+
+import numpy as np
+
+# value of the __class__ key for encoded arrays
+ARRAY_CLASS_NAME = "numpy.ndarray"
+
+
+def encode_array(array: np.ndarray) -> dict:
+    """Encode an array as a JSON serializable dictionary.
+
+    The array is stored as a base64 encoded buffer together with
+    its dtype and shape, so it can be decoded without loss.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The array to encode.
+
+    Returns
+    -------
+    dict
+        The JSON serializable dictionary.
+    """
+    array = np.ascontiguousarray(array)
+    if array.dtype.hasobject:
+        raise TypeError("Arrays of Python objects cannot be encoded as buffers.")
+    return {
+        "__class__": ARRAY_CLASS_NAME,
+        "dtype": array.dtype.str,
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.data).decode("ascii"),
+    }
+
+
+def decode_array(json_dict: dict) -> np.ndarray:
+    """Decode an array encoded with encode_array.
+
+    Parameters
+    ----------
+    json_dict : dict
+        The dictionary made by encode_array.
+
+    Returns
+    -------
+    np.ndarray
+        The decoded array.
+    """
+    buffer = base64.b64decode(json_dict["data"])
+    array = np.frombuffer(buffer, dtype=np.dtype(json_dict["dtype"]))
+    # copy to get a writeable array that owns its data
+    return array.reshape(json_dict["shape"]).copy()
+
+
+def is_encoded_array(json_object) -> bool:
+    """Check if a decoded JSON object is an encoded array."""
+    return (
+        isinstance(json_object, dict)
+        and json_object.get("__class__") == ARRAY_CLASS_NAME
+    )
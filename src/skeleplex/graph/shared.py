@@ -0,0 +1,157 @@
+"""Share a skeleton graph between processes without copying its arrays."""
+
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from skeleplex.graph.packed import pack_skeleton_graph, unpack_skeleton_graph
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+# byte alignment of the arrays in the shared memory block
+_ARRAY_ALIGNMENT = 64
+
+
+class SharedSkeletonGraph:
+    """Handle to a skeleton graph stored in shared memory.
+
+    The packed arrays of the graph (see skeleplex.graph.packed) are copied
+    once into a shared memory block. The handle itself is small, so it can
+    be sent to worker processes, where attach() builds a SkeletonGraph
+    whose coordinates, paths and spline control points are read-only views
+    of the shared memory.
+
+    The process that created the handle owns the shared memory and must
+    release it with unlink() when all workers are done. The handle can be
+    used as a context manager to do this automatically.
+
+    Parameters
+    ----------
+    name : str
+        The name of the shared memory block.
+    metadata : dict
+        The graph type and attributes made by pack_skeleton_graph.
+    array_layout : dict[str, tuple]
+        Mapping of each array name to its (dtype, shape, offset)
+        in the shared memory block.
+    """
+
+    def __init__(self, name: str, metadata: dict, array_layout: dict[str, tuple]):
+        self.name = name
+        self.metadata = metadata
+        self.array_layout = array_layout
+        self._shared_memory = None
+
+    @classmethod
+    def create(cls, skeleton_graph: SkeletonGraph) -> "SharedSkeletonGraph":
+        """Copy a skeleton graph into a new shared memory block.
+
+        Parameters
+        ----------
+        skeleton_graph : SkeletonGraph
+            The skeleton graph to share. The nodes must be integers.
+
+        Returns
+        -------
+        SharedSkeletonGraph
+            The handle owning the shared memory block.
+        """
+        metadata, arrays = pack_skeleton_graph(skeleton_graph.graph)
+
+        array_layout = {}
+        size = 0
+        for name, array in arrays.items():
+            offset = -(-size // _ARRAY_ALIGNMENT) * _ARRAY_ALIGNMENT
+            array_layout[name] = (array.dtype.str, array.shape, offset)
+            size = offset + array.nbytes
+
+        shared_memory_block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        handle = cls(
+            name=shared_memory_block.name,
+            metadata=metadata,
+            array_layout=array_layout,
+        )
+        handle._shared_memory = shared_memory_block
+        for name, view in handle._array_views().items():
+            view[...] = arrays[name]
+        return handle
+
+    def _array_views(self) -> dict[str, np.ndarray]:
+        """Return views of the arrays in the shared memory block."""
+        return {
+            name: np.ndarray(
+                shape,
+                dtype=np.dtype(dtype),
+                buffer=self._shared_memory.buf,
+                offset=offset,
+            )
+            for name, (dtype, shape, offset) in self.array_layout.items()
+        }
+
+    def attach(self) -> SkeletonGraph:
+        """Return a SkeletonGraph backed by the shared memory.
+
+        The arrays of the returned graph are read-only views of the
+        shared memory, so no data is copied. The shared memory stays
+        open as long as the handle is referenced.
+
+        Returns
+        -------
+        SkeletonGraph
+            The skeleton graph.
+        """
+        if self._shared_memory is None:
+            if sys.version_info >= (3, 13):
+                # only the creating process should track the block
+                self._shared_memory = shared_memory.SharedMemory(
+                    name=self.name, track=False
+                )
+            else:
+                self._shared_memory = shared_memory.SharedMemory(name=self.name)
+
+        arrays = self._array_views()
+        for array in arrays.values():
+            array.flags.writeable = False
+        skeleton_graph = SkeletonGraph(
+            graph=unpack_skeleton_graph(self.metadata, arrays)
+        )
+        # the views are only valid while the shared memory is open
+        skeleton_graph._shared_memory_handle = self
+        return skeleton_graph
+
+    def close(self) -> None:
+        """Close the access of this process to the shared memory.
+
+        Graphs returned by attach() in this process must be deleted first.
+        """
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+            self._shared_memory = None
+
+    def unlink(self) -> None:
+        """Close and free the shared memory block.
+
+        This should only be called by the process that created the handle
+        after all workers are done. Graphs returned by attach() in this
+        process must be deleted first.
+        """
+        shared_memory_block = self._shared_memory
+        if shared_memory_block is None:
+            shared_memory_block = shared_memory.SharedMemory(name=self.name)
+        shared_memory_block.close()
+        shared_memory_block.unlink()
+        self._shared_memory = None
+
+    def __getstate__(self) -> dict:
+        """Pickle the handle without the open shared memory."""
+        state = self.__dict__.copy()
+        state["_shared_memory"] = None
+        return state
+
+    def __enter__(self) -> "SharedSkeletonGraph":
+        """Return the handle for use as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Free the shared memory block."""
+        self.unlink()
@@ -0,0 +1,251 @@
+"""Functions to simplify a skeleton graph before fitting splines."""
+
+import networkx as nx
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_COORDINATES_KEY, NODE_COORDINATE_KEY
+
+
+def path_lengths(paths: list[np.ndarray]) -> np.ndarray:
+    """Compute the length of many polyline paths at once.
+
+    Parameters
+    ----------
+    paths : list[np.ndarray]
+        The (n_points, d) arrays of the path coordinates.
+
+    Returns
+    -------
+    np.ndarray
+        (n_paths,) array of the path lengths.
+    """
+    if len(paths) == 0:
+        return np.zeros(0)
+    n_points = np.array([len(path) for path in paths])
+    all_points = np.concatenate(paths, axis=0)
+    segment_lengths = np.linalg.norm(np.diff(all_points, axis=0), axis=1)
+
+    # segment i connects point i and i + 1, so the segments
+    # between the last point of a path and the first point of
+    # the next path are not part of any path.
+    path_ends = np.cumsum(n_points)
+    segment_lengths[path_ends[:-1] - 1] = 0
+    path_starts = path_ends - n_points
+    lengths = np.add.reduceat(
+        np.append(segment_lengths, 0), np.minimum(path_starts, len(segment_lengths))
+    )
+    # paths with a single point have no length
+    lengths[n_points < 2] = 0
+    return lengths
+
+
+def _edges_with_keys(graph: nx.Graph):
+    """Return the edges of a graph with their keys and data."""
+    if graph.is_multigraph():
+        return list(graph.edges(keys=True, data=True))
+    return [(u, v, None, data) for u, v, data in graph.edges(data=True)]
+
+
+def _remove_edge(graph: nx.Graph, u, v, key) -> None:
+    """Remove an edge from a graph or multigraph."""
+    if graph.is_multigraph():
+        graph.remove_edge(u, v, key)
+    else:
+        graph.remove_edge(u, v)
+
+
+def prune_spurs(graph: nx.Graph, min_length: float) -> nx.Graph:
+    """Remove terminal branches shorter than a length threshold.
+
+    A terminal branch connects a node with degree 1 to a node with
+    degree 3 or more. The branch and its degree 1 node are removed
+    when the length of its path is less than min_length. Isolated
+    branches (both nodes have degree 1) are never removed. The degrees
+    are not updated while pruning, so each junction is left with at
+    least two edges: if all but one edge of a junction are short
+    terminal branches, the longest of them is kept. Junctions that are
+    left with degree 2 can be merged with merge_degree_2_nodes.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The undirected skeleton graph. Each edge must have a path
+        stored under EDGE_COORDINATES_KEY. The graph is modified in place.
+    min_length : float
+        The minimum length of the terminal branches to keep.
+
+    Returns
+    -------
+    nx.Graph
+        The pruned graph.
+    """
+    if graph.is_directed():
+        raise ValueError("Spurs can only be pruned on undirected graphs.")
+    edges = _edges_with_keys(graph)
+    if len(edges) == 0:
+        return graph
+
+    degrees = dict(graph.degree)
+    start_degree = np.array([degrees[u] for u, *_ in edges])
+    end_degree = np.array([degrees[v] for _, v, *_ in edges])
+    lengths = path_lengths(
+        [np.asarray(edge_data[EDGE_COORDINATES_KEY]) for *_, edge_data in edges]
+    )
+
+    is_terminal = ((start_degree == 1) & (end_degree >= 3)) | (
+        (end_degree == 1) & (start_degree >= 3)
+    )
+    spurs_by_junction = {}
+    for edge_index in np.flatnonzero(is_terminal & (lengths < min_length)):
+        u, v, *_ = edges[edge_index]
+        junction = v if start_degree[edge_index] == 1 else u
+        spurs_by_junction.setdefault(junction, []).append(edge_index)
+
+    for junction, spur_indices in spurs_by_junction.items():
+        # keep the longest spurs if the junction would otherwise become an end
+        # point, so a branch ending in several short spurs is not cut short
+        n_kept = max(0, 2 - (degrees[junction] - len(spur_indices)))
+        spur_indices = sorted(spur_indices, key=lambda index: lengths[index])
+        for edge_index in spur_indices[: len(spur_indices) - n_kept]:
+            u, v, key, _ = edges[edge_index]
+            _remove_edge(graph, u, v, key)
+            leaf_node = u if start_degree[edge_index] == 1 else v
+            graph.remove_node(leaf_node)
+    return graph
+
+
+def _walk_chain(graph: nx.Graph, node, edge: tuple, chain_nodes: set) -> list:
+    """Follow the edges from a degree 2 node until the end of the chain.
+
+    Returns the list of (start_node, end_node, key) edges in walking order.
+    """
+    walked_edges = []
+    current_node = node
+    while True:
+        _, next_node, key = edge
+        walked_edges.append((current_node, next_node, key))
+        if next_node not in chain_nodes:
+            return walked_edges
+        chain_nodes.discard(next_node)
+        # continue with the other edge of the degree 2 node.
+        # incident edges are oriented away from the node.
+        edge = next(
+            (a, b, k)
+            for a, b, k in _incident_edges(graph, next_node)
+            if (b, k) != (current_node, key)
+        )
+        current_node = next_node
+
+
+def _incident_edges(graph: nx.Graph, node) -> list[tuple]:
+    """Return the (u, v, key) edges incident to a node."""
+    if graph.is_multigraph():
+        return list(graph.edges(node, keys=True))
+    return [(u, v, None) for u, v in graph.edges(node)]
+
+
+def _oriented_path(graph: nx.Graph, u, v, key, start_node) -> np.ndarray:
+    """Return the path of an edge oriented to start at start_node."""
+    edge_data = graph.edges[u, v, key] if graph.is_multigraph() else graph.edges[u, v]
+    path = np.asarray(edge_data[EDGE_COORDINATES_KEY])
+    start_coordinate = np.asarray(graph.nodes[start_node][NODE_COORDINATE_KEY])
+    if np.linalg.norm(path[0] - start_coordinate) > np.linalg.norm(
+        path[-1] - start_coordinate
+    ):
+        return path[::-1]
+    return path
+
+
+def merge_degree_2_nodes(graph: nx.Graph) -> nx.Graph:
+    """Merge the edges connected by nodes with degree 2.
+
+    Each chain of edges connected by degree 2 nodes is replaced by a
+    single edge whose path is the concatenation of the paths in the chain.
+    Closed loops of degree 2 nodes are left unchanged. Edge attributes other
+    than the path are not kept, so splines have to be fit after merging.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The undirected skeleton graph. Each edge must have a path
+        stored under EDGE_COORDINATES_KEY and each node a coordinate
+        stored under NODE_COORDINATE_KEY. The graph is modified in place.
+
+    Returns
+    -------
+    nx.Graph
+        The graph with the degree 2 nodes merged.
+    """
+    if graph.is_directed():
+        raise ValueError("Degree 2 nodes can only be merged on undirected graphs.")
+
+    chain_nodes = {
+        node
+        for node, degree in graph.degree
+        if degree == 2 and not graph.has_edge(node, node)
+    }
+    while chain_nodes:
+        node = chain_nodes.pop()
+        first_edge, second_edge = _incident_edges(graph, node)
+
+        # walk to both ends of the chain
+        forward_edges = _walk_chain(graph, node, first_edge, chain_nodes)
+        if forward_edges[-1][1] == node:
+            # the chain is a closed loop
+            continue
+        backward_edges = _walk_chain(graph, node, second_edge, chain_nodes)
+        chain_edges = [
+            (v, u, key) for u, v, key in reversed(backward_edges)
+        ] + forward_edges
+
+        # concatenate the paths, dropping the shared point of consecutive edges
+        paths = []
+        for edge_index, (u, v, key) in enumerate(chain_edges):
+            path = _oriented_path(graph, u, v, key, start_node=u)
+            paths.append(path if edge_index == 0 else path[1:])
+        merged_path = np.concatenate(paths, axis=0)
+
+        # every edge in the chain touches an inner node,
+        # so removing the inner nodes removes the chain edges
+        graph.remove_nodes_from([u for u, _, _ in chain_edges[1:]])
+        graph.add_edge(
+            chain_edges[0][0],
+            chain_edges[-1][1],
+            **{EDGE_COORDINATES_KEY: merged_path},
+        )
+    return graph
+
+
+def simplify_graph(
+    graph: nx.Graph,
+    min_spur_length: float | None = None,
+    merge_degree_2: bool = False,
+) -> nx.Graph:
+    """Simplify a skeleton graph by pruning spurs and merging degree 2 nodes.
+
+    This is meant to be applied before fitting splines to the edges,
+    so that no splines are fit to spurious branches.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        The undirected skeleton graph. Each edge must have a path
+        stored under EDGE_COORDINATES_KEY and each node a coordinate
+        stored under NODE_COORDINATE_KEY. The graph is modified in place.
+    min_spur_length : float | None
+        The minimum length of the terminal branches to keep.
+        If None, no branches are pruned. Default value is None.
+    merge_degree_2 : bool
+        If True, the edges connected by degree 2 nodes are merged.
+        Default value is False.
+
+    Returns
+    -------
+    nx.Graph
+        The simplified graph.
+    """
+    if min_spur_length is not None:
+        prune_spurs(graph, min_length=min_spur_length)
+    if merge_degree_2:
+        merge_degree_2_nodes(graph)
+    return graph
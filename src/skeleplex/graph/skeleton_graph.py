@@ -2,42 +2,75 @@
 
 import json
 import logging
+import pickle
+import sys
+import types
+from functools import partial
 
 import networkx as nx
 import numpy as np
+from numpy.typing import DTypeLike
 from splinebox import Spline as SplineboxSpline
 from splinebox.spline_curves import _prepared_dict_for_constructor
 
+from skeleplex.graph.cache import SkeletonGraphCache, skeleton_image_cache_key
 from skeleplex.graph.constants import (
     EDGE_COORDINATES_KEY,
     EDGE_SPLINE_KEY,
     NODE_COORDINATE_KEY,
 )
-from skeleplex.graph.image_to_graph import image_to_graph_skan
+from skeleplex.graph.fingerprint import new_hasher, update_hash
+from skeleplex.graph.hdf5 import read_skeleton_graph_hdf5, write_skeleton_graph_hdf5
+from skeleplex.graph.image_to_graph import (
+    coordinates_to_graph,
+    image_to_graph_numba,
+    image_to_graph_skan,
+)
+from skeleplex.graph.packed import pack_skeleton_graph, unpack_skeleton_graph
+from skeleplex.graph.serialization import ARRAY_CLASS_NAME, decode_array, encode_array
 from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.tree import compute_tree_metrics
+from skeleplex.skeleton.components import filter_skeleton_components
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def skeleton_graph_encoder(object_to_encode):
+def skeleton_graph_encoder(object_to_encode, compact: bool = False):
     """JSON encoder for the networkx skeleton graph.
 
     This function is to be used with the Python json.dump(s) functions
-    as the `default` keyword argument.
+    as the `default` keyword argument. To use the compact mode,
+    pass functools.partial(skeleton_graph_encoder, compact=True).
+
+    Parameters
+    ----------
+    object_to_encode : Any
+        The object to encode.
+    compact : bool
+        If True, arrays are encoded as base64 encoded buffers with their
+        dtype and shape instead of nested lists. Default value is False.
     """
     if isinstance(object_to_encode, np.ndarray):
+        if compact:
+            return encode_array(object_to_encode)
         return object_to_encode.tolist()
+    elif isinstance(object_to_encode, np.generic):
+        return object_to_encode.item()
     elif isinstance(object_to_encode, SplineboxSpline):
         spline_dict = object_to_encode._to_dict(version=2)
         if "__class__" in spline_dict:
             raise ValueError(
                 "The Spline object to encode already has a '__class__' key."
             )
+        if compact:
+            spline_dict["control_points"] = encode_array(
+                object_to_encode.control_points
+            )
         spline_dict.update({"__class__": "splinebox.Spline"})
         return spline_dict
     elif isinstance(object_to_encode, B3Spline):
-        return object_to_encode.to_json_dict()
+        return object_to_encode.to_json_dict(compact=compact)
     raise TypeError(f"Object of type {type(object_to_encode)} is not JSON serializable")
 
 
@@ -45,10 +78,13 @@ def skeleton_graph_decoder(json_object):
     """JSON decoder for the networkx skeleton graph.
 
     This function is to be used with the Python json.load(s) functions
-    as the `object_hook` keyword argument.
+    as the `object_hook` keyword argument. It decodes both the
+    default and the compact format.
     """
     if "__class__" in json_object:
         # all custom classes are identified by the __class__ key
+        if json_object["__class__"] == ARRAY_CLASS_NAME:
+            return decode_array(json_object)
         if json_object["__class__"] == "splinebox.Spline":
             json_object.pop("__class__")
             spline_kwargs = _prepared_dict_for_constructor(json_object)
@@ -161,7 +197,7 @@ def orient_splines(graph: nx.DiGraph) -> nx.DiGraph:
         if np.linalg.norm(u_coord - spline_coordinates[0]) > np.linalg.norm(
             u_coord - spline_coordinates[-1]
         ):
-            logger.info(f"Flipped spline of edge ({u,v}).")
+            logger.info(f"Flipped spline of edge ({u, v}).")
             edge_coordinates = attr[EDGE_COORDINATES_KEY]
             # check if path is inverse to spline
             if np.linalg.norm(
@@ -179,6 +215,56 @@ def orient_splines(graph: nx.DiGraph) -> nx.DiGraph:
     return graph
 
 
+def _sizeof(value, deep: bool, seen: set[int] | None = None) -> int:
+    """Return the memory used by a value in bytes.
+
+    Arrays are counted by the size of their data. If deep is True, the
+    Python objects and the attributes of objects are followed
+    recursively, counting each object once.
+    """
+    if not deep:
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        return sys.getsizeof(value)
+
+    if seen is None:
+        seen = set()
+    if id(value) in seen or isinstance(
+        value, type | types.ModuleType | types.FunctionType
+    ):
+        # classes and functions are shared and not part of the graph
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        # sys.getsizeof only includes the data of arrays owning their data
+        data_size = value.nbytes if value.flags.owndata else 0
+        return sys.getsizeof(value) - data_size + value.nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            _sizeof(key, deep, seen) + _sizeof(item, deep, seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, list | tuple | set | frozenset):
+        size += sum(_sizeof(item, deep, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += _sizeof(vars(value), deep, seen)
+    return size
+
+
+def _rebuild_skeleton_graph(
+    cls: type, metadata: dict, array_buffers: dict[str, tuple]
+) -> "SkeletonGraph":
+    """Rebuild a SkeletonGraph pickled by SkeletonGraph.__reduce_ex__."""
+    arrays = {}
+    for name, (dtype, shape, buffer) in array_buffers.items():
+        if isinstance(buffer, np.ndarray):
+            arrays[name] = buffer
+        else:
+            arrays[name] = np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape)
+    return cls(graph=unpack_skeleton_graph(metadata, arrays))
+
+
 class SkeletonGraph:
     """Data class for a skeleton graph.
 
@@ -193,6 +279,45 @@ class SkeletonGraph:
     def __init__(self, graph: nx.Graph):
         self.graph = graph
 
+    @property
+    def graph(self) -> nx.Graph:
+        """Return the underlying networkx graph."""
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: nx.Graph):
+        self._graph = graph
+        # cached (attribute dictionary, digest) of each node and edge
+        self._node_fingerprints = {}
+        self._edge_fingerprints = {}
+        # fingerprint of the graph when the tree metrics were computed
+        self._tree_metrics_signature = None
+
+    def __reduce_ex__(self, protocol: int):
+        """Pickle the graph as a few contiguous arrays.
+
+        The graph is packed (see skeleplex.graph.packed), so the node
+        coordinates, paths and spline control points of all elements are
+        pickled as a few large arrays instead of many small objects.
+        With pickle protocol 5, the arrays are passed as PickleBuffer
+        objects, which allows them to be transferred out-of-band.
+        The other graph, node and edge attributes are pickled as they are.
+        Graphs that cannot be packed, for example because their nodes
+        are not integers or have no coordinates, are pickled with
+        the default method.
+        """
+        try:
+            metadata, arrays = pack_skeleton_graph(self.graph, encode_attributes=False)
+        except Exception:
+            return super().__reduce_ex__(protocol)
+
+        array_buffers = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            buffer = pickle.PickleBuffer(array) if protocol >= 5 else array
+            array_buffers[name] = (array.dtype.str, array.shape, buffer)
+        return _rebuild_skeleton_graph, (type(self), metadata, array_buffers)
+
     @property
     def backend(self) -> str:
         """Return the backend used to store the graph."""
@@ -238,28 +363,127 @@ class SkeletonGraph:
             edge_splines[(edge_start, edge_end)] = edge_data[EDGE_SPLINE_KEY]
         return edge_splines
 
-    def to_json_file(self, file_path: str):
-        """Return a JSON representation of the graph."""
-        graph_dict = nx.node_link_data(self.graph, edges="edges")
-        object_dict = {"graph": graph_dict}
+    def _json_object(self) -> dict:
+        """Return the object that is encoded in the JSON representation."""
+        return {"graph": nx.node_link_data(self.graph, edges="edges")}
 
+    @staticmethod
+    def _json_dump_kwargs(compact: bool) -> dict:
+        """Return the keyword arguments for json.dump(s)."""
+        if compact:
+            return {
+                "separators": (",", ":"),
+                "default": partial(skeleton_graph_encoder, compact=True),
+            }
+        return {"indent": 2, "default": skeleton_graph_encoder}
+
+    def to_json(self, compact: bool = False) -> str:
+        """Return a JSON representation of the graph.
+
+        Parameters
+        ----------
+        compact : bool
+            If True, arrays are stored as base64 encoded buffers with their
+            dtype and shape and the JSON is written without indentation.
+            Default value is False.
+
+        Returns
+        -------
+        str
+            The JSON string in the same format as to_json_file.
+        """
+        return json.dumps(self._json_object(), **self._json_dump_kwargs(compact))
+
+    def to_json_file(self, file_path: str, compact: bool = False):
+        """Write a JSON representation of the graph.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file to write.
+        compact : bool
+            If True, arrays are stored as base64 encoded buffers with their
+            dtype and shape and the file is written without indentation.
+            This is much smaller and faster to read and write.
+            Default value is False.
+        """
         with open(file_path, "w") as file:
-            json.dump(object_dict, file, indent=2, default=skeleton_graph_encoder)
+            # json.dump writes the encoded chunks to the file as
+            # they are produced rather than building a single string
+            json.dump(self._json_object(), file, **self._json_dump_kwargs(compact))
+
+    @classmethod
+    def _from_json_object(cls, object_dict: dict) -> "SkeletonGraph":
+        """Return a SkeletonGraph from the decoded JSON representation."""
+        return cls(graph=nx.node_link_graph(object_dict["graph"], edges="edges"))
+
+    @classmethod
+    def from_json(cls, json_string: str) -> "SkeletonGraph":
+        """Return a SkeletonGraph from a JSON string made by to_json."""
+        return cls._from_json_object(
+            json.loads(json_string, object_hook=skeleton_graph_decoder)
+        )
 
     @classmethod
     def from_json_file(cls, file_path: str):
         """Return a SkeletonGraph from a JSON file."""
         with open(file_path) as file:
             object_dict = json.load(file, object_hook=skeleton_graph_decoder)
-        graph = nx.node_link_graph(object_dict["graph"], edges="edges")
-        return cls(graph=graph)
+        return cls._from_json_object(object_dict)
+
+    def to_file(self, file_path: str, block_size: int = 1024):
+        """Write the graph to an HDF5 file with a spatial index.
+
+        Unlike the JSON format, regions of the graph can be loaded
+        from the file without reading the whole graph (see from_file).
+        The nodes of the graph must be integers.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file to write.
+        block_size : int
+            The number of nodes and edges per block of the spatial index.
+            Default value is 1024.
+        """
+        write_skeleton_graph_hdf5(self.graph, file_path, block_size=block_size)
+
+    @classmethod
+    def from_file(cls, file_path: str, bbox: np.ndarray | None = None):
+        """Return a SkeletonGraph from an HDF5 file written by to_file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file to read.
+        bbox : np.ndarray | None
+            (2, d) array of the lower and upper corners of the region
+            to load. Only the edges whose bounding box intersects the
+            region, their nodes and the nodes inside the region are read.
+            If None, the whole graph is loaded. Default value is None.
+        """
+        return cls(graph=read_skeleton_graph_hdf5(file_path, bbox=bbox))
 
     @classmethod
     def from_skeleton_image(
-        cls, skeleton_image: np.ndarray, max_spline_knots: int = 10
+        cls,
+        skeleton_image: np.ndarray,
+        max_spline_knots: int = 10,
+        cache: SkeletonGraphCache | None = None,
+        dtype: DTypeLike = np.float64,
+        min_spur_length: float | None = None,
+        merge_degree_2_nodes: bool = False,
+        backend: str = "skan",
+        n_largest_components: int | None = None,
+        min_component_size: int | None = None,
+        seed_voxel: tuple[int, int, int] | None = None,
     ) -> "SkeletonGraph":
         """Return a SkeletonGraph from a skeleton image.
 
+        The connected components can be filtered with n_largest_components,
+        min_component_size and seed_voxel. A ValueError is raised if the
+        filters remove every component.
+
         Parameters
         ----------
         skeleton_image : np.ndarray
@@ -269,9 +493,140 @@ class SkeletonGraph:
             If the number of data points in the branch is less than this number,
             the spline will use n_data_points - 1 knots.
             See the splinebox Spline class docs for more information.
+        cache : SkeletonGraphCache | None
+            The on-disk cache to look up and store the result in.
+            The cache key is computed from the skeleton image,
+            the conversion parameters and the skeleplex version.
+            If None, the graph is always computed. Default value is None.
+        dtype : DTypeLike
+            The floating point type of the node coordinates, edge paths
+            and spline control points. Use np.float32 to halve the memory
+            of the graph. Default value is np.float64.
+        min_spur_length : float | None
+            Terminal branches shorter than this length are removed before
+            the splines are fit. If None, no branches are removed.
+            Default value is None.
+        merge_degree_2_nodes : bool
+            If True, the branches connected by nodes with degree 2 are merged
+            into a single edge before the splines are fit.
+            Default value is False.
+        backend : str
+            The method used to trace the branches of the skeleton.
+            "skan" uses skan (see image_to_graph_skan). "numba" uses
+            a numba branch tracer that is faster and uses less memory,
+            but merges adjacent junction voxels into a single node
+            (see image_to_graph_numba). Default value is "skan".
+        n_largest_components : int | None
+            If given, only the n_largest_components connected components
+            of the skeleton with the most voxels are converted.
+            Default value is None.
+        min_component_size : int | None
+            If given, only the connected components of the skeleton with
+            at least min_component_size voxels are converted.
+            Default value is None.
+        seed_voxel : tuple[int, int, int] | None
+            If given, only the connected component of the skeleton
+            containing this voxel is converted. Default value is None.
         """
-        graph = image_to_graph_skan(
-            skeleton_image=skeleton_image, max_spline_knots=max_spline_knots
+        if backend == "skan":
+            image_to_graph = image_to_graph_skan
+        elif backend == "numba":
+            image_to_graph = image_to_graph_numba
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        if cache is not None:
+            cache_key = skeleton_image_cache_key(
+                skeleton_image,
+                max_spline_knots=max_spline_knots,
+                dtype=np.dtype(dtype).str,
+                min_spur_length=min_spur_length,
+                merge_degree_2_nodes=merge_degree_2_nodes,
+                backend=backend,
+                n_largest_components=n_largest_components,
+                min_component_size=min_component_size,
+                seed_voxel=None if seed_voxel is None else list(seed_voxel),
+            )
+            cached_path = cache.get(cache_key)
+            if cached_path is not None:
+                logger.info(f"Loading skeleton graph from cache: {cached_path}")
+                return cls.from_json_file(cached_path)
+
+        if (
+            n_largest_components is not None
+            or min_component_size is not None
+            or seed_voxel is not None
+        ):
+            # remove the unwanted components before tracing the branches
+            skeleton_image = filter_skeleton_components(
+                skeleton_image,
+                n_largest=n_largest_components,
+                min_size=min_component_size,
+                seed_voxel=seed_voxel,
+            )
+            if not skeleton_image.any():
+                raise ValueError(
+                    "No skeleton component is left after filtering with "
+                    f"n_largest_components={n_largest_components}, "
+                    f"min_component_size={min_component_size} and "
+                    f"seed_voxel={seed_voxel}."
+                )
+
+        graph = image_to_graph(
+            skeleton_image=skeleton_image,
+            max_spline_knots=max_spline_knots,
+            dtype=dtype,
+            min_spur_length=min_spur_length,
+            merge_degree_2_nodes=merge_degree_2_nodes,
+        )
+        skeleton_graph = cls(graph=graph)
+
+        if cache is not None:
+            cache.put(cache_key, partial(skeleton_graph.to_json_file, compact=True))
+        return skeleton_graph
+
+    @classmethod
+    def from_skeleton_coordinates(
+        cls,
+        skeleton_coordinates,
+        max_spline_knots: int = 10,
+        dtype: DTypeLike = np.float64,
+        min_spur_length: float | None = None,
+        merge_degree_2_nodes: bool = False,
+    ) -> "SkeletonGraph":
+        """Return a SkeletonGraph from the voxel coordinates of a skeleton.
+
+        Unlike from_skeleton_image, no dense image is needed, so the
+        memory scales with the number of skeleton voxels rather than
+        with the size of the volume.
+
+        Parameters
+        ----------
+        skeleton_coordinates : np.ndarray
+            (n_voxels, 3) array of the integer coordinates of the skeleton
+            voxels or a sparse COO array of the skeleton image.
+        max_spline_knots : int
+            The maximum number of knots to use for the spline fit to the branch path.
+            If the number of data points in the branch is less than this number,
+            the spline will use n_data_points - 1 knots.
+        dtype : DTypeLike
+            The floating point type of the node coordinates, edge paths
+            and spline control points. Default value is np.float64.
+        min_spur_length : float | None
+            Terminal branches shorter than this length are removed before
+            the splines are fit. If None, no branches are removed.
+            Default value is None.
+        merge_degree_2_nodes : bool
+            If True, the branches connected by nodes with degree 2 are merged
+            into a single edge before the splines are fit.
+            Default value is False.
+        """
+        graph = coordinates_to_graph(
+            skeleton_coordinates,
+            max_spline_knots=max_spline_knots,
+            dtype=dtype,
+            min_spur_length=min_spur_length,
+            merge_degree_2_nodes=merge_degree_2_nodes,
         )
         return cls(graph=graph)
 
@@ -286,6 +641,108 @@ class SkeletonGraph:
         else:
             return True
 
+    def _edge_fingerprint_key(self, edge: tuple) -> tuple:
+        """Return the cache key of an edge independent of its orientation."""
+        if self.graph.is_directed():
+            return tuple(edge)
+        start_node, end_node, *edge_key = edge
+        return (*sorted((start_node, end_node), key=repr), *edge_key)
+
+    def fingerprint(self) -> str:
+        """Return a content hash of the graph.
+
+        The hash is computed from the raw node coordinates, edge paths,
+        spline control points and all other node and edge attributes.
+        The digests of the individual nodes and edges are cached together
+        with their attribute dictionaries, so after a local change only
+        the modified nodes and edges are hashed again. Nodes and edges
+        that are added, removed or re-added are detected automatically.
+        If the attributes of nodes or edges are modified in place,
+        call invalidate_fingerprint with the modified elements.
+
+        Returns
+        -------
+        str
+            The hexadecimal digest of the graph content.
+        """
+        digests = []
+        current_nodes = {}
+        for node, node_data in self.graph.nodes(data=True):
+            cached_data, digest = self._node_fingerprints.get(node, (None, None))
+            if cached_data is not node_data:
+                hasher = new_hasher()
+                hasher.update(f"node:{node!r}".encode())
+                update_hash(hasher, node_data)
+                digest = hasher.digest()
+            current_nodes[node] = (node_data, digest)
+            digests.append(digest)
+
+        current_edges = {}
+        if self.graph.is_multigraph():
+            edges = self.graph.edges(keys=True, data=True)
+        else:
+            edges = self.graph.edges(data=True)
+        for *edge, edge_data in edges:
+            edge_key = self._edge_fingerprint_key(edge)
+            cached_data, digest = self._edge_fingerprints.get(edge_key, (None, None))
+            if cached_data is not edge_data:
+                hasher = new_hasher()
+                hasher.update(f"edge:{edge_key!r}".encode())
+                update_hash(hasher, edge_data)
+                digest = hasher.digest()
+            current_edges[edge_key] = (edge_data, digest)
+            digests.append(digest)
+
+        # the digests are stored with a reference to the attribute dictionary
+        # they were computed from, so an element that is removed and added
+        # again gets a new dictionary and is hashed again. Keeping the
+        # reference (rather than its id) prevents the id from being reused.
+        # Only the digests of elements that are still in the graph are kept.
+        self._node_fingerprints = current_nodes
+        self._edge_fingerprints = current_edges
+
+        # the combined digest does not depend on the iteration order
+        hasher = new_hasher()
+        hasher.update(
+            f"{self._backend}:{type(self.graph).__name__}".encode(),
+        )
+        for digest in sorted(digests):
+            hasher.update(digest)
+        return hasher.hexdigest()
+
+    def invalidate_fingerprint(
+        self, nodes: list | None = None, edges: list[tuple] | None = None
+    ) -> None:
+        """Remove cached digests so they are recomputed by fingerprint.
+
+        Parameters
+        ----------
+        nodes : list | None
+            The nodes that have been modified.
+        edges : list[tuple] | None
+            The edges that have been modified. For multigraphs, edges
+            given without a key invalidate all edges between the nodes.
+            If both nodes and edges are None, the whole cache is cleared.
+        """
+        if nodes is None and edges is None:
+            self._node_fingerprints = {}
+            self._edge_fingerprints = {}
+            return
+
+        for node in nodes or []:
+            self._node_fingerprints.pop(node, None)
+
+        for edge in edges or []:
+            edge_key = self._edge_fingerprint_key(edge)
+            if self.graph.is_multigraph() and len(edge) == 2:
+                self._edge_fingerprints = {
+                    cached_key: cached
+                    for cached_key, cached in self._edge_fingerprints.items()
+                    if cached_key[:2] != edge_key
+                }
+            else:
+                self._edge_fingerprints.pop(edge_key, None)
+
     def to_directed(self, origin: int) -> nx.DiGraph:
         """Return a directed graph from the skeleton graph.
 
@@ -304,3 +761,240 @@ class SkeletonGraph:
         """Orient the splines in the graph."""
         self.graph = orient_splines(self.graph)
         return self.graph
+
+    def split_edge(self, edge: tuple, position: float, atol: float = 1e-2):
+        """Split an edge in two by inserting a node.
+
+        The spline of the edge is cut with B3Spline.split, so the two new
+        splines trace the original curve without refitting. The path is
+        cut at the path point closest to the new node. The other edge
+        attributes are copied to both new edges without being recomputed.
+        The graph is modified in place.
+
+        Parameters
+        ----------
+        edge : tuple
+            The (start_node, end_node) edge to split. For multigraphs,
+            the edge key can be given as the third element. It can be
+            omitted if there is only one edge between the nodes.
+        position : float
+            The position of the new node along the edge from the start
+            node to the end node, normalized to the range (0, 1).
+        atol : float
+            The maximum distance of the new node from the requested position
+            in normalized arc length. Default value is 1e-2.
+
+        Returns
+        -------
+        int
+            The key of the new node.
+        """
+        start_node, end_node, *edge_key = edge
+        if not self.graph.has_edge(start_node, end_node, *edge_key):
+            raise ValueError(f"The edge {edge} is not in the graph.")
+        if self.graph.is_multigraph():
+            if len(edge_key) == 0:
+                edge_keys = list(self.graph[start_node][end_node])
+                if len(edge_keys) > 1:
+                    raise ValueError(
+                        f"There are {len(edge_keys)} edges between {start_node} "
+                        f"and {end_node}. Give the key of the edge to split."
+                    )
+                edge_key = edge_keys
+            edge = (start_node, end_node, *edge_key)
+        edge_data = self.graph.edges[edge]
+        spline = edge_data[EDGE_SPLINE_KEY]
+        start_coordinate = np.asarray(self.graph.nodes[start_node][NODE_COORDINATE_KEY])
+        end_coordinate = np.asarray(self.graph.nodes[end_node][NODE_COORDINATE_KEY])
+
+        # check if the spline runs from the end node to the start node
+        spline_ends = spline.eval(np.array([0.0, 1.0]))
+        spline_is_reversed = np.linalg.norm(
+            spline_ends - [end_coordinate, start_coordinate]
+        ) < np.linalg.norm(spline_ends - [start_coordinate, end_coordinate])
+        first_spline, second_spline = spline.split(
+            1 - position if spline_is_reversed else position, atol=atol
+        )
+        new_coordinate = first_spline.model.eval(
+            float(first_spline.model.M - 1)
+        ).astype(start_coordinate.dtype)
+
+        other_edge_data = {
+            key: value
+            for key, value in edge_data.items()
+            if key not in (EDGE_SPLINE_KEY, EDGE_COORDINATES_KEY)
+        }
+        new_edge_data = [
+            {**other_edge_data, EDGE_SPLINE_KEY: first_spline},
+            {**other_edge_data, EDGE_SPLINE_KEY: second_spline},
+        ]
+        if EDGE_COORDINATES_KEY in edge_data:
+            path = np.asarray(edge_data[EDGE_COORDINATES_KEY])
+            path_is_reversed = np.linalg.norm(
+                path[0] - spline_ends[0]
+            ) > np.linalg.norm(path[-1] - spline_ends[0])
+            spline_path = path[::-1] if path_is_reversed else path
+            cut_index = int(
+                np.argmin(np.linalg.norm(spline_path - new_coordinate, axis=1))
+            )
+            for piece_data, piece_path in zip(
+                new_edge_data,
+                (spline_path[: cut_index + 1], spline_path[cut_index:]),
+                strict=True,
+            ):
+                # keep the orientation of the original path
+                piece_data[EDGE_COORDINATES_KEY] = (
+                    piece_path[::-1] if path_is_reversed else piece_path
+                )
+        if spline_is_reversed:
+            new_edge_data = new_edge_data[::-1]
+
+        new_node = get_next_node_key(self.graph)
+        self.graph.add_node(new_node, **{NODE_COORDINATE_KEY: new_coordinate})
+        self.graph.remove_edge(start_node, end_node, *edge_key)
+        new_edges = [(start_node, new_node), (new_node, end_node)]
+        for new_edge, data in zip(new_edges, new_edge_data, strict=True):
+            self.graph.add_edge(*new_edge, **data)
+        self.invalidate_fingerprint(nodes=[new_node], edges=[edge, *new_edges])
+        return new_node
+
+    def compute_tree_metrics(self, force: bool = False) -> None:
+        """Compute the tree-order metrics of the directed graph.
+
+        The generation, Horton-Strahler order, subtree size and path
+        length to the root are computed in linear time for all nodes and
+        edges and stored as node and edge attributes (see
+        skeleplex.graph.tree.compute_tree_metrics). The edge lengths are
+        the arc lengths of the edge splines.
+
+        The metrics are only recomputed when the fingerprint of the graph
+        has changed since the last call, for example because nodes or edges
+        have been added, removed or replaced. Use force=True after modifying
+        attributes in place without calling invalidate_fingerprint.
+
+        Parameters
+        ----------
+        force : bool
+            If True, recompute the metrics even if they are cached.
+            Default value is False.
+        """
+        if not force and self.fingerprint() == self._tree_metrics_signature:
+            return
+
+        # imported here because skeleplex.measure depends on skeleplex.graph
+        from skeleplex.measure.morphometrics import spline_lengths
+
+        edges = list(self.graph.edges(data=EDGE_SPLINE_KEY))
+        lengths = spline_lengths([spline for *_, spline in edges])
+        edge_lengths = {
+            (start_node, end_node): float(length)
+            for (start_node, end_node, _), length in zip(edges, lengths, strict=True)
+        }
+        node_metrics, edge_metrics = compute_tree_metrics(self.graph, edge_lengths)
+        nx.set_node_attributes(self.graph, node_metrics)
+        nx.set_edge_attributes(self.graph, edge_metrics)
+
+        # the signature is taken after the metrics are stored,
+        # so writing the metrics does not invalidate it
+        self.invalidate_fingerprint()
+        self._tree_metrics_signature = self.fingerprint()
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """Return the memory used by the skeleton graph in bytes.
+
+        Parameters
+        ----------
+        deep : bool
+            If False, arrays are counted by the size of their data and
+            other values by the size of the object itself. If True, the
+            Python objects are followed recursively, including the
+            internals of the splinebox spline models. Default value is False.
+
+        Returns
+        -------
+        dict
+            The memory usage with the keys:
+                - "topology": the networkx dictionaries storing the nodes,
+                  the adjacency and the attribute dictionaries.
+                - "node_coordinates": the node coordinates.
+                - "node_attributes": the other node attributes.
+                - "edge_paths": the edge paths.
+                - "splines": the edge splines.
+                - "edge_attributes": the other edge attributes.
+                - "cached": the cached fingerprint digests.
+                - "total": the sum of all of the above.
+                - "per_edge": (n_edges,) array of the memory of the
+                  path, spline and other attributes of each edge.
+        """
+        graph = self.graph
+        seen = set()
+
+        # the networkx graph is a dictionary of dictionaries
+        # (see the networkx docs on the graph data structure)
+        adjacencies = [graph._adj]
+        if graph.is_directed():
+            adjacencies.append(graph._pred)
+        dictionaries = [graph._node, graph.graph, *adjacencies]
+        for adjacency in adjacencies:
+            for neighbors in adjacency.values():
+                dictionaries.append(neighbors)
+                if graph.is_multigraph():
+                    dictionaries.extend(neighbors.values())
+        # undirected graphs share the dictionaries of both edge directions
+        unique_dictionaries = {id(item): item for item in dictionaries}
+        topology = sum(map(sys.getsizeof, unique_dictionaries.values()))
+
+        node_coordinates = 0
+        node_attributes = 0
+        for node_data in graph._node.values():
+            topology += sys.getsizeof(node_data)
+            for name, value in node_data.items():
+                size = _sizeof(value, deep, seen)
+                if name == NODE_COORDINATE_KEY:
+                    node_coordinates += size
+                else:
+                    node_attributes += size
+
+        per_edge = []
+        edge_paths = 0
+        splines = 0
+        edge_attributes = 0
+        for *_, edge_data in graph.edges(data=True):
+            topology += sys.getsizeof(edge_data)
+            edge_size = 0
+            for name, value in edge_data.items():
+                size = _sizeof(value, deep, seen)
+                if name == EDGE_COORDINATES_KEY:
+                    edge_paths += size
+                elif name == EDGE_SPLINE_KEY:
+                    if not deep:
+                        size = value.model.control_points.nbytes
+                    splines += size
+                else:
+                    edge_attributes += size
+                edge_size += size
+            per_edge.append(edge_size)
+
+        # the cache references the attribute dictionaries counted above,
+        # so only the cache dictionaries and the digests are counted
+        cached = 0
+        for cache in (self._node_fingerprints, self._edge_fingerprints):
+            cached += sys.getsizeof(cache)
+            for cache_key, (_, digest) in cache.items():
+                cached += (
+                    _sizeof(cache_key, deep=True)
+                    + sys.getsizeof((None, None))
+                    + sys.getsizeof(digest)
+                )
+        usage = {
+            "topology": topology,
+            "node_coordinates": node_coordinates,
+            "node_attributes": node_attributes,
+            "edge_paths": edge_paths,
+            "splines": splines,
+            "edge_attributes": edge_attributes,
+            "cached": cached,
+        }
+        usage["total"] = sum(usage.values())
+        usage["per_edge"] = np.array(per_edge, dtype=np.int64)
+        return usage
@@ -4,10 +4,220 @@ import json
 
 import numpy as np
 import splinebox
+from numpy.typing import DTypeLike
 from scipy.spatial.transform import Rotation
 from splinebox.spline_curves import _prepared_dict_for_constructor
 
+from skeleplex.graph.fingerprint import new_hasher, update_hash
 from skeleplex.graph.sample import generate_2d_grid, sample_volume_at_coordinates
+from skeleplex.graph.serialization import decode_array, encode_array, is_encoded_array
+from skeleplex.graph.volume import ChunkedVolumeReader
+
+
+def b3_basis_matrix(t: np.ndarray, n_knots: int, derivative: int = 0) -> np.ndarray:
+    """Return the B3 basis function values for an open spline.
+
+    Multiplying the returned matrix with the (n_knots + 2, d) control points
+    of an open B3 spline evaluates the spline at the parameter values t.
+
+    Parameters
+    ----------
+    t : np.ndarray
+        (n,) array of parameter values in the range [0, n_knots - 1].
+    n_knots : int
+        The number of knots of the spline.
+    derivative : int
+        The order of the derivative to evaluate.
+        Default value is 0.
+
+    Returns
+    -------
+    np.ndarray
+        (n, n_knots + 2) array of basis function values.
+    """
+    # open splines are padded with one basis function at each end
+    knot_indices = np.arange(-1, n_knots + 1)
+    t = np.asarray(t, dtype=float)
+    return splinebox.B3().eval(
+        t[:, np.newaxis] - knot_indices[np.newaxis, :], derivative=derivative
+    )
+
+
+def group_splines_by_knots(splines: list["B3Spline"]) -> dict[int, np.ndarray]:
+    """Group splines by their number of knots.
+
+    Splines with the same number of knots share their basis matrices,
+    so they can be evaluated together.
+
+    Parameters
+    ----------
+    splines : list[B3Spline]
+        The splines to group.
+
+    Returns
+    -------
+    dict[int, np.ndarray]
+        Mapping of the number of knots to the indices of the splines
+        with that number of knots.
+    """
+    n_knots = np.array([spline.model.M for spline in splines], dtype=int)
+    return {int(n): np.flatnonzero(n_knots == n) for n in np.unique(n_knots).tolist()}
+
+
+def eval_splines(
+    splines: list["B3Spline"], positions: np.ndarray, derivative: int = 0
+) -> np.ndarray:
+    """Evaluate many splines at the same set of positions.
+
+    Unlike B3Spline.eval, the positions are normalized to the parameter
+    range of each spline rather than to its arc length. This allows all
+    splines with the same number of knots to be evaluated with a single
+    matrix product. Derivatives are taken with respect to the normalized
+    parameter.
+
+    Parameters
+    ----------
+    splines : list[B3Spline]
+        The splines to evaluate. All splines must be open and
+        have the same number of dimensions.
+    positions : np.ndarray
+        (n,) array of positions to evaluate the splines at.
+        The positions are normalized to the range [0, 1].
+    derivative : int
+        The order of the derivative to evaluate.
+        Default value is 0.
+
+    Returns
+    -------
+    np.ndarray
+        (n_splines, n, d) array of the evaluated splines.
+    """
+    positions = np.asarray(positions, dtype=float)
+    if len(splines) == 0:
+        return np.empty((0, len(positions), 0))
+    if any(spline.model.closed for spline in splines):
+        raise ValueError("Batched evaluation is only supported for open splines.")
+
+    n_dims = splines[0].model.control_points.shape[1]
+    dtype = np.result_type(*(spline.dtype for spline in splines))
+    values = np.empty((len(splines), len(positions), n_dims), dtype=dtype)
+    for n_knots, spline_indices in group_splines_by_knots(splines).items():
+        basis = b3_basis_matrix(
+            positions * (n_knots - 1), n_knots=n_knots, derivative=derivative
+        )
+        # chain rule for the normalized parameter
+        basis *= (n_knots - 1) ** derivative
+        control_points = np.stack(
+            [splines[index].model.control_points for index in spline_indices]
+        )
+        values[spline_indices] = basis @ control_points
+    return values
+
+
+def fit_b3_splines(
+    points_list: list[np.ndarray],
+    n_knots: int | list[int],
+    dtype: DTypeLike | None = None,
+) -> list["B3Spline"]:
+    """Fit open B3 splines to many point sequences at once.
+
+    This gives the same splines as calling B3Spline.from_points for each
+    point sequence. The least-squares design matrix only depends on the
+    number of knots and the number of points, so the point sequences are
+    grouped by both and each group is solved with a single pseudo-inverse
+    and one batched matrix product.
+
+    Parameters
+    ----------
+    points_list : list[np.ndarray]
+        The (n, d) arrays of points to fit the splines to.
+        The points must be ordered in the positive t direction
+        of the splines.
+    n_knots : int | list[int]
+        The number of knots of all splines or of each spline.
+    dtype : DTypeLike | None
+        The floating point type of the spline control points.
+        The fits are always computed in double precision.
+        If None, the type of the points is used if they are floating
+        point numbers and np.float64 otherwise. Default value is None.
+
+    Returns
+    -------
+    list[B3Spline]
+        The fitted splines in the order of points_list.
+    """
+    points_list = [np.asarray(points) for points in points_list]
+    if isinstance(n_knots, int | np.integer):
+        n_knots = [n_knots] * len(points_list)
+    if len(n_knots) != len(points_list):
+        raise ValueError("The number of knots must be given for each spline.")
+
+    groups = {}
+    for spline_index, (points, spline_n_knots) in enumerate(
+        zip(points_list, n_knots, strict=True)
+    ):
+        if len(points) < spline_n_knots:
+            raise ValueError(
+                f"Spline {spline_index} has fewer points ({len(points)}) "
+                f"than knots ({spline_n_knots})."
+            )
+        groups.setdefault((int(spline_n_knots), len(points)), []).append(spline_index)
+
+    splines = [None] * len(points_list)
+    for (group_n_knots, n_points), spline_indices in groups.items():
+        basis = b3_basis_matrix(
+            np.linspace(0, group_n_knots - 1, n_points), n_knots=group_n_knots
+        )
+        points = np.stack(
+            [
+                points_list[index].astype(np.float64, copy=False)
+                for index in spline_indices
+            ]
+        )
+        control_points = np.linalg.pinv(basis) @ points
+        for spline_index, spline_control_points in zip(
+            spline_indices, control_points, strict=True
+        ):
+            spline_dtype = dtype
+            if spline_dtype is None:
+                points_dtype = points_list[spline_index].dtype
+                spline_dtype = points_dtype if points_dtype.kind == "f" else np.float64
+            model = splinebox.Spline(
+                M=group_n_knots, basis_function=splinebox.B3(), closed=False
+            )
+            model.control_points = spline_control_points.astype(spline_dtype)
+            splines[spline_index] = B3Spline(model=model)
+    return splines
+
+
+def subdivide_b3_control_points(control_points: np.ndarray) -> np.ndarray:
+    """Insert a knot in the middle of every knot interval of an open B3 spline.
+
+    This is the uniform subdivision of a cubic B-spline. The refined spline
+    has 2 * M - 1 knots and traces exactly the same curve, where the
+    parameter t of the original spline corresponds to 2 * t.
+
+    Parameters
+    ----------
+    control_points : np.ndarray
+        (M + 2, d) array of the control points of an open spline with M knots.
+
+    Returns
+    -------
+    np.ndarray
+        (2 * M + 1, d) array of the control points of the refined spline.
+    """
+    n_control_points = len(control_points)
+    refined = np.empty(
+        (2 * n_control_points - 3, *control_points.shape[1:]),
+        dtype=np.result_type(control_points, np.float64),
+    )
+    # new control points at the knots and between the knots
+    refined[1::2] = (
+        control_points[:-2] + 6 * control_points[1:-1] + control_points[2:]
+    ) / 8
+    refined[0::2] = (control_points[:-1] + control_points[1:]) / 2
+    return refined
 
 
 class B3Spline:
@@ -29,6 +239,15 @@ class B3Spline:
         """Return the underlying spline model."""
         return self._model
 
+    @property
+    def dtype(self) -> np.dtype:
+        """Return the floating point type of the spline.
+
+        This is the type of the control points.
+        Evaluations of the spline are returned with this type.
+        """
+        return self.model.control_points.dtype
+
     @property
     def arc_length(self) -> float:
         """Return the arc length of the spline."""
@@ -44,6 +263,8 @@ class B3Spline:
         positions : np.ndarray
             (n,) array of positions to evaluate the spline at.
             The positions are normalized to the range [0, 1].
+            A single position can be given as a scalar, in which case
+            the position axis is omitted from the result.
         derivative : int
             The order of the derivative to evaluate.
             Default value is 0.
@@ -52,11 +273,18 @@ class B3Spline:
             evaluation positions to positions along the spline.
             Default value is 1e-6.
         """
+        positions = np.asarray(positions, dtype=float)
         # convert the normalized arc length coordinates to t
-        positions_t = self.model.arc_length_to_parameter(
-            positions * self.arc_length, atol=atol
+        positions_t = np.atleast_1d(
+            self.model.arc_length_to_parameter(
+                positions.reshape(-1) * self.arc_length, atol=atol
+            )
         )
-        return self.model.eval(positions_t, derivative=derivative)
+        values = self.model.eval(positions_t, derivative=derivative)
+        # splinebox drops the position axis for a single position
+        return values.reshape(
+            positions.shape + self.model.control_points.shape[1:]
+        ).astype(self.dtype, copy=False)
 
     def moving_frame(
         self, positions: np.ndarray, method: str = "bishop", atol: float = 1e-6
@@ -68,6 +296,8 @@ class B3Spline:
         positions : np.ndarray
             (n,) array of positions to evaluate the spline at.
             The positions are normalized to the range [0, 1].
+            A single position can be given as a scalar, in which case
+            the position axis is omitted from the result.
         method : str
             The method to use for generating the moving frame.
             Default value is "bishop".
@@ -76,33 +306,44 @@ class B3Spline:
             evaluation positions to positions along the spline.
             Default value is 1e-6.
         """
+        positions = np.asarray(positions, dtype=float)
         # convert the normalized arc length coordinates to t
-        positions_t = self.model.arc_length_to_parameter(
-            positions * self.arc_length, atol=atol
+        positions_t = np.atleast_1d(
+            self.model.arc_length_to_parameter(
+                positions.reshape(-1) * self.arc_length, atol=atol
+            )
+        )
+        if len(positions_t) == 1:
+            # splinebox needs two positions to compute a moving frame.
+            # the frame at the first position does not depend on the others.
+            frames = self.model.moving_frame(np.repeat(positions_t, 2), method=method)
+            frames = frames[:1]
+        else:
+            frames = self.model.moving_frame(positions_t, method=method)
+        return frames.reshape(positions.shape + frames.shape[1:]).astype(
+            self.dtype, copy=False
         )
-        return self.model.moving_frame(positions_t, method=method)
 
-    def sample_volume_2d(
+    def sample_grid_2d(
         self,
-        volume: np.ndarray,
         positions: np.ndarray,
         grid_shape: tuple[int, int] = (10, 10),
         grid_spacing: tuple[float, float] = (1, 1),
         moving_frame_method: str = "bishop",
-        sample_interpolation_order: int = 3,
-        sample_fill_value: float = np.nan,
-    ):
-        """Sample a 3D image with 2D planes normal to the spline at specified positions.
+    ) -> np.ndarray:
+        """Return the coordinates of 2D grids normal to the spline.
+
+        These are the coordinates sampled by sample_volume_2d. They can
+        be used to plan which parts of a volume are needed before sampling
+        (see skeleplex.graph.volume.ChunkedVolumeReader).
 
         Parameters
         ----------
-        volume : np.ndarray
-            3D image to sample.
         positions : np.ndarray
-            (n,) array of positions to evaluate the spline at.
+            (n,) array of positions to place the grids at.
             The positions are normalized to the range [0, 1].
         grid_shape : tuple[int, int]
-            The number of pixels along each axis of the resulting 2D image.
+            The number of points along each axis of the grids.
             Default value is (10, 10).
         grid_spacing : tuple[float, float]
             Spacing between points in the sampling grid.
@@ -110,12 +351,11 @@ class B3Spline:
         moving_frame_method : str
             The method to use for generating the moving frame.
             Default value is "bishop".
-        sample_interpolation_order : int
-            The order of the spline interpolation to use when sampling the image.
-            Default value is 3.
-        sample_fill_value : float
-            The fill value to use when sampling the image outside
-            the bounds of the array. Default value is np.nan.
+
+        Returns
+        -------
+        np.ndarray
+            (n, *grid_shape, 3) array of the grid coordinates.
         """
         moving_frame = self.moving_frame(
             positions=positions, method=moving_frame_method
@@ -124,7 +364,7 @@ class B3Spline:
         # generate the grid of points for sampling the image
         # (shape (w, h, 3))
         sampling_grid = generate_2d_grid(
-            grid_shape=grid_shape, grid_spacing=(grid_spacing, grid_spacing)
+            grid_shape=grid_shape, grid_spacing=grid_spacing, dtype=self.dtype
         )
 
         # reshape the sampling grid to be a list of coordinates
@@ -139,16 +379,69 @@ class B3Spline:
 
         # get the coordinates of the points on the spline to center
         # the sampling grid for the 2D image.
-        sample_centroid_coordinates = positions = self.eval(positions=positions)
+        sample_centroid_coordinates = self.eval(positions=positions)
 
         # shift the rotated points to be centered on the spline
-        rotated_shifted = np.stack(rotated, axis=1) + sample_centroid_coordinates
-        placed_sample_grids = rotated_shifted.reshape(-1, *sampling_grid.shape)
+        # (shape (n_positions, w * h, 3))
+        rotated_shifted = (
+            np.stack(rotated, axis=0) + sample_centroid_coordinates[:, np.newaxis]
+        )
+        return rotated_shifted.reshape(-1, *sampling_grid.shape).astype(
+            self.dtype, copy=False
+        )
+
+    def sample_volume_2d(
+        self,
+        volume: np.ndarray | ChunkedVolumeReader,
+        positions: np.ndarray,
+        grid_shape: tuple[int, int] = (10, 10),
+        grid_spacing: tuple[float, float] = (1, 1),
+        moving_frame_method: str = "bishop",
+        sample_interpolation_order: int = 3,
+        sample_fill_value: float = np.nan,
+        sample_dtype: DTypeLike | None = None,
+    ):
+        """Sample a 3D image with 2D planes normal to the spline at specified positions.
+
+        Parameters
+        ----------
+        volume : np.ndarray | ChunkedVolumeReader
+            3D image to sample. Volumes on disk can be wrapped in a
+            ChunkedVolumeReader to only read the chunks around the spline.
+        positions : np.ndarray
+            (n,) array of positions to evaluate the spline at.
+            The positions are normalized to the range [0, 1].
+        grid_shape : tuple[int, int]
+            The number of pixels along each axis of the resulting 2D image.
+            Default value is (10, 10).
+        grid_spacing : tuple[float, float]
+            Spacing between points in the sampling grid.
+            Default value is (1, 1).
+        moving_frame_method : str
+            The method to use for generating the moving frame.
+            Default value is "bishop".
+        sample_interpolation_order : int
+            The order of the spline interpolation to use when sampling the image.
+            Default value is 3.
+        sample_fill_value : float
+            The fill value to use when sampling the image outside
+            the bounds of the array. Default value is np.nan.
+        sample_dtype : DTypeLike | None
+            The type of the sampled values. If None, the dtype of the
+            volume is used. Default value is None.
+        """
+        placed_sample_grids = self.sample_grid_2d(
+            positions=positions,
+            grid_shape=grid_shape,
+            grid_spacing=grid_spacing,
+            moving_frame_method=moving_frame_method,
+        )
         return sample_volume_at_coordinates(
             volume=volume,
             coordinates=placed_sample_grids,
             interpolation_order=sample_interpolation_order,
             fill_value=sample_fill_value,
+            dtype=sample_dtype,
         )
 
     def __eq__(self, other_object) -> bool:
@@ -157,24 +450,66 @@ class B3Spline:
             return False
         return self.model == other_object.model
 
-    def to_json_dict(self) -> dict:
-        """Return a JSON serializable dictionary."""
+    def fingerprint(self) -> str:
+        """Return a content hash of the spline.
+
+        The hash is computed from the raw control point array and the
+        spline parameters, so two splines have the same fingerprint
+        if and only if they describe the same curve representation.
+
+        Returns
+        -------
+        str
+            The hexadecimal digest of the spline content.
+        """
+        hasher = new_hasher()
+        hasher.update(
+            f"{self._backend}:{self.model.basis_function}:"
+            f"{self.model.M}:{self.model.closed}".encode()
+        )
+        update_hash(hasher, self.model.control_points)
+        return hasher.hexdigest()
+
+    def to_json_dict(self, compact: bool = False) -> dict:
+        """Return a JSON serializable dictionary.
+
+        Parameters
+        ----------
+        compact : bool
+            If True, the control points are stored as a base64 encoded
+            buffer instead of a nested list of floats.
+            Default value is False.
+        """
         spline_model_dict = self.model._to_dict(version=2)
         if "__class__" in spline_model_dict:
             raise ValueError(
                 "The Spline object to encode already has a '__class__' key."
             )
+        if compact:
+            spline_model_dict["control_points"] = encode_array(
+                self.model.control_points
+            )
         spline_model_dict.update({"__class__": "splinebox.Spline"})
         return {
             "__class__": "skeleplex.B3Spline",
             "model": spline_model_dict,
             "backend": self._backend,
+            "dtype": self.dtype.str,
         }
 
-    def to_json_file(self, file_path: str) -> None:
-        """Save the spline to a JSON file."""
+    def to_json_file(self, file_path: str, compact: bool = False) -> None:
+        """Save the spline to a JSON file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file to write.
+        compact : bool
+            If True, the control points are stored as a base64 encoded
+            buffer. Default value is False.
+        """
         with open(file_path, "w") as file:
-            json.dump(self.to_json_dict(), file)
+            json.dump(self.to_json_dict(compact=compact), file)
 
     @classmethod
     def from_json_dict(cls, json_dict: dict) -> "B3Spline":
@@ -186,15 +521,28 @@ class B3Spline:
 
         # load the spline model
         spline_model_dict = json_dict["model"]
+        # files written before the dtype was stored are float64
+        dtype = np.dtype(json_dict.get("dtype", np.float64))
 
         if isinstance(spline_model_dict, splinebox.Spline):
             # model has already been deserialized
             # this can happen if a this is being called
             # within another JSON decoder.
+            spline_model_dict.control_points = spline_model_dict.control_points.astype(
+                dtype, copy=False
+            )
             return cls(model=spline_model_dict)
 
         spline_model_dict.pop("__class__")
+        if is_encoded_array(spline_model_dict["control_points"]):
+            # control points written in the compact format
+            spline_model_dict["control_points"] = decode_array(
+                spline_model_dict["control_points"]
+            )
         spline_kwargs = _prepared_dict_for_constructor(spline_model_dict)
+        spline_kwargs["control_points"] = spline_kwargs["control_points"].astype(
+            dtype, copy=False
+        )
         spline_model = splinebox.Spline(**spline_kwargs)
 
         # make the class
@@ -208,7 +556,9 @@ class B3Spline:
         return cls.from_json_dict(json_dict)
 
     @classmethod
-    def from_points(cls, points: np.ndarray, n_knots: int = 4):
+    def from_points(
+        cls, points: np.ndarray, n_knots: int = 4, dtype: DTypeLike | None = None
+    ):
         """Construct a B3 spline fit to a list of points.
 
         Parameters
@@ -219,14 +569,144 @@ class B3Spline:
             of the spline.
         n_knots : int
             The number of knots to use in the spline.
+        dtype : DTypeLike | None
+            The floating point type of the spline control points.
+            The fit is always computed in double precision.
+            If None, the type of the points is used if they are floating
+            point numbers and np.float64 otherwise. Default value is None.
         """
+        points = np.asarray(points)
+        if dtype is None:
+            dtype = points.dtype if points.dtype.kind == "f" else np.float64
+
         basis_function = splinebox.B3()
         spline = splinebox.Spline(
             M=n_knots, basis_function=basis_function, closed=False
         )
-        spline.fit(points)
+        spline.fit(points.astype(np.float64, copy=False))
+        spline.control_points = spline.control_points.astype(dtype, copy=False)
         return cls(model=spline)
 
+    def _refine_at_positions(
+        self, positions: np.ndarray, atol: float, max_refinements: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Refine the knots until there are knots close to the positions.
+
+        Returns the refined control points and the index of the knot
+        closest to each position.
+        """
+        if self.model.closed:
+            raise ValueError("Only open splines can be cut.")
+        positions = np.asarray(positions, dtype=float)
+        if np.any(np.diff(positions) <= 0) or positions[0] < 0 or positions[-1] > 1:
+            raise ValueError("The positions must be increasing and in [0, 1].")
+
+        arc_length = self.arc_length
+        positions_t = self.model.arc_length_to_parameter(
+            positions * arc_length, atol=1e-6
+        )
+        control_points = self.model.control_points.astype(np.float64)
+        support = self.model.basis_function.support
+        for level in range(max_refinements + 1):
+            if level > 0:
+                control_points = subdivide_b3_control_points(control_points)
+            knot_indices = np.round(positions_t * 2**level).astype(int)
+            if np.any(np.diff(knot_indices) < support - 1):
+                # each piece needs at least as many knots as the basis support
+                continue
+            snapped_positions = (
+                np.atleast_1d(self.model.arc_length(stop=knot_indices / 2**level))
+                / arc_length
+            )
+            if np.all(np.abs(snapped_positions - positions) <= atol):
+                return control_points, knot_indices
+        raise ValueError(
+            f"The positions could not be reached within {atol} "
+            f"after {max_refinements} refinements."
+        )
+
+    def _piece(
+        self, control_points: np.ndarray, start_knot: int, end_knot: int
+    ) -> "B3Spline":
+        """Return the piece of a refined spline between two knots."""
+        model = splinebox.Spline(
+            M=end_knot - start_knot + 1,
+            basis_function=splinebox.B3(),
+            closed=False,
+            # the control points c[start_knot - 1] to c[end_knot + 1]
+            # shifted by the padding of one control point
+            control_points=control_points[start_knot : end_knot + 3].astype(self.dtype),
+        )
+        return B3Spline(model=model)
+
+    def subsegment(
+        self, start: float, end: float, atol: float = 1e-2, max_refinements: int = 12
+    ) -> "B3Spline":
+        """Return the part of the spline between two positions.
+
+        The knots of the spline are refined by uniform subdivision, which
+        does not change the curve, until there are knots within atol of
+        the start and end positions. The control points between these knots
+        describe the subsegment exactly, so no new fit is needed. Each
+        refinement doubles the number of knots.
+
+        Parameters
+        ----------
+        start : float
+            The start position normalized to the range [0, 1].
+        end : float
+            The end position normalized to the range [0, 1].
+        atol : float
+            The maximum distance of the ends of the subsegment from the
+            requested positions in normalized arc length. Default value is 1e-2.
+        max_refinements : int
+            The maximum number of times the knots are refined.
+            Default value is 12.
+
+        Returns
+        -------
+        B3Spline
+            The subsegment with the normalized positions in [0, 1]
+            running from start to end.
+        """
+        control_points, (start_knot, end_knot) = self._refine_at_positions(
+            [start, end], atol=atol, max_refinements=max_refinements
+        )
+        return self._piece(control_points, start_knot, end_knot)
+
+    def split(
+        self, position: float, atol: float = 1e-2, max_refinements: int = 12
+    ) -> tuple["B3Spline", "B3Spline"]:
+        """Split the spline into two at a position.
+
+        The spline is cut at a knot within atol of the position, see
+        subsegment. Both parts share the control points of the refined
+        spline, so they meet exactly at the cut.
+
+        Parameters
+        ----------
+        position : float
+            The position to split at normalized to the range (0, 1).
+        atol : float
+            The maximum distance of the cut from the requested position
+            in normalized arc length. Default value is 1e-2.
+        max_refinements : int
+            The maximum number of times the knots are refined.
+            Default value is 12.
+
+        Returns
+        -------
+        tuple[B3Spline, B3Spline]
+            The part before and the part after the position.
+        """
+        control_points, (start_knot, split_knot, end_knot) = self._refine_at_positions(
+            [0.0, position, 1.0], atol=atol, max_refinements=max_refinements
+        )
+        return (
+            self._piece(control_points, start_knot, split_knot),
+            self._piece(control_points, split_knot, end_knot),
+        )
+
     def flip_spline(self, path: np.ndarray) -> "B3Spline":
         """Recomputes the spline inverse to the path.
 
@@ -242,4 +722,4 @@ class B3Spline:
         np.ndarray
             The flipped path coordinates.
         """
-        return self.from_points(path[::-1]), path[::-1]
+        return self.from_points(path[::-1], dtype=self.dtype), path[::-1]
@@ -0,0 +1,298 @@
+"""Trace the branches of a skeleton from its voxel coordinates.
+
+The voxel adjacency is built with a sorted-index neighbour lookup,
+so the memory scales with the number of skeleton voxels rather than
+with the size of the volume they are in.
+"""
+
+import itertools
+
+import numba
+import numpy as np
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import connected_components
+
+# offsets of the 26 neighbours of a voxel
+NEIGHBOR_OFFSETS = np.array(
+    [
+        offset
+        for offset in itertools.product((-1, 0, 1), repeat=3)
+        if offset != (0, 0, 0)
+    ],
+    dtype=np.int64,
+)
+
+
+def unique_coordinates(coordinates: np.ndarray) -> np.ndarray:
+    """Return the sorted unique integer voxel coordinates.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        (n_voxels, 3) array of voxel coordinates.
+
+    Returns
+    -------
+    np.ndarray
+        (n_unique_voxels, 3) array of the unique voxel coordinates
+        sorted in C order.
+    """
+    coordinates = np.asarray(coordinates)
+    if coordinates.ndim != 2 or coordinates.shape[1] != 3:
+        raise ValueError("The coordinates must be an (n_voxels, 3) array.")
+    if coordinates.dtype.kind == "f" and not np.all(
+        coordinates == np.round(coordinates)
+    ):
+        raise ValueError("The coordinates must be integer voxel indices.")
+    return np.unique(coordinates.astype(np.int64), axis=0)
+
+
+def voxel_adjacency(coordinates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Find the 26-connected neighbours of each voxel.
+
+    Each voxel is given a linear key in the bounding box of the
+    coordinates. The neighbours are found by looking up the keys of the
+    neighbouring positions in the sorted keys.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        (n_voxels, 3) array of unique integer voxel coordinates.
+
+    Returns
+    -------
+    indptr : np.ndarray
+        (n_voxels + 1,) array of the offsets of the neighbours of each voxel.
+    indices : np.ndarray
+        The neighbour indices, where the neighbours of voxel i are
+        indices[indptr[i]:indptr[i + 1]].
+    """
+    n_voxels = len(coordinates)
+    if n_voxels == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # pad the bounding box by one voxel so the neighbour keys are valid
+    origin = coordinates.min(axis=0) - 1
+    box_shape = coordinates.max(axis=0) - origin + 2
+    strides = np.array([box_shape[1] * box_shape[2], box_shape[2], 1], dtype=np.int64)
+    keys = (coordinates - origin) @ strides
+    key_order = np.argsort(keys)
+    sorted_keys = keys[key_order]
+
+    voxel_indices = []
+    neighbor_indices = []
+    for offset in NEIGHBOR_OFFSETS:
+        neighbor_keys = keys + offset @ strides
+        positions = np.minimum(
+            np.searchsorted(sorted_keys, neighbor_keys), n_voxels - 1
+        )
+        is_neighbor = sorted_keys[positions] == neighbor_keys
+        voxel_indices.append(np.flatnonzero(is_neighbor))
+        neighbor_indices.append(key_order[positions[is_neighbor]])
+    voxel_indices = np.concatenate(voxel_indices)
+    neighbor_indices = np.concatenate(neighbor_indices)
+
+    # sort the neighbour pairs by voxel into the CSR layout
+    pair_order = np.argsort(voxel_indices, kind="stable")
+    indptr = np.zeros(n_voxels + 1, dtype=np.int64)
+    np.cumsum(np.bincount(voxel_indices, minlength=n_voxels), out=indptr[1:])
+    return indptr, neighbor_indices[pair_order]
+
+
+def junction_nodes(
+    coordinates: np.ndarray, indptr: np.ndarray, indices: np.ndarray
+) -> np.ndarray:
+    """Assign each node voxel to the voxel that represents its node.
+
+    Voxels with a number of neighbours other than two are node voxels.
+    Adjacent junction voxels (three or more neighbours) form a single
+    node, which is represented by the voxel closest to their centroid.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        (n_voxels, 3) array of the voxel coordinates.
+    indptr : np.ndarray
+        The neighbour offsets made by voxel_adjacency.
+    indices : np.ndarray
+        The neighbour indices made by voxel_adjacency.
+
+    Returns
+    -------
+    np.ndarray
+        (n_voxels,) array of the index of the voxel representing the node
+        of each voxel. Voxels that are not node voxels are -1.
+    """
+    n_voxels = len(coordinates)
+    degree = np.diff(indptr)
+    node_voxels = np.where(degree != 2, np.arange(n_voxels), -1)
+
+    # group adjacent junction voxels
+    is_junction = degree > 2
+    voxel_of_pair = np.repeat(np.arange(n_voxels), degree)
+    junction_pairs = is_junction[voxel_of_pair] & is_junction[indices]
+    junction_graph = csr_array(
+        (
+            np.ones(np.count_nonzero(junction_pairs)),
+            (voxel_of_pair[junction_pairs], indices[junction_pairs]),
+        ),
+        shape=(n_voxels, n_voxels),
+    )
+    _, cluster_labels = connected_components(junction_graph, directed=False)
+    junction_voxels = np.flatnonzero(is_junction)
+    if len(junction_voxels) == 0:
+        return node_voxels
+
+    # the representative is the junction voxel closest to the cluster centroid
+    _, cluster_index, cluster_size = np.unique(
+        cluster_labels[junction_voxels], return_inverse=True, return_counts=True
+    )
+    centroids = (
+        np.stack(
+            [
+                np.bincount(cluster_index, weights=coordinates[junction_voxels, axis])
+                for axis in range(coordinates.shape[1])
+            ],
+            axis=1,
+        )
+        / cluster_size[:, None]
+    )
+    distances = np.linalg.norm(
+        coordinates[junction_voxels] - centroids[cluster_index], axis=1
+    )
+    order = np.lexsort((distances, cluster_index))
+    first_in_cluster = np.concatenate([[0], np.cumsum(cluster_size)[:-1]])
+    representatives = junction_voxels[order[first_in_cluster]]
+    node_voxels[junction_voxels] = representatives[cluster_index]
+    return node_voxels
+
+
+@numba.njit(cache=True)
+def _trace_branches(indptr, indices, node_voxels):
+    """Trace the branches between the node voxels.
+
+    Returns the start node, end node and path voxels of each branch.
+    """
+    n_voxels = len(node_voxels)
+    visited = np.zeros(n_voxels, dtype=np.bool_)
+    seen_node_pairs = numba.typed.Dict.empty(numba.int64, numba.int64)
+    edge_start = numba.typed.List.empty_list(numba.int64)
+    edge_end = numba.typed.List.empty_list(numba.int64)
+    path_lengths = numba.typed.List.empty_list(numba.int64)
+    path_voxels = numba.typed.List.empty_list(numba.int64)
+
+    for voxel in range(n_voxels):
+        start_node = node_voxels[voxel]
+        if start_node < 0:
+            continue
+        for neighbor_index in range(indptr[voxel], indptr[voxel + 1]):
+            path = numba.typed.List.empty_list(numba.int64)
+            if start_node != voxel:
+                path.append(start_node)
+            path.append(voxel)
+
+            previous_voxel = voxel
+            current_voxel = indices[neighbor_index]
+            if node_voxels[current_voxel] >= 0:
+                # the nodes touch, so the branch has no inner voxels
+                end_node = node_voxels[current_voxel]
+                if end_node <= start_node:
+                    continue
+                pair_key = start_node * n_voxels + end_node
+                if pair_key in seen_node_pairs:
+                    continue
+                seen_node_pairs[pair_key] = 1
+            elif visited[current_voxel]:
+                continue
+
+            n_inner_voxels = 0
+            while node_voxels[current_voxel] < 0:
+                visited[current_voxel] = True
+                path.append(current_voxel)
+                n_inner_voxels += 1
+                next_voxel = indices[indptr[current_voxel]]
+                if next_voxel == previous_voxel:
+                    next_voxel = indices[indptr[current_voxel] + 1]
+                previous_voxel = current_voxel
+                current_voxel = next_voxel
+
+            end_node = node_voxels[current_voxel]
+            if end_node == start_node and n_inner_voxels <= 1:
+                # corner voxels next to a junction make tiny loops
+                continue
+            path.append(current_voxel)
+            if end_node != current_voxel:
+                path.append(end_node)
+            path_voxels.extend(path)
+            edge_start.append(start_node)
+            edge_end.append(end_node)
+            path_lengths.append(len(path))
+
+    # the remaining voxels form closed loops without nodes
+    for voxel in range(n_voxels):
+        if node_voxels[voxel] >= 0 or visited[voxel]:
+            continue
+        path = numba.typed.List.empty_list(numba.int64)
+        path.append(voxel)
+        visited[voxel] = True
+        previous_voxel = voxel
+        current_voxel = indices[indptr[voxel]]
+        while current_voxel != voxel:
+            visited[current_voxel] = True
+            path.append(current_voxel)
+            next_voxel = indices[indptr[current_voxel]]
+            if next_voxel == previous_voxel:
+                next_voxel = indices[indptr[current_voxel] + 1]
+            previous_voxel = current_voxel
+            current_voxel = next_voxel
+        path.append(voxel)
+        path_voxels.extend(path)
+        edge_start.append(voxel)
+        edge_end.append(voxel)
+        path_lengths.append(len(path))
+
+    n_edges = len(edge_start)
+    edge_nodes = np.empty((n_edges, 2), dtype=np.int64)
+    path_offsets = np.zeros(n_edges + 1, dtype=np.int64)
+    for edge_index in range(n_edges):
+        edge_nodes[edge_index, 0] = edge_start[edge_index]
+        edge_nodes[edge_index, 1] = edge_end[edge_index]
+        path_offsets[edge_index + 1] = (
+            path_offsets[edge_index] + path_lengths[edge_index]
+        )
+    path_array = np.empty(len(path_voxels), dtype=np.int64)
+    for index in range(len(path_voxels)):
+        path_array[index] = path_voxels[index]
+    return edge_nodes, path_offsets, path_array
+
+
+def trace_skeleton(
+    coordinates: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trace the branches of a skeleton given by its voxel coordinates.
+
+    Voxels with one neighbour are end points, voxels with three or more
+    neighbours are junctions and adjacent junction voxels are merged into
+    one node. Loops without any node get a node at one of their voxels.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        (n_voxels, 3) array of unique integer voxel coordinates,
+        for example made by unique_coordinates.
+
+    Returns
+    -------
+    edge_nodes : np.ndarray
+        (n_edges, 2) array of the start and end node of each branch.
+        The nodes are the indices of the voxels that represent them.
+    path_offsets : np.ndarray
+        (n_edges + 1,) array of the offsets of the branch paths.
+    path_voxels : np.ndarray
+        The voxel indices of the branch paths, where the path of branch i
+        is path_voxels[path_offsets[i]:path_offsets[i + 1]]. Each path
+        runs from the start node to the end node.
+    """
+    indptr, indices = voxel_adjacency(coordinates)
+    node_voxels = junction_nodes(coordinates, indptr, indices)
+    return _trace_branches(indptr, indices, node_voxels)
@@ -0,0 +1,105 @@
+"""Metrics of the tree structure of a directed skeleton graph."""
+
+import networkx as nx
+
+from skeleplex.graph.constants import (
+    EDGE_GENERATION_KEY,
+    EDGE_PATH_LENGTH_KEY,
+    EDGE_STRAHLER_ORDER_KEY,
+    EDGE_SUBTREE_SIZE_KEY,
+    NODE_GENERATION_KEY,
+    NODE_PATH_LENGTH_KEY,
+    NODE_STRAHLER_ORDER_KEY,
+    NODE_SUBTREE_SIZE_KEY,
+)
+
+
+def compute_tree_metrics(
+    graph: nx.DiGraph, edge_lengths: dict[tuple, float]
+) -> tuple[dict, dict]:
+    """Compute the tree-order metrics of all nodes and edges.
+
+    The metrics are computed with one top-down and one bottom-up pass
+    over the tree, so the run time is linear in the size of the graph.
+    Nodes without a parent are the roots of the trees. The metrics are:
+
+    - generation: the number of edges between a node and its root.
+      The generation of an edge is the generation of its start node,
+      so the edges leaving the root have generation 0.
+    - strahler_order: the Horton-Strahler order. Leaf nodes have order 1.
+      If two or more children of a node have the highest order k,
+      the node has order k + 1, otherwise it has order k. The order of
+      an edge is the order of its end node.
+    - subtree_size: the number of nodes in the subtree rooted at a node,
+      including the node itself. The subtree size of an edge is the
+      number of edges in the subtree starting with that edge.
+    - path_length: the summed length of the edges from the root to a node.
+      The path length of an edge is the path length of its end node.
+
+    Parameters
+    ----------
+    graph : nx.DiGraph
+        The directed graph. Each node must have at most one parent.
+    edge_lengths : dict[tuple, float]
+        The length of each (start_node, end_node) edge.
+
+    Returns
+    -------
+    node_metrics : dict
+        Mapping of each node to a dictionary of its metrics.
+    edge_metrics : dict
+        Mapping of each (start_node, end_node) edge to a dictionary of its metrics.
+    """
+    if not graph.is_directed() or graph.is_multigraph():
+        raise ValueError("Tree metrics require a directed graph without multi-edges.")
+    if any(in_degree > 1 for _, in_degree in graph.in_degree):
+        raise ValueError("Tree metrics require each node to have at most one parent.")
+
+    # top-down pass in breadth-first order from the roots
+    roots = [node for node, in_degree in graph.in_degree if in_degree == 0]
+    generation = dict.fromkeys(roots, 0)
+    path_length = dict.fromkeys(roots, 0.0)
+    order = list(roots)
+    for node in order:
+        for child in graph.successors(node):
+            generation[child] = generation[node] + 1
+            path_length[child] = path_length[node] + edge_lengths[(node, child)]
+            order.append(child)
+    if len(order) != graph.number_of_nodes():
+        raise ValueError("Tree metrics require a graph without cycles.")
+
+    # bottom-up pass in reverse breadth-first order
+    strahler_order = {}
+    subtree_size = {}
+    for node in reversed(order):
+        child_orders = [strahler_order[child] for child in graph.successors(node)]
+        if len(child_orders) == 0:
+            strahler_order[node] = 1
+        else:
+            highest_order = max(child_orders)
+            strahler_order[node] = highest_order + (
+                child_orders.count(highest_order) > 1
+            )
+        subtree_size[node] = 1 + sum(
+            subtree_size[child] for child in graph.successors(node)
+        )
+
+    node_metrics = {
+        node: {
+            NODE_GENERATION_KEY: generation[node],
+            NODE_STRAHLER_ORDER_KEY: strahler_order[node],
+            NODE_SUBTREE_SIZE_KEY: subtree_size[node],
+            NODE_PATH_LENGTH_KEY: path_length[node],
+        }
+        for node in order
+    }
+    edge_metrics = {
+        (start_node, end_node): {
+            EDGE_GENERATION_KEY: generation[start_node],
+            EDGE_STRAHLER_ORDER_KEY: strahler_order[end_node],
+            EDGE_SUBTREE_SIZE_KEY: subtree_size[end_node],
+            EDGE_PATH_LENGTH_KEY: path_length[end_node],
+        }
+        for start_node, end_node in graph.edges
+    }
+    return node_metrics, edge_metrics
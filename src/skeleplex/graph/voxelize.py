@@ -0,0 +1,262 @@
+"""Rasterize the splines of a skeleton graph into a label volume."""
+
+from typing import TYPE_CHECKING
+
+import numba
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY
+from skeleplex.graph.spline import B3Spline, eval_splines, group_splines_by_knots
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+
+def sample_splines_densely(
+    splines: list[B3Spline], max_spacing: float = 0.5
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sample splines so that consecutive samples are at most max_spacing apart.
+
+    The derivative of a B3 spline is bounded by the largest distance between
+    consecutive control points, so the number of samples for each spline
+    can be chosen without computing its arc length. Splines with the same
+    number of knots and a similar number of samples are evaluated together.
+
+    Parameters
+    ----------
+    splines : list[B3Spline]
+        The open splines to sample.
+    max_spacing : float
+        The maximum distance between consecutive samples.
+        Default value is 0.5.
+
+    Returns
+    -------
+    points : np.ndarray
+        (n_points, d) array of the samples of all splines.
+    spline_indices : np.ndarray
+        (n_points,) array of the index of the spline of each sample.
+    """
+    points = []
+    spline_indices = []
+    for n_knots, group_indices in group_splines_by_knots(splines).items():
+        control_points = np.stack(
+            [splines[index].model.control_points for index in group_indices]
+        )
+        max_step = np.linalg.norm(np.diff(control_points, axis=1), axis=-1).max(axis=1)
+        n_samples = np.ceil((n_knots - 1) * max_step / max_spacing).astype(int) + 1
+
+        # round up to a power of two so few distinct sample counts are evaluated
+        n_samples = 2 ** np.ceil(np.log2(np.maximum(n_samples, 2))).astype(int)
+        for bucket_size in np.unique(n_samples).tolist():
+            bucket_indices = group_indices[n_samples == bucket_size]
+            samples = eval_splines(
+                [splines[index] for index in bucket_indices],
+                np.linspace(0, 1, bucket_size),
+            )
+            points.append(samples.reshape(-1, samples.shape[-1]))
+            spline_indices.append(np.repeat(bucket_indices, bucket_size))
+
+    if len(points) == 0:
+        return np.empty((0, 3)), np.empty(0, dtype=int)
+    return np.concatenate(points), np.concatenate(spline_indices)
+
+
+@numba.njit(cache=True)
+def _rasterize_tile(
+    tile: np.ndarray,
+    tile_origin: np.ndarray,
+    points: np.ndarray,
+    labels: np.ndarray,
+    radii: np.ndarray,
+) -> None:
+    """Write the balls around the points into a 3D tile.
+
+    The voxel nearest to each point is always written, so
+    points with a radius of zero are rasterized as single voxels.
+    """
+    for point_index in range(points.shape[0]):
+        label = labels[point_index]
+        radius = radii[point_index]
+        center = points[point_index] - tile_origin
+
+        lower = np.empty(3, dtype=np.int64)
+        upper = np.empty(3, dtype=np.int64)
+        for axis in range(3):
+            lower[axis] = max(int(np.ceil(center[axis] - radius)), 0)
+            upper[axis] = min(
+                int(np.floor(center[axis] + radius)), tile.shape[axis] - 1
+            )
+
+        for i in range(lower[0], upper[0] + 1):
+            for j in range(lower[1], upper[1] + 1):
+                for k in range(lower[2], upper[2] + 1):
+                    distance_squared = (
+                        (i - center[0]) ** 2
+                        + (j - center[1]) ** 2
+                        + (k - center[2]) ** 2
+                    )
+                    if distance_squared <= radius * radius:
+                        tile[i, j, k] = label
+
+        nearest_voxel = np.empty(3, dtype=np.int64)
+        inside = True
+        for axis in range(3):
+            nearest_voxel[axis] = int(np.round(center[axis]))
+            if nearest_voxel[axis] < 0 or nearest_voxel[axis] >= tile.shape[axis]:
+                inside = False
+        if inside:
+            tile[nearest_voxel[0], nearest_voxel[1], nearest_voxel[2]] = label
+
+
+def _group_points_by_tile(
+    points: np.ndarray,
+    radii: np.ndarray,
+    volume_shape: tuple[int, int, int],
+    tile_shape: tuple[int, int, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Assign each point to every tile its ball overlaps.
+
+    Returns
+    -------
+    point_indices : np.ndarray
+        The point index of each (point, tile) pair sorted by tile.
+    tile_ids : np.ndarray
+        The unique linear indices of the tiles with at least one point.
+    tile_offsets : np.ndarray
+        (n_tiles + 1,) array where the points of tile_ids[i] are
+        point_indices[tile_offsets[i]:tile_offsets[i + 1]].
+    """
+    tile_shape_array = np.asarray(tile_shape)
+    tile_grid_shape = -(-np.asarray(volume_shape) // tile_shape_array)
+
+    # the balls are padded by half a voxel for the nearest voxel
+    extent = np.maximum(radii, 0.5)[:, None]
+    lower_tile = np.floor((points - extent) / tile_shape_array).astype(np.int64)
+    upper_tile = np.floor((points + extent) / tile_shape_array).astype(np.int64)
+    lower_tile = np.clip(lower_tile, 0, tile_grid_shape - 1)
+    upper_tile = np.clip(upper_tile, 0, tile_grid_shape - 1)
+
+    # expand each point into the box of tiles it overlaps
+    box_shape = upper_tile - lower_tile + 1
+    n_tiles_per_point = np.prod(box_shape, axis=1)
+    point_indices = np.repeat(np.arange(len(points)), n_tiles_per_point)
+    local_index = np.arange(len(point_indices)) - np.repeat(
+        np.cumsum(n_tiles_per_point) - n_tiles_per_point, n_tiles_per_point
+    )
+    pair_box_shape = box_shape[point_indices]
+    tile_index = np.stack(
+        [
+            local_index // (pair_box_shape[:, 1] * pair_box_shape[:, 2]),
+            (local_index // pair_box_shape[:, 2]) % pair_box_shape[:, 1],
+            local_index % pair_box_shape[:, 2],
+        ],
+        axis=1,
+    )
+    tile_index += lower_tile[point_indices]
+    linear_tile_index = np.ravel_multi_index(tile_index.T, tile_grid_shape)
+
+    # points inside a tile keep their order, so later edges overwrite earlier ones
+    sort_indices = np.argsort(linear_tile_index, kind="stable")
+    tile_ids, tile_offsets = np.unique(
+        linear_tile_index[sort_indices], return_index=True
+    )
+    tile_offsets = np.append(tile_offsets, len(sort_indices))
+    return point_indices[sort_indices], tile_ids, tile_offsets
+
+
+def voxelize_skeleton_graph(
+    skeleton_graph: "SkeletonGraph",
+    output,
+    radius: float | str | None = None,
+    sample_spacing: float = 0.5,
+    tile_shape: tuple[int, int, int] = (128, 128, 128),
+) -> list[tuple]:
+    """Write the edges of a skeleton graph into a label volume.
+
+    Each edge is written with its own label. The label of an edge is
+    its index in the returned list of edges plus one, so 0 is left
+    for the background. The splines of all edges are sampled in batches
+    and the volume is written tile by tile, so only one tile of the
+    output is held in memory at a time. Voxels covered by more than one
+    edge get the label of one of those edges.
+
+    Parameters
+    ----------
+    skeleton_graph : SkeletonGraph
+        The skeleton graph to voxelize. The spline coordinates
+        are interpreted as voxel indices of the output volume.
+    output : np.ndarray | np.memmap | h5py.Dataset
+        The preallocated 3D integer label volume to write into. Any array that
+        supports reading and writing slices can be used. Voxels that are
+        not covered by an edge are left unchanged.
+    radius : float | str | None
+        The radius of the ball drawn around each spline sample.
+        If a string, the radius of each edge is read from the edge
+        attribute with that name. If None, only the voxels nearest to
+        the splines are written. Default value is None.
+    sample_spacing : float
+        The maximum distance between the spline samples.
+        Default value is 0.5.
+    tile_shape : tuple[int, int, int]
+        The shape of the tiles the output is written in.
+        Default value is (128, 128, 128).
+
+    Returns
+    -------
+    list[tuple]
+        The edges of the graph in label order.
+    """
+    if len(output.shape) != 3:
+        raise ValueError("The output volume must be 3D.")
+    if not np.issubdtype(output.dtype, np.integer):
+        raise ValueError(f"The output dtype {output.dtype} is not an integer type.")
+    graph = skeleton_graph.graph
+    if graph.is_multigraph():
+        edges = list(graph.edges(keys=True, data=True))
+    else:
+        edges = list(graph.edges(data=True))
+    if len(edges) > np.iinfo(output.dtype).max:
+        raise ValueError(
+            f"The output dtype {output.dtype} cannot hold {len(edges)} edge labels."
+        )
+
+    splines = [edge_data[EDGE_SPLINE_KEY] for *_, edge_data in edges]
+    points, edge_indices = sample_splines_densely(splines, max_spacing=sample_spacing)
+    points = points.astype(np.float64)
+    labels = (edge_indices + 1).astype(output.dtype)
+    if radius is None:
+        radii = np.zeros(len(points))
+    elif isinstance(radius, str):
+        edge_radii = np.array([float(edge_data[radius]) for *_, edge_data in edges])
+        radii = edge_radii[edge_indices]
+    else:
+        radii = np.full(len(points), float(radius))
+
+    point_indices, tile_ids, tile_offsets = _group_points_by_tile(
+        points, radii, volume_shape=output.shape, tile_shape=tile_shape
+    )
+    tile_grid_shape = tuple(-(-np.asarray(output.shape) // np.asarray(tile_shape)))
+    for tile_id, start, end in zip(
+        tile_ids, tile_offsets[:-1], tile_offsets[1:], strict=True
+    ):
+        tile_origin = np.multiply(
+            np.unravel_index(tile_id, tile_grid_shape), tile_shape
+        )
+        tile_slices = tuple(
+            slice(origin, min(origin + size, volume_size))
+            for origin, size, volume_size in zip(
+                tile_origin, tile_shape, output.shape, strict=True
+            )
+        )
+        tile = np.asarray(output[tile_slices])
+        tile_points = point_indices[start:end]
+        _rasterize_tile(
+            tile,
+            tile_origin.astype(np.float64),
+            points[tile_points],
+            labels[tile_points],
+            radii[tile_points],
+        )
+        output[tile_slices] = tile
+    return [tuple(edge[:-1]) for edge in edges]
@@ -0,0 +1,23 @@
+"""Tools to measure the properties of a skeleton graph."""
+
+from skeleplex.measure.cross_section import (
+    CROSS_SECTION_DTYPE,
+    profile_cross_sections,
+)
+from skeleplex.measure.morphometrics import (
+    EDGE_MORPHOMETRICS_DTYPE,
+    compute_edge_morphometrics,
+    spline_curvatures,
+    spline_lengths,
+)
+from skeleplex.measure.radius import compute_edge_radii
+
+__all__ = [
+    "CROSS_SECTION_DTYPE",
+    "EDGE_MORPHOMETRICS_DTYPE",
+    "compute_edge_morphometrics",
+    "compute_edge_radii",
+    "profile_cross_sections",
+    "spline_curvatures",
+    "spline_lengths",
+]
@@ -0,0 +1,169 @@
+"""Measure the cross-sections of the edges in planes normal to their splines."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY
+from skeleplex.graph.sample import generate_2d_grid, sample_volume_at_coordinates
+from skeleplex.graph.volume import ChunkedVolumeReader
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+CROSS_SECTION_DTYPE = np.dtype(
+    [
+        ("position", np.float64),
+        ("area", np.float64),
+        ("mean_intensity", np.float64),
+        ("max_intensity", np.float64),
+        ("centroid_offset", np.float64),
+    ]
+)
+
+
+def _reduce_planes(
+    planes: np.ndarray, plane_coordinates: np.ndarray, threshold: float
+) -> dict[str, np.ndarray]:
+    """Reduce sampled planes to their cross-section measurements.
+
+    planes has shape (n_planes, w, h) and plane_coordinates (w, h, 2)
+    holds the in-plane offset of each pixel from the spline.
+    """
+    n_planes = len(planes)
+    values = planes.reshape(n_planes, -1)
+    offsets = plane_coordinates.reshape(-1, 2)
+    is_valid = np.isfinite(values)
+    is_above = values > threshold
+    n_valid = is_valid.sum(axis=1)
+    n_above = is_above.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_intensity = np.where(is_valid, values, 0).sum(axis=1) / n_valid
+        centroids = (is_above @ offsets) / n_above[:, np.newaxis]
+    max_intensity = np.where(is_valid, values, -np.inf).max(axis=1)
+    max_intensity[n_valid == 0] = np.nan
+    return {
+        "n_above": n_above,
+        "mean_intensity": mean_intensity,
+        "max_intensity": max_intensity,
+        "centroid_offset": np.linalg.norm(centroids, axis=1),
+    }
+
+
+def profile_cross_sections(
+    skeleton_graph: "SkeletonGraph",
+    volume: np.ndarray | ChunkedVolumeReader,
+    threshold: float,
+    n_positions: int = 10,
+    grid_shape: tuple[int, int] = (32, 32),
+    grid_spacing: tuple[float, float] = (1, 1),
+    interpolation_order: int = 1,
+    batch_size: int = 1024,
+) -> np.ndarray:
+    """Measure the cross-section of all edges along their splines.
+
+    The volume is sampled in planes normal to the spline of each edge
+    (see B3Spline.sample_volume_2d). The planes are sampled in batches and
+    each plane is reduced to a few measurements right away, so only the
+    measurements are kept in memory.
+
+    Parameters
+    ----------
+    skeleton_graph : SkeletonGraph
+        The skeleton graph to measure.
+    volume : np.ndarray | ChunkedVolumeReader
+        The 3D image to sample. Volumes on disk can be wrapped in a
+        ChunkedVolumeReader, in which case the chunks of the next
+        batches are read while the current batch is measured.
+    threshold : float
+        The intensity above which a pixel is part of the cross-section.
+    n_positions : int
+        The number of planes per edge. The planes are placed at the centers
+        of n_positions intervals of equal arc length along the edge, so no
+        plane lies on a node. Default value is 10.
+    grid_shape : tuple[int, int]
+        The number of pixels along each axis of the planes.
+        Default value is (32, 32).
+    grid_spacing : tuple[float, float]
+        Spacing between the pixels of the planes.
+        Default value is (1, 1).
+    interpolation_order : int
+        The order of the spline interpolation used to sample the volume.
+        Default value is 1.
+    batch_size : int
+        The maximum number of planes sampled together. The planes of an
+        edge are always sampled together, so a batch holds at most
+        max(batch_size, n_positions) planes. The memory used for sampling
+        is proportional to that number times grid_shape.
+        Default value is 1024.
+
+    Returns
+    -------
+    np.ndarray
+        (n_edges, n_positions) structured array in the order of the graph
+        edges with the fields of CROSS_SECTION_DTYPE:
+            - "position": the normalized arc length position of the plane.
+            - "area": the area of the pixels above the threshold.
+            - "mean_intensity": the mean intensity of the plane.
+            - "max_intensity": the maximum intensity of the plane.
+            - "centroid_offset": the distance from the spline to the
+              centroid of the pixels above the threshold.
+        Pixels outside of the volume are ignored. Planes without pixels
+        above the threshold have a nan centroid_offset.
+    """
+    splines = [
+        spline for *_, spline in skeleton_graph.graph.edges(data=EDGE_SPLINE_KEY)
+    ]
+    positions = (np.arange(n_positions) + 0.5) / n_positions
+    profiles = np.zeros((len(splines), n_positions), dtype=CROSS_SECTION_DTYPE)
+    profiles["position"] = positions
+
+    # in-plane offset of each pixel from the spline
+    plane_coordinates = generate_2d_grid(
+        grid_shape=grid_shape, grid_spacing=grid_spacing
+    )[..., 1:]
+    pixel_area = float(np.prod(grid_spacing))
+
+    # each batch holds the planes of whole edges, so the moving frames
+    # of an edge are computed together
+    edges_per_batch = max(1, batch_size // n_positions)
+    batch_starts = range(0, len(splines), edges_per_batch)
+
+    def coordinate_batches():
+        for batch_start in batch_starts:
+            yield np.concatenate(
+                [
+                    spline.sample_grid_2d(
+                        positions, grid_shape=grid_shape, grid_spacing=grid_spacing
+                    )
+                    for spline in splines[batch_start : batch_start + edges_per_batch]
+                ]
+            )
+
+    if isinstance(volume, ChunkedVolumeReader):
+        sampled_batches = volume.iter_sample(
+            coordinate_batches(),
+            interpolation_order=interpolation_order,
+            dtype=np.float64,
+        )
+    else:
+        sampled_batches = (
+            sample_volume_at_coordinates(
+                volume,
+                coordinates,
+                interpolation_order=interpolation_order,
+                dtype=np.float64,
+            )
+            for coordinates in coordinate_batches()
+        )
+
+    for batch_start, planes in zip(batch_starts, sampled_batches, strict=True):
+        measurements = _reduce_planes(planes, plane_coordinates, threshold)
+        batch_profiles = profiles[batch_start : batch_start + edges_per_batch]
+        batch_profiles["area"] = (measurements["n_above"] * pixel_area).reshape(
+            -1, n_positions
+        )
+        for name in ("mean_intensity", "max_intensity", "centroid_offset"):
+            batch_profiles[name] = measurements[name].reshape(-1, n_positions)
+    return profiles
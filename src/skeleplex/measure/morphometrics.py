@@ -0,0 +1,365 @@
+"""Batched morphometric measurements of the edges in a skeleton graph."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY, NODE_COORDINATE_KEY
+from skeleplex.graph.spline import (
+    B3Spline,
+    b3_basis_matrix,
+    eval_splines,
+    group_splines_by_knots,
+)
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+EDGE_MORPHOMETRICS_DTYPE = np.dtype(
+    [
+        ("start_node", np.int64),
+        ("end_node", np.int64),
+        ("key", np.int64),
+        ("length", np.float64),
+        ("chord_length", np.float64),
+        ("tortuosity", np.float64),
+        ("mean_curvature", np.float64),
+        ("max_curvature", np.float64),
+        ("branch_angle", np.float64),
+    ]
+)
+
+
+def _curvature(first_derivative: np.ndarray, second_derivative: np.ndarray):
+    """Return the unsigned curvature from the first two derivatives.
+
+    The derivatives have shape (..., d) and the curvature
+    is computed along the last axis.
+    """
+    speed_squared = np.sum(first_derivative**2, axis=-1)
+    acceleration_squared = np.sum(second_derivative**2, axis=-1)
+    dot_product = np.sum(first_derivative * second_derivative, axis=-1)
+    # clip small negative values from floating point error
+    numerator = np.sqrt(
+        np.clip(speed_squared * acceleration_squared - dot_product**2, 0, None)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / speed_squared**1.5
+
+
+def _measure_spline_batch(
+    splines: list[B3Spline], n_quadrature_points: int
+) -> dict[str, np.ndarray]:
+    """Compute the length and curvature statistics of a batch of splines.
+
+    The integrals are computed with Gauss-Legendre quadrature over
+    each knot interval. The quadrature nodes and their basis matrices
+    are shared by all splines with the same number of knots.
+    """
+    n_splines = len(splines)
+    lengths = np.zeros(n_splines)
+    mean_curvatures = np.full(n_splines, np.nan)
+    max_curvatures = np.full(n_splines, np.nan)
+
+    gauss_nodes, gauss_weights = np.polynomial.legendre.leggauss(n_quadrature_points)
+    for n_knots, spline_indices in group_splines_by_knots(splines).items():
+        # quadrature nodes in the parameter space of the splines
+        interval_starts = np.arange(n_knots - 1)
+        t = (interval_starts[:, np.newaxis] + (gauss_nodes + 1) / 2).ravel()
+        weights = np.tile(gauss_weights / 2, n_knots - 1)
+
+        control_points = np.stack(
+            [splines[index].model.control_points for index in spline_indices]
+        )
+        first_derivative = (
+            b3_basis_matrix(t, n_knots=n_knots, derivative=1) @ control_points
+        )
+        second_derivative = (
+            b3_basis_matrix(t, n_knots=n_knots, derivative=2) @ control_points
+        )
+
+        speed = np.linalg.norm(first_derivative, axis=-1)
+        curvature = _curvature(first_derivative, second_derivative)
+        group_lengths = speed @ weights
+        lengths[spline_indices] = group_lengths
+
+        # the mean curvature is weighted by arc length
+        valid = np.isfinite(curvature)
+        weighted_curvature = np.where(valid, curvature * speed, 0) @ weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_curvatures[spline_indices] = weighted_curvature / group_lengths
+        max_curvatures[spline_indices] = np.max(
+            np.where(valid, curvature, -np.inf), axis=-1
+        )
+
+    max_curvatures[np.isneginf(max_curvatures)] = np.nan
+    return {
+        "length": lengths,
+        "mean_curvature": mean_curvatures,
+        "max_curvature": max_curvatures,
+    }
+
+
+def _measure_splines(
+    splines: list[B3Spline],
+    n_quadrature_points: int = 10,
+    batch_size: int = 4096,
+    n_workers: int = 1,
+) -> dict[str, np.ndarray]:
+    """Measure splines in batches, optionally in parallel."""
+    batches = [
+        splines[batch_start : batch_start + batch_size]
+        for batch_start in range(0, len(splines), batch_size)
+    ]
+    if n_workers > 1 and len(batches) > 1:
+        # numpy releases the GIL in the matrix products,
+        # so threads are sufficient to use multiple cores.
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda batch: _measure_spline_batch(batch, n_quadrature_points),
+                    batches,
+                )
+            )
+    else:
+        results = [
+            _measure_spline_batch(batch, n_quadrature_points) for batch in batches
+        ]
+
+    if len(results) == 0:
+        return {
+            "length": np.zeros(0),
+            "mean_curvature": np.zeros(0),
+            "max_curvature": np.zeros(0),
+        }
+    return {
+        name: np.concatenate([result[name] for result in results])
+        for name in results[0]
+    }
+
+
+def spline_lengths(
+    splines: list[B3Spline],
+    n_quadrature_points: int = 10,
+    batch_size: int = 4096,
+    n_workers: int = 1,
+) -> np.ndarray:
+    """Compute the arc length of many splines at once.
+
+    Parameters
+    ----------
+    splines : list[B3Spline]
+        The splines to measure.
+    n_quadrature_points : int
+        The number of Gauss-Legendre quadrature points per knot interval.
+        Default value is 10.
+    batch_size : int
+        The maximum number of splines processed together.
+        Default value is 4096.
+    n_workers : int
+        The number of threads used to process the batches.
+        Default value is 1.
+
+    Returns
+    -------
+    np.ndarray
+        (n_splines,) array of arc lengths.
+    """
+    return _measure_splines(
+        splines,
+        n_quadrature_points=n_quadrature_points,
+        batch_size=batch_size,
+        n_workers=n_workers,
+    )["length"]
+
+
+def spline_curvatures(
+    splines: list[B3Spline],
+    n_quadrature_points: int = 10,
+    batch_size: int = 4096,
+    n_workers: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the mean and maximum curvature of many splines at once.
+
+    The mean curvature is weighted by arc length. The maximum curvature
+    is taken over the quadrature points.
+
+    Parameters
+    ----------
+    splines : list[B3Spline]
+        The splines to measure.
+    n_quadrature_points : int
+        The number of Gauss-Legendre quadrature points per knot interval.
+        Default value is 10.
+    batch_size : int
+        The maximum number of splines processed together.
+        Default value is 4096.
+    n_workers : int
+        The number of threads used to process the batches.
+        Default value is 1.
+
+    Returns
+    -------
+    mean_curvature : np.ndarray
+        (n_splines,) array of the mean curvatures.
+    max_curvature : np.ndarray
+        (n_splines,) array of the maximum curvatures.
+    """
+    measurements = _measure_splines(
+        splines,
+        n_quadrature_points=n_quadrature_points,
+        batch_size=batch_size,
+        n_workers=n_workers,
+    )
+    return measurements["mean_curvature"], measurements["max_curvature"]
+
+
+def _edge_tangents_at_nodes(
+    splines: list[B3Spline],
+    start_coordinates: np.ndarray,
+    end_coordinates: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the unit tangents of each spline pointing away from its nodes.
+
+    The splines are not required to be oriented along their edges,
+    so each node is assigned the spline end closest to it.
+    """
+    ends = np.array([0.0, 1.0])
+    end_points = eval_splines(splines, ends)
+    end_tangents = eval_splines(splines, ends, derivative=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        end_tangents /= np.linalg.norm(end_tangents, axis=-1, keepdims=True)
+
+    # the tangent at t=1 points away from the spline,
+    # so flip it to point into the spline
+    end_tangents[:, 1] *= -1
+
+    start_is_first = np.linalg.norm(
+        end_points[:, 0] - start_coordinates, axis=-1
+    ) <= np.linalg.norm(end_points[:, 1] - start_coordinates, axis=-1)
+    end_is_last = np.linalg.norm(
+        end_points[:, 1] - end_coordinates, axis=-1
+    ) <= np.linalg.norm(end_points[:, 0] - end_coordinates, axis=-1)
+
+    start_tangents = np.where(
+        start_is_first[:, np.newaxis], end_tangents[:, 0], end_tangents[:, 1]
+    )
+    end_tangents = np.where(
+        end_is_last[:, np.newaxis], end_tangents[:, 1], end_tangents[:, 0]
+    )
+    return start_tangents, end_tangents
+
+
+def compute_edge_morphometrics(
+    skeleton_graph: "SkeletonGraph",
+    n_quadrature_points: int = 10,
+    batch_size: int = 4096,
+    n_workers: int = 1,
+) -> np.ndarray:
+    """Compute morphometrics for all edges of a skeleton graph.
+
+    The splines of all edges are measured in batches, where splines
+    with the same number of knots are evaluated with a single matrix
+    product. The measurements are:
+
+    - length: the arc length of the edge spline.
+    - chord_length: the distance between the edge nodes.
+    - tortuosity: the ratio of the length and the chord length.
+    - mean_curvature: the arc length weighted mean curvature.
+    - max_curvature: the maximum curvature.
+    - branch_angle: the angle in radians between the edge and its
+      parent edge at the start node. An angle of 0 means the edge
+      continues straight from its parent. This is only defined for
+      directed graphs where the start node has a single parent edge.
+      Otherwise, the value is NaN.
+
+    Parameters
+    ----------
+    skeleton_graph : SkeletonGraph
+        The skeleton graph to measure.
+    n_quadrature_points : int
+        The number of Gauss-Legendre quadrature points per knot interval.
+        Default value is 10.
+    batch_size : int
+        The maximum number of edges processed together.
+        Default value is 4096.
+    n_workers : int
+        The number of threads used to process the batches.
+        Default value is 1.
+
+    Returns
+    -------
+    np.ndarray
+        Structured array with one row per edge in the order of
+        the graph edges. The fields are given by EDGE_MORPHOMETRICS_DTYPE.
+    """
+    graph = skeleton_graph.graph
+    if graph.is_multigraph():
+        edges = list(graph.edges(keys=True, data=True))
+    else:
+        edges = [(u, v, 0, data) for u, v, data in graph.edges(data=True)]
+
+    table = np.zeros(len(edges), dtype=EDGE_MORPHOMETRICS_DTYPE)
+    if len(edges) == 0:
+        return table
+
+    splines = [edge_data[EDGE_SPLINE_KEY] for *_, edge_data in edges]
+    start_coordinates = np.array(
+        [graph.nodes[u][NODE_COORDINATE_KEY] for u, *_ in edges], dtype=float
+    )
+    end_coordinates = np.array(
+        [graph.nodes[v][NODE_COORDINATE_KEY] for _, v, *_ in edges], dtype=float
+    )
+
+    measurements = _measure_splines(
+        splines,
+        n_quadrature_points=n_quadrature_points,
+        batch_size=batch_size,
+        n_workers=n_workers,
+    )
+    table["start_node"] = [u for u, *_ in edges]
+    table["end_node"] = [v for _, v, *_ in edges]
+    table["key"] = [key for _, _, key, _ in edges]
+    table["length"] = measurements["length"]
+    table["mean_curvature"] = measurements["mean_curvature"]
+    table["max_curvature"] = measurements["max_curvature"]
+    table["chord_length"] = np.linalg.norm(end_coordinates - start_coordinates, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["tortuosity"] = np.where(
+            table["chord_length"] > 0,
+            table["length"] / table["chord_length"],
+            np.nan,
+        )
+
+    # branch angles are defined by the parent edge,
+    # so they require a directed graph
+    table["branch_angle"] = np.nan
+    if graph.is_directed():
+        start_tangents, end_tangents = _edge_tangents_at_nodes(
+            splines, start_coordinates, end_coordinates
+        )
+        edge_rows = {
+            (u, v, key): row_index for row_index, (u, v, key, _) in enumerate(edges)
+        }
+        child_rows = []
+        parent_rows = []
+        for row_index, (u, *_) in enumerate(edges):
+            if graph.in_degree(u) != 1:
+                continue
+            if graph.is_multigraph():
+                parent_edge = next(iter(graph.in_edges(u, keys=True)))
+            else:
+                parent_edge = (*next(iter(graph.in_edges(u))), 0)
+            child_rows.append(row_index)
+            parent_rows.append(edge_rows[parent_edge])
+
+        if len(child_rows) > 0:
+            # the parent tangent at its end node points back into the parent,
+            # so the straight continuation has a dot product of -1.
+            cosine = -np.sum(
+                end_tangents[parent_rows] * start_tangents[child_rows], axis=1
+            )
+            table["branch_angle"][child_rows] = np.arccos(np.clip(cosine, -1, 1))
+
+    return table
@@ -0,0 +1,111 @@
+"""Estimate the radius of the edges from a segmentation."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy import ndimage
+
+from skeleplex.graph.constants import (
+    EDGE_RADIUS_KEY,
+    EDGE_RADIUS_MAX_KEY,
+    EDGE_RADIUS_MEAN_KEY,
+    EDGE_RADIUS_MEDIAN_KEY,
+    EDGE_RADIUS_MIN_KEY,
+    EDGE_SPLINE_KEY,
+)
+from skeleplex.graph.spline import eval_splines
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+
+def _padded_bounding_box(
+    points: np.ndarray, padding: int, image_shape: tuple[int, ...]
+) -> tuple[slice, ...]:
+    """Return the slices of the bounding box of the points plus padding."""
+    lower = np.floor(points.min(axis=0)).astype(int) - padding
+    upper = np.ceil(points.max(axis=0)).astype(int) + padding + 1
+    lower = np.clip(lower, 0, image_shape)
+    upper = np.clip(upper, 0, image_shape)
+    return tuple(slice(start, stop) for start, stop in zip(lower, upper, strict=True))
+
+
+def compute_edge_radii(
+    skeleton_graph: "SkeletonGraph",
+    segmentation: np.ndarray,
+    n_samples: int = 32,
+    roi_padding: int | None = 10,
+    spacing: tuple[float, ...] | None = None,
+) -> np.ndarray:
+    """Estimate the radius profile of all edges from a segmentation.
+
+    The radius at a point on the centerline is the Euclidean distance
+    to the nearest background voxel. A single distance transform of the
+    segmentation is computed and the distances at the spline samples of
+    all edges are looked up with one interpolation call.
+
+    The results are stored as edge attributes: the radius profile under
+    EDGE_RADIUS_KEY and its mean, median, minimum and maximum under
+    EDGE_RADIUS_MEAN_KEY, EDGE_RADIUS_MEDIAN_KEY, EDGE_RADIUS_MIN_KEY
+    and EDGE_RADIUS_MAX_KEY.
+
+    Parameters
+    ----------
+    skeleton_graph : SkeletonGraph
+        The skeleton graph to measure. The graph is modified in place.
+    segmentation : np.ndarray
+        The binary segmentation the skeleton was made from.
+        The spline coordinates are interpreted as voxel indices.
+    n_samples : int
+        The number of radius samples per edge. The samples are evenly
+        spaced in the normalized spline parameter from the start to the
+        end of the edge. Default value is 32.
+    roi_padding : int | None
+        If not None, the distance transform is only computed in the
+        bounding box of the splines padded by this number of voxels.
+        The padding should be larger than the largest radius.
+        Default value is 10.
+    spacing : tuple[float, ...] | None
+        The voxel size along each axis. The radii are given in the
+        same unit. If None, the voxels are isotropic with size 1.
+        Default value is None.
+
+    Returns
+    -------
+    np.ndarray
+        (n_edges, n_samples) array of the radius profiles in the order
+        of the graph edges.
+    """
+    graph = skeleton_graph.graph
+    if graph.is_multigraph():
+        edges = list(graph.edges(keys=True, data=True))
+    else:
+        edges = list(graph.edges(data=True))
+    if len(edges) == 0:
+        return np.zeros((0, n_samples))
+
+    splines = [edge_data[EDGE_SPLINE_KEY] for *_, edge_data in edges]
+    sample_points = eval_splines(splines, np.linspace(0, 1, n_samples))
+    sample_points = sample_points.reshape(-1, sample_points.shape[-1])
+
+    if roi_padding is None:
+        roi = tuple(slice(0, size) for size in segmentation.shape)
+    else:
+        roi = _padded_bounding_box(sample_points, roi_padding, segmentation.shape)
+    roi_origin = np.array([roi_slice.start for roi_slice in roi])
+
+    distance_image = ndimage.distance_transform_edt(
+        segmentation[roi] > 0, sampling=spacing
+    )
+    radii = ndimage.map_coordinates(
+        distance_image, (sample_points - roi_origin).T, order=1, mode="nearest"
+    ).reshape(len(edges), n_samples)
+
+    for (*_, edge_data), edge_radii in zip(edges, radii, strict=True):
+        edge_data[EDGE_RADIUS_KEY] = edge_radii
+        edge_data[EDGE_RADIUS_MEAN_KEY] = float(edge_radii.mean())
+        edge_data[EDGE_RADIUS_MEDIAN_KEY] = float(np.median(edge_radii))
+        edge_data[EDGE_RADIUS_MIN_KEY] = float(edge_radii.min())
+        edge_data[EDGE_RADIUS_MAX_KEY] = float(edge_radii.max())
+    skeleton_graph.invalidate_fingerprint(edges=[tuple(edge[:-1]) for edge in edges])
+    return radii
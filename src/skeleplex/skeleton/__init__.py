@@ -1 +1,5 @@
 """Tools to create a skeleton image of a structure."""
+
+from skeleplex.skeleton.components import filter_skeleton_components
+
+__all__ = ["filter_skeleton_components"]
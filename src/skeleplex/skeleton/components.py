@@ -0,0 +1,60 @@
+"""Select connected components of a skeleton image."""
+
+import numpy as np
+from scipy import ndimage
+
+
+def filter_skeleton_components(
+    skeleton_image: np.ndarray,
+    n_largest: int | None = None,
+    min_size: int | None = None,
+    seed_voxel: tuple[int, ...] | None = None,
+) -> np.ndarray:
+    """Remove connected components from a skeleton image.
+
+    The components are found with full connectivity (26-connectivity
+    in 3D), which is the connectivity used to trace the skeleton branches.
+    All given criteria must be met for a component to be kept.
+
+    Parameters
+    ----------
+    skeleton_image : np.ndarray
+        The binary skeleton image.
+    n_largest : int | None
+        If given, only the n_largest components with the most voxels
+        are kept. Default value is None.
+    min_size : int | None
+        If given, only components with at least min_size voxels
+        are kept. Default value is None.
+    seed_voxel : tuple[int, ...] | None
+        If given, only the component containing this voxel is kept.
+        Default value is None.
+
+    Returns
+    -------
+    np.ndarray
+        The boolean skeleton image with only the kept components.
+    """
+    skeleton_image = np.asarray(skeleton_image)
+    structure = np.ones((3,) * skeleton_image.ndim, dtype=bool)
+    labels, n_components = ndimage.label(skeleton_image, structure=structure)
+
+    component_sizes = np.bincount(labels.ravel(), minlength=n_components + 1)
+    # label 0 is the background
+    component_sizes[0] = 0
+    keep_component = component_sizes > 0
+
+    if seed_voxel is not None:
+        seed_label = labels[tuple(seed_voxel)]
+        if seed_label == 0:
+            raise ValueError(f"The seed voxel {seed_voxel} is not in the skeleton.")
+        keep_component &= np.arange(n_components + 1) == seed_label
+    if min_size is not None:
+        keep_component &= component_sizes >= min_size
+    if n_largest is not None:
+        largest_components = np.argsort(-component_sizes, kind="stable")[:n_largest]
+        is_largest = np.zeros_like(keep_component)
+        is_largest[largest_components] = True
+        keep_component &= is_largest
+
+    return keep_component[labels]
@@ -0,0 +1,5 @@
+"""Tools to prepare skeleton graphs for visualization."""
+
+from skeleplex.visualize.polylines import EdgePolylines
+
+__all__ = ["EdgePolylines"]
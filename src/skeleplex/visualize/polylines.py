@@ -0,0 +1,199 @@
+"""Precomputed edge polylines for interactive visualization."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY
+from skeleplex.graph.spline import eval_splines
+
+if TYPE_CHECKING:
+    from skeleplex.graph.skeleton_graph import SkeletonGraph
+
+# default RGBA colors cycled over the edges
+DEFAULT_EDGE_COLORS = np.array(
+    [
+        [1.0, 0.0, 1.0, 1.0],  # magenta
+        [0.0, 1.0, 0.0, 1.0],  # green
+        [0.0, 0.0, 1.0, 1.0],  # blue
+        [1.0, 1.0, 0.0, 1.0],  # yellow
+        [0.5, 0.0, 0.5, 1.0],  # purple
+    ]
+)
+
+
+def _simplify_polylines(
+    points: np.ndarray, angle_tolerance: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select the polyline vertices for one level of detail.
+
+    A vertex is kept each time the cumulative turning angle along the
+    polyline passes a multiple of the angle tolerance, so strongly curved
+    regions keep more vertices than straight ones. The first and last
+    points of each polyline are always kept.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        (n_polylines, n_samples, d) array of densely sampled polylines.
+    angle_tolerance : float
+        The turning angle in radians between kept vertices.
+
+    Returns
+    -------
+    vertices : np.ndarray
+        (n_vertices, d) array of the kept vertices of all polylines.
+    offsets : np.ndarray
+        (n_polylines + 1,) array where the vertices of polyline i are
+        vertices[offsets[i]:offsets[i + 1]].
+    """
+    n_polylines, n_samples, _ = points.shape
+    segments = np.diff(points, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        directions = segments / np.linalg.norm(segments, axis=-1, keepdims=True)
+    cosine = np.sum(directions[:, 1:] * directions[:, :-1], axis=-1)
+    turning_angle = np.nan_to_num(np.arccos(np.clip(cosine, -1, 1)))
+
+    # the turning angle accumulated up to each interior sample
+    cumulative_angle = np.cumsum(turning_angle, axis=1)
+    angle_bins = np.floor(cumulative_angle / angle_tolerance)
+    keep_interior = np.diff(angle_bins, axis=1, prepend=0) > 0
+
+    keep = np.ones((n_polylines, n_samples), dtype=bool)
+    keep[:, 1:-1] = keep_interior
+    offsets = np.concatenate([[0], np.cumsum(np.count_nonzero(keep, axis=1))])
+    return points[keep], offsets
+
+
+class EdgePolylines:
+    """Polylines of all edges of a skeleton graph at several levels of detail.
+
+    All splines are evaluated once in a single batched pass when the object
+    is created. Each level of detail is then derived from those samples,
+    so switching levels never re-evaluates the splines. The polylines of
+    all edges are packed into a single vertex array per level.
+
+    Parameters
+    ----------
+    skeleton_graph : SkeletonGraph
+        The skeleton graph to draw.
+    angle_tolerances : tuple[float, ...]
+        The turning angle in degrees between polyline vertices for each
+        level of detail. Level 0 is the first (finest) level.
+        Default value is (2, 10, 45).
+    n_samples : int
+        The number of points each spline is sampled with before simplifying.
+        Default value is 64.
+    edge_colors : np.ndarray | None
+        (n_edges, 4) array of RGBA colors for each edge in the order of
+        the graph edges. If None, the colors are cycled from
+        DEFAULT_EDGE_COLORS. Default value is None.
+    """
+
+    def __init__(
+        self,
+        skeleton_graph: "SkeletonGraph",
+        angle_tolerances: tuple[float, ...] = (2, 10, 45),
+        n_samples: int = 64,
+        edge_colors: np.ndarray | None = None,
+    ):
+        graph = skeleton_graph.graph
+        if graph.is_multigraph():
+            edges = list(graph.edges(keys=True, data=True))
+        else:
+            edges = list(graph.edges(data=True))
+        self.edges = [tuple(edge) for *edge, _ in edges]
+
+        if edge_colors is None:
+            color_indices = np.arange(len(self.edges)) % len(DEFAULT_EDGE_COLORS)
+            edge_colors = DEFAULT_EDGE_COLORS[color_indices]
+        self.edge_colors = np.asarray(edge_colors, dtype=float)
+
+        splines = [edge_data[EDGE_SPLINE_KEY] for *_, edge_data in edges]
+        dense_points = eval_splines(splines, np.linspace(0, 1, n_samples))
+
+        self.angle_tolerances = tuple(angle_tolerances)
+        self._levels = [
+            _simplify_polylines(dense_points, np.deg2rad(angle_tolerance))
+            for angle_tolerance in self.angle_tolerances
+        ]
+
+    @property
+    def n_levels(self) -> int:
+        """Return the number of levels of detail."""
+        return len(self._levels)
+
+    def polylines(self, level: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """Return the packed polylines for a level of detail.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail. Default value is 0.
+
+        Returns
+        -------
+        vertices : np.ndarray
+            (n_vertices, d) array of the vertices of all polylines.
+        offsets : np.ndarray
+            (n_edges + 1,) array where the vertices of edge i are
+            vertices[offsets[i]:offsets[i + 1]].
+        """
+        return self._levels[level]
+
+    def shapes_data(self, level: int = 0) -> dict:
+        """Return the polylines as keyword arguments for a napari Shapes layer.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail. Default value is 0.
+
+        Returns
+        -------
+        dict
+            The data, shape_type, edge_color and features for
+            napari.Viewer.add_shapes. The edge_id feature is the index
+            of the edge in the edges attribute.
+        """
+        vertices, offsets = self.polylines(level)
+        return {
+            "data": np.split(vertices, offsets[1:-1]),
+            "shape_type": "path",
+            "edge_color": self.edge_colors,
+            "features": {"edge_id": np.arange(len(self.edges))},
+        }
+
+    def vectors_data(self, level: int = 0) -> dict:
+        """Return the polylines as keyword arguments for a napari Vectors layer.
+
+        Each polyline segment is one vector, so all edges are drawn from
+        a single (n_segments, 2, d) array.
+
+        Parameters
+        ----------
+        level : int
+            The level of detail. Default value is 0.
+
+        Returns
+        -------
+        dict
+            The data, edge_color and features for napari.Viewer.add_vectors.
+            The edge_id feature is the index of the edge in the edges attribute.
+        """
+        vertices, offsets = self.polylines(level)
+        # the last vertex of each polyline does not start a segment
+        is_segment_start = np.ones(len(vertices), dtype=bool)
+        is_segment_start[offsets[1:] - 1] = False
+        segment_starts = np.flatnonzero(is_segment_start)
+
+        vectors = np.stack(
+            [vertices[segment_starts], np.diff(vertices, axis=0)[segment_starts]],
+            axis=1,
+        )
+        edge_ids = np.repeat(np.arange(len(self.edges)), np.diff(offsets) - 1)
+        return {
+            "data": vectors,
+            "edge_color": self.edge_colors[edge_ids],
+            "features": {"edge_id": edge_ids},
+        }
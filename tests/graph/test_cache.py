@@ -0,0 +1,68 @@
+"""Tests for the skeleplex.graph.cache module."""
+
+import os
+
+import numpy as np
+
+import skeleplex.graph.skeleton_graph
+from skeleplex.data import simple_t
+from skeleplex.graph import SkeletonGraph, SkeletonGraphCache
+from skeleplex.graph.cache import skeleton_image_cache_key
+
+
+def _write_bytes(n_bytes: int):
+    """Return a function that writes n_bytes to a file."""
+
+    def write_function(file_path):
+        with open(file_path, "wb") as file:
+            file.write(b"0" * n_bytes)
+
+    return write_function
+
+
+def test_skeleton_image_cache_key():
+    """Test that the cache key depends on the image and parameters."""
+    image = simple_t()
+    key = skeleton_image_cache_key(image, max_spline_knots=10)
+    assert key == skeleton_image_cache_key(image.copy(), max_spline_knots=10)
+    assert key != skeleton_image_cache_key(image, max_spline_knots=5)
+
+    modified_image = image.copy()
+    modified_image[0, 0, 0] = True
+    assert key != skeleton_image_cache_key(modified_image, max_spline_knots=10)
+
+
+def test_cache_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted."""
+    cache = SkeletonGraphCache(tmp_path / "cache", max_size=250)
+    cache.put("a", _write_bytes(100))
+    cache.put("b", _write_bytes(100))
+
+    # make "a" the most recently used entry
+    os.utime(cache.get("b"), (0, 0))
+    assert cache.get("a") is not None
+
+    cache.put("c", _write_bytes(100))
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.size == 200
+    assert cache.get("b") is None
+
+
+def test_from_skeleton_image_cache(tmp_path, monkeypatch):
+    """Test that a cache hit loads the stored graph."""
+    cache = SkeletonGraphCache(tmp_path)
+    skeleton_graph = SkeletonGraph.from_skeleton_image(simple_t(), cache=cache)
+    assert cache.size > 0
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The graph should be loaded from the cache.")
+
+    monkeypatch.setattr(skeleplex.graph.skeleton_graph, "image_to_graph_skan", fail)
+    cached_skeleton_graph = SkeletonGraph.from_skeleton_image(simple_t(), cache=cache)
+    assert cached_skeleton_graph == skeleton_graph
+    np.testing.assert_allclose(
+        np.sort(cached_skeleton_graph.node_coordinates_array, axis=0),
+        np.sort(skeleton_graph.node_coordinates_array, axis=0),
+    )
@@ -1,10 +1,23 @@
 """ "Tests for the skeleplex.graph.image_to_graph module."""
 
 import networkx as nx
+import numpy as np
+import pytest
+from scipy.sparse import coo_array
+from skimage.morphology import skeletonize
 
 from skeleplex.data import simple_t
-from skeleplex.graph.constants import NODE_COORDINATE_KEY
-from skeleplex.graph.image_to_graph import image_to_graph_skan
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.image_to_graph import (
+    coordinates_to_graph,
+    image_to_graph_numba,
+    image_to_graph_skan,
+)
+from skeleplex.graph.skeleton_graph import SkeletonGraph
 
 
 def test_image_to_graph_skan():
@@ -20,3 +33,113 @@ def test_image_to_graph_skan():
 
     # make sure there is the correct number of edges
     assert graph.number_of_edges() == 3
+
+
+def test_image_to_graph_skan_float32():
+    """Test converting a skeleton image to a single precision graph."""
+    graph = image_to_graph_skan(skeleton_image=simple_t(), dtype=np.float32)
+
+    for _, node_coordinate in graph.nodes(data=NODE_COORDINATE_KEY):
+        assert node_coordinate.dtype == np.float32
+    for _, _, edge_data in graph.edges(data=True):
+        assert edge_data[EDGE_COORDINATES_KEY].dtype == np.float32
+        assert edge_data[EDGE_SPLINE_KEY].dtype == np.float32
+
+
+def test_coordinates_to_graph():
+    """Test that tracing the voxel coordinates matches the dense image."""
+    skeleton_image = simple_t()
+    expected_graph = image_to_graph_skan(skeleton_image=skeleton_image)
+
+    for skeleton in (np.argwhere(skeleton_image), coo_array(skeleton_image)):
+        graph = coordinates_to_graph(skeleton)
+        node_coordinates = {
+            tuple(coordinate) for _, coordinate in graph.nodes(data=NODE_COORDINATE_KEY)
+        }
+        expected_node_coordinates = {
+            tuple(coordinate)
+            for _, coordinate in expected_graph.nodes(data=NODE_COORDINATE_KEY)
+        }
+        assert node_coordinates == expected_node_coordinates
+        for start_node, end_node, path in graph.edges(data=EDGE_COORDINATES_KEY):
+            # the paths run from the start node to the end node
+            np.testing.assert_array_equal(
+                path[0], graph.nodes[start_node][NODE_COORDINATE_KEY]
+            )
+            np.testing.assert_array_equal(
+                path[-1], graph.nodes[end_node][NODE_COORDINATE_KEY]
+            )
+            assert len(path) == 6
+
+
+def test_coordinates_to_graph_loop():
+    """Test that a closed loop without junctions becomes a self-loop edge."""
+    angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+    coordinates = np.stack(
+        [np.full_like(angles, 10), 10 + 8 * np.cos(angles), 10 + 8 * np.sin(angles)],
+        axis=1,
+    )
+    skeleton_image = np.zeros((21, 21, 21), dtype=bool)
+    skeleton_image[tuple(np.round(coordinates).astype(int).T)] = True
+    skeleton_image = skeletonize(skeleton_image)
+
+    graph = coordinates_to_graph(np.argwhere(skeleton_image))
+    assert graph.number_of_nodes() == 1
+    assert graph.number_of_edges() == 1
+    ((_, _, path),) = graph.edges(data=EDGE_COORDINATES_KEY)
+    assert len(path) == np.count_nonzero(skeleton_image) + 1
+
+
+def test_image_to_graph_numba():
+    """Test that the numba backend matches the skan backend."""
+    skeleton_image = simple_t()
+    expected_graph = image_to_graph_skan(skeleton_image=skeleton_image)
+    graph = image_to_graph_numba(skeleton_image=skeleton_image, dtype=np.float32)
+
+    node_coordinates = {
+        tuple(coordinate) for _, coordinate in graph.nodes(data=NODE_COORDINATE_KEY)
+    }
+    expected_node_coordinates = {
+        tuple(coordinate)
+        for _, coordinate in expected_graph.nodes(data=NODE_COORDINATE_KEY)
+    }
+    assert node_coordinates == expected_node_coordinates
+    assert graph.number_of_edges() == expected_graph.number_of_edges()
+    for _, _, edge_data in graph.edges(data=True):
+        assert edge_data[EDGE_SPLINE_KEY].dtype == np.float32
+
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image, backend="numba")
+    assert skeleton_graph.graph.number_of_edges() == 3
+    with pytest.raises(ValueError):
+        SkeletonGraph.from_skeleton_image(skeleton_image, backend="unknown")
+
+
+def test_skeleton_graph_component_filtering():
+    """Test converting only the component of a seed voxel to a graph."""
+    skeleton_image = simple_t()
+    debris_voxel = (2, 2, 2)
+    skeleton_image[2, 2, 2:8] = 1
+    skeleton_graph = SkeletonGraph.from_skeleton_image(
+        skeleton_image, seed_voxel=(10, 10, 10), backend="numba"
+    )
+    assert skeleton_graph.graph.number_of_edges() == 3
+
+    skeleton_graph = SkeletonGraph.from_skeleton_image(
+        skeleton_image, n_largest_components=2
+    )
+    node_coordinates = [
+        tuple(coordinate)
+        for _, coordinate in skeleton_graph.graph.nodes(data=NODE_COORDINATE_KEY)
+    ]
+    assert debris_voxel in node_coordinates
+
+    # both backends reject filters that remove the whole skeleton
+    for backend in ("skan", "numba"):
+        with pytest.raises(ValueError, match="No skeleton component"):
+            SkeletonGraph.from_skeleton_image(
+                skeleton_image, min_component_size=1000, backend=backend
+            )
+        with pytest.raises(ValueError, match="No skeleton component"):
+            SkeletonGraph.from_skeleton_image(
+                skeleton_image, n_largest_components=0, backend=backend
+            )
@@ -0,0 +1,65 @@
+"""Tests for the skeleplex.graph.matching module."""
+
+import networkx as nx
+import numpy as np
+
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.matching import match_skeleton_graphs
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+from skeleplex.graph.spline import B3Spline
+
+
+def _make_parallel_edges(n_edges: int, offset: np.ndarray) -> SkeletonGraph:
+    """Make a graph of straight edges along the last axis spaced 10 apart."""
+    graph = nx.MultiGraph()
+    for edge_index in range(n_edges):
+        path = np.zeros((6, 3))
+        path[:, 0] = 10 * edge_index
+        path[:, 2] = 2 * np.arange(6)
+        path += offset
+        start_node, end_node = 2 * edge_index, 2 * edge_index + 1
+        graph.add_node(start_node, **{NODE_COORDINATE_KEY: path[0]})
+        graph.add_node(end_node, **{NODE_COORDINATE_KEY: path[-1]})
+        graph.add_edge(
+            start_node,
+            end_node,
+            **{
+                EDGE_COORDINATES_KEY: path,
+                EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4),
+            },
+        )
+    return SkeletonGraph(graph=graph)
+
+
+def test_match_skeleton_graphs():
+    """Test matching a graph to a shifted copy with a missing edge."""
+    reference = _make_parallel_edges(6, offset=np.zeros(3))
+    target = _make_parallel_edges(6, offset=np.array([0, 1, 0]))
+    target.graph.remove_nodes_from([10, 11])
+
+    node_matches, edge_matches = match_skeleton_graphs(
+        reference, target, max_distance=2
+    )
+    np.testing.assert_array_equal(
+        node_matches["target_node"], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, -1, -1]
+    )
+    np.testing.assert_allclose(node_matches["distance"][:10], 1)
+
+    np.testing.assert_array_equal(
+        edge_matches["target_start_node"], [0, 2, 4, 6, 8, -1]
+    )
+    np.testing.assert_allclose(edge_matches["overlap"], [1, 1, 1, 1, 1, 0])
+    np.testing.assert_allclose(edge_matches["matched_overlap"][:5], 1)
+    np.testing.assert_allclose(edge_matches["mean_distance"][:5], 1, atol=1e-6)
+    assert np.isnan(edge_matches["mean_distance"][5])
+
+    # matching the reference edges in parallel batches gives the same result
+    _, parallel_edge_matches = match_skeleton_graphs(
+        reference, target, max_distance=2, batch_size=2, n_workers=2
+    )
+    for name in edge_matches.dtype.names:
+        np.testing.assert_array_equal(parallel_edge_matches[name], edge_matches[name])
@@ -0,0 +1,39 @@
+"""Tests for the skeleplex.graph.sample module."""
+
+import numpy as np
+
+from skeleplex.graph.sample import (
+    generate_2d_grid,
+    generate_3d_grid,
+    sample_volume_at_coordinates,
+)
+
+
+def test_generate_grids_dtype():
+    """Test generating sampling grids with a given precision."""
+    grid_3d = generate_3d_grid(grid_shape=(2, 3, 4), dtype=np.float32)
+    assert grid_3d.shape == (2, 3, 4, 3)
+    assert grid_3d.dtype == np.float32
+
+    grid_2d = generate_2d_grid(grid_shape=(3, 3), grid_spacing=(2, 2))
+    assert grid_2d.shape == (3, 3, 3)
+    assert grid_2d.dtype == np.float64
+    np.testing.assert_array_equal(grid_2d[..., 0], 0)
+    np.testing.assert_array_equal(grid_2d[:, 0, 1], [-2, 0, 2])
+
+
+def test_sample_volume_at_coordinates_batch_order():
+    """Test that each batch of coordinates samples its own grid."""
+    volume = np.zeros((10, 10, 10), dtype=np.float32)
+    volume[:] = np.arange(10)[:, np.newaxis, np.newaxis]
+
+    # two 2x2 grids at different positions along the first axis
+    grid = generate_2d_grid(grid_shape=(2, 2))
+    coordinates = np.stack([grid + np.array([2, 5, 5]), grid + np.array([7, 5, 5])])
+    samples = sample_volume_at_coordinates(
+        volume, coordinates, interpolation_order=1, dtype=np.float64
+    )
+    assert samples.shape == (2, 2, 2)
+    assert samples.dtype == np.float64
+    np.testing.assert_allclose(samples[0], 2)
+    np.testing.assert_allclose(samples[1], 7)
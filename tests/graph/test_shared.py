@@ -0,0 +1,42 @@
+"""Tests for the skeleplex.graph.shared module."""
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from skeleplex.data import simple_t
+from skeleplex.graph import SharedSkeletonGraph, SkeletonGraph
+from skeleplex.graph.constants import EDGE_SPLINE_KEY
+
+
+def _sum_control_points(shared_graph: SharedSkeletonGraph) -> float:
+    """Attach to a shared graph in a worker and sum its control points."""
+    skeleton_graph = shared_graph.attach()
+    return sum(
+        float(spline.model.control_points.sum())
+        for *_, spline in skeleton_graph.graph.edges(data=EDGE_SPLINE_KEY)
+    )
+
+
+def test_shared_skeleton_graph():
+    """Test attaching to a skeleton graph in shared memory."""
+    skeleton_graph = SkeletonGraph.from_skeleton_image(simple_t())
+    expected_sum = sum(
+        float(spline.model.control_points.sum())
+        for *_, spline in skeleton_graph.graph.edges(data=EDGE_SPLINE_KEY)
+    )
+
+    with SharedSkeletonGraph.create(skeleton_graph) as shared_graph:
+        # the handle is small compared to the graph
+        assert len(pickle.dumps(shared_graph)) < len(pickle.dumps(skeleton_graph.graph))
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            worker_sum = executor.submit(_sum_control_points, shared_graph).result()
+        np.testing.assert_allclose(worker_sum, expected_sum)
+
+        attached_graph = pickle.loads(pickle.dumps(shared_graph)).attach()
+        assert attached_graph.fingerprint() == skeleton_graph.fingerprint()
+        coordinate = next(iter(attached_graph.node_coordinates.values()))
+        assert not coordinate.flags.writeable
+        del attached_graph, coordinate
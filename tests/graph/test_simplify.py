@@ -0,0 +1,109 @@
+"""Tests for the skeleplex.graph.simplify module."""
+
+import networkx as nx
+import numpy as np
+from skan.csr import Skeleton as SkanSkeleton
+
+from skeleplex.data import simple_t
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.image_to_graph import image_to_graph_skan
+from skeleplex.graph.simplify import merge_degree_2_nodes, path_lengths, prune_spurs
+
+
+def test_path_lengths():
+    """Test computing the lengths of many paths at once."""
+    paths = [
+        np.array([[0, 0, 0], [0, 0, 1], [0, 0, 3]]),
+        np.array([[5, 5, 5]]),
+        np.array([[0, 0, 0], [3, 4, 0]]),
+    ]
+    np.testing.assert_allclose(path_lengths(paths), [3, 0, 5])
+
+
+def test_merge_degree_2_nodes():
+    """Test merging a chain of edges with inconsistent path orientations."""
+    node_coordinates = {
+        0: np.array([0, 0, 0]),
+        1: np.array([0, 0, 2]),
+        2: np.array([0, 0, 4]),
+        3: np.array([0, 0, 6]),
+    }
+    graph = nx.MultiGraph()
+    graph.add_edge(
+        0, 1, **{EDGE_COORDINATES_KEY: np.array([[0, 0, z] for z in (0, 1, 2)])}
+    )
+    # the path of this edge runs from node 2 to node 1
+    graph.add_edge(
+        1, 2, **{EDGE_COORDINATES_KEY: np.array([[0, 0, z] for z in (4, 3, 2)])}
+    )
+    graph.add_edge(
+        3, 2, **{EDGE_COORDINATES_KEY: np.array([[0, 0, z] for z in (6, 5, 4)])}
+    )
+    nx.set_node_attributes(graph, node_coordinates, NODE_COORDINATE_KEY)
+
+    merge_degree_2_nodes(graph)
+
+    assert set(graph.nodes) == {0, 3}
+    assert graph.number_of_edges() == 1
+    (path,) = (data for *_, data in graph.edges(data=EDGE_COORDINATES_KEY))
+    if path[0, 2] != 0:
+        path = path[::-1]
+    np.testing.assert_array_equal(path[:, 2], np.arange(7))
+
+
+def test_prune_spurs_keeps_longest_child():
+    """Test that a branch ending in several short spurs keeps the longest."""
+    node_coordinates = {
+        0: np.array([0, 0, 0]),
+        1: np.array([0, 0, 10]),
+        2: np.array([0, 1, 11]),
+        3: np.array([0, -2, 12]),
+        4: np.array([1, 0, 0]),
+        5: np.array([-2, 0, 0]),
+        6: np.array([0, 0, -10]),
+    }
+    graph = nx.MultiGraph()
+    for u, v in [(6, 0), (4, 0), (5, 0), (0, 1), (1, 2), (1, 3)]:
+        path = np.linspace(node_coordinates[u], node_coordinates[v], 3)
+        graph.add_edge(u, v, **{EDGE_COORDINATES_KEY: path})
+    nx.set_node_attributes(graph, node_coordinates, NODE_COORDINATE_KEY)
+
+    prune_spurs(graph, min_length=5)
+
+    # both spurs at node 0 are removed as node 0 keeps two edges,
+    # but only the shorter child at node 1 is removed
+    assert set(graph.nodes) == {0, 1, 3, 6}
+    assert set(graph.edges()) == {(6, 0), (0, 1), (1, 3)}
+
+
+def test_simplify_image_spur():
+    """Test removing a short spur and merging the left over degree 2 node."""
+    skeleton_image = simple_t()
+    skeleton_image[10, 9, 8] = True
+    skeleton_image[10, 8, 8] = True
+
+    # skan splits the left branch at the spur
+    assert SkanSkeleton(skeleton_image).n_paths == 5
+
+    graph = image_to_graph_skan(
+        skeleton_image, min_spur_length=2.5, merge_degree_2_nodes=True
+    )
+    node_coordinates = {
+        tuple(coordinate) for _, coordinate in graph.nodes(data=NODE_COORDINATE_KEY)
+    }
+    assert node_coordinates == {(10, 10, 5), (10, 10, 10), (10, 10, 15), (10, 15, 10)}
+    assert graph.number_of_edges() == 3
+    for _, _, edge_data in graph.edges(data=True):
+        path = edge_data[EDGE_COORDINATES_KEY]
+        assert len(path) == 6
+        np.testing.assert_allclose(path_lengths([path]), 5)
+        # the splines are fit after simplifying
+        np.testing.assert_allclose(
+            edge_data[EDGE_SPLINE_KEY].eval(np.array([0.0, 1.0])),
+            path[[0, -1]],
+            atol=0.5,
+        )
@@ -1,17 +1,22 @@
 """Tests for the SkeletonGraph class."""
 
+import pickle
+
 import networkx as nx
 import numpy as np
+import pytest
 
 from skeleplex.graph.constants import (
     EDGE_COORDINATES_KEY,
     EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
 )
 from skeleplex.graph.skeleton_graph import (
     SkeletonGraph,
     get_next_node_key,
     orient_splines,
 )
+from skeleplex.graph.spline import B3Spline
 
 
 def test_skeleton_graph_equality(simple_t_skeleton_graph):
@@ -98,3 +103,313 @@ def test_skeleton_graph_orient_splines(simple_t_with_flipped_spline):
     np.testing.assert_allclose(
         oriented_edge_coordinates, correct_spline_coordinates, atol=0.5
     )
+
+
+def test_skeleton_graph_fingerprint(simple_t_skeleton_graph, tmp_path):
+    """Test the content hash of a SkeletonGraph."""
+    fingerprint = simple_t_skeleton_graph.fingerprint()
+    assert fingerprint == simple_t_skeleton_graph.fingerprint()
+
+    # the fingerprint survives a round trip through a file
+    file_path = tmp_path / "test.json"
+    simple_t_skeleton_graph.to_json_file(file_path)
+    new_skeleton_graph = SkeletonGraph.from_json_file(file_path)
+    assert new_skeleton_graph.fingerprint() == fingerprint
+
+    # adding a node is detected without invalidating
+    new_skeleton_graph.graph.add_node(9000)
+    assert new_skeleton_graph.fingerprint() != fingerprint
+
+    # re-adding an edge with a different path is detected without invalidating
+    graph = simple_t_skeleton_graph.graph
+    edge_data = dict(graph.edges[0, 1])
+    graph.remove_edge(0, 1)
+    graph.add_edge(0, 1, **edge_data)
+    assert simple_t_skeleton_graph.fingerprint() == fingerprint
+    graph.remove_edge(0, 1)
+    edge_data[EDGE_COORDINATES_KEY] = edge_data[EDGE_COORDINATES_KEY] + 1
+    graph.add_edge(0, 1, **edge_data)
+    modified_fingerprint = simple_t_skeleton_graph.fingerprint()
+    assert modified_fingerprint != fingerprint
+
+    # so is re-adding a node with the same id
+    node_data = dict(graph.nodes[0])
+    node_edges = list(graph.edges(0, data=True))
+    graph.remove_node(0)
+    node_data[NODE_COORDINATE_KEY] = node_data[NODE_COORDINATE_KEY] + 1
+    graph.add_node(0, **node_data)
+    graph.add_edges_from(node_edges)
+    assert simple_t_skeleton_graph.fingerprint() != modified_fingerprint
+    modified_fingerprint = simple_t_skeleton_graph.fingerprint()
+
+    # modifying an attribute in place requires invalidating the edge
+    graph.edges[0, 1][EDGE_COORDINATES_KEY][0, 0] += 1
+    simple_t_skeleton_graph.invalidate_fingerprint(edges=[(0, 1)])
+    assert simple_t_skeleton_graph.fingerprint() != modified_fingerprint
+
+
+def test_skeleton_graph_compact_json(simple_t_skeleton_graph, tmp_path):
+    """Test writing and reading a SkeletonGraph in the compact format."""
+    default_path = tmp_path / "default.json"
+    compact_path = tmp_path / "compact.json"
+    simple_t_skeleton_graph.to_json_file(default_path)
+    simple_t_skeleton_graph.to_json_file(compact_path, compact=True)
+    assert compact_path.stat().st_size < default_path.stat().st_size
+
+    compact_skeleton_graph = SkeletonGraph.from_json_file(compact_path)
+    assert compact_skeleton_graph == simple_t_skeleton_graph
+    assert compact_skeleton_graph.fingerprint() == simple_t_skeleton_graph.fingerprint()
+
+    # arrays are restored with their dtype
+    original_path = simple_t_skeleton_graph.graph.edges[0, 1][EDGE_COORDINATES_KEY]
+    loaded_path = compact_skeleton_graph.graph.edges[0, 1][EDGE_COORDINATES_KEY]
+    assert isinstance(loaded_path, np.ndarray)
+    assert loaded_path.dtype == original_path.dtype
+    np.testing.assert_array_equal(loaded_path, original_path)
+    assert (
+        compact_skeleton_graph.graph.edges[0, 1][EDGE_SPLINE_KEY]
+        == simple_t_skeleton_graph.graph.edges[0, 1][EDGE_SPLINE_KEY]
+    )
+
+
+def _make_line_of_edges(n_edges: int) -> SkeletonGraph:
+    """Make a graph of disjoint straight edges placed along the first axis."""
+    graph = nx.MultiGraph()
+    for edge_index in range(n_edges):
+        path = np.zeros((6, 3))
+        path[:, 0] = 10 * edge_index
+        path[:, 2] = np.arange(6)
+        start_node, end_node = 2 * edge_index, 2 * edge_index + 1
+        graph.add_node(start_node, **{NODE_COORDINATE_KEY: path[0]})
+        graph.add_node(end_node, **{NODE_COORDINATE_KEY: path[-1]})
+        graph.add_edge(
+            start_node,
+            end_node,
+            **{
+                EDGE_COORDINATES_KEY: path,
+                EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4),
+                "label": edge_index,
+            },
+        )
+    return SkeletonGraph(graph=graph)
+
+
+def test_skeleton_graph_hdf5_round_trip(tmp_path):
+    """Test writing and reading the whole graph in the HDF5 format."""
+    skeleton_graph = _make_line_of_edges(10)
+    file_path = tmp_path / "graph.h5"
+    skeleton_graph.to_file(file_path, block_size=4)
+
+    loaded_graph = SkeletonGraph.from_file(file_path)
+    assert loaded_graph.fingerprint() == skeleton_graph.fingerprint()
+
+
+def test_skeleton_graph_hdf5_bbox(tmp_path):
+    """Test reading only the edges that intersect a region."""
+    skeleton_graph = _make_line_of_edges(20)
+    file_path = tmp_path / "graph.h5"
+    skeleton_graph.to_file(file_path, block_size=4)
+
+    loaded_graph = SkeletonGraph.from_file(
+        file_path, bbox=np.array([[25, -1, -1], [45, 1, 10]])
+    )
+    assert set(loaded_graph.nodes) == {6, 7, 8, 9}
+    assert {label for *_, label in loaded_graph.graph.edges(data="label")} == {3, 4}
+    for _, _, edge_data in loaded_graph.graph.edges(data=True):
+        np.testing.assert_allclose(
+            edge_data[EDGE_SPLINE_KEY].eval(np.array([0.0, 1.0])),
+            edge_data[EDGE_COORDINATES_KEY][[0, -1]],
+            atol=1e-6,
+        )
+
+
+def test_skeleton_graph_tree_metrics():
+    """Test computing and caching the tree-order metrics."""
+    node_coordinates = {
+        0: [0, 0, 0],
+        1: [10, 0, 0],
+        2: [15, 0, 0],
+        3: [10, 5, 0],
+        4: [10, 10, 0],
+        5: [15, 5, 0],
+    }
+    graph = nx.DiGraph()
+    for node, coordinate in node_coordinates.items():
+        graph.add_node(node, **{NODE_COORDINATE_KEY: np.array(coordinate, dtype=float)})
+    for start_node, end_node in [(0, 1), (1, 2), (1, 3), (3, 4), (3, 5)]:
+        path = np.linspace(node_coordinates[start_node], node_coordinates[end_node], 6)
+        graph.add_edge(
+            start_node,
+            end_node,
+            **{
+                EDGE_COORDINATES_KEY: path,
+                EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4),
+            },
+        )
+    skeleton_graph = SkeletonGraph(graph=graph)
+    skeleton_graph.compute_tree_metrics()
+
+    assert dict(graph.nodes(data="generation")) == {0: 0, 1: 1, 2: 2, 3: 2, 4: 3, 5: 3}
+    assert dict(graph.nodes(data="strahler_order")) == {
+        0: 2,
+        1: 2,
+        2: 1,
+        3: 2,
+        4: 1,
+        5: 1,
+    }
+    assert dict(graph.nodes(data="subtree_size")) == {
+        0: 6,
+        1: 5,
+        2: 1,
+        3: 3,
+        4: 1,
+        5: 1,
+    }
+    np.testing.assert_allclose(graph.nodes[4]["path_length"], 20)
+    assert graph.edges[0, 1]["generation"] == 0
+    assert graph.edges[1, 3]["subtree_size"] == 3
+    np.testing.assert_allclose(graph.edges[1, 3]["path_length"], 15)
+
+    # rewiring an edge keeps the number of nodes and edges,
+    # but the metrics are recomputed
+    graph.remove_edge(3, 5)
+    path = np.linspace([15, 0, 0], [15, 5, 0], 6)
+    graph.add_edge(
+        2,
+        5,
+        **{
+            EDGE_COORDINATES_KEY: path,
+            EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4),
+        },
+    )
+    skeleton_graph.compute_tree_metrics()
+    assert graph.nodes[3]["subtree_size"] == 2
+    assert graph.nodes[2]["subtree_size"] == 2
+    np.testing.assert_allclose(graph.nodes[5]["path_length"], 20)
+
+    path = np.linspace([15, 0, 0], [20, 0, 0], 6)
+    graph.add_edge(
+        2,
+        6,
+        **{
+            EDGE_COORDINATES_KEY: path,
+            EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4),
+        },
+    )
+    graph.nodes[6][NODE_COORDINATE_KEY] = path[-1]
+    skeleton_graph.compute_tree_metrics()
+    assert graph.nodes[4]["generation"] == 3
+    assert graph.nodes[6]["generation"] == 3
+
+
+def test_skeleton_graph_pickle_out_of_band():
+    """Test pickling a graph with out-of-band buffers."""
+    skeleton_graph = _make_line_of_edges(50)
+    buffers = []
+    data = pickle.dumps(skeleton_graph, protocol=5, buffer_callback=buffers.append)
+
+    # the arrays of all edges are packed into a few buffers
+    assert len(buffers) < skeleton_graph.graph.number_of_edges()
+    loaded_graph = pickle.loads(data, buffers=buffers)
+    assert loaded_graph.fingerprint() == skeleton_graph.fingerprint()
+
+
+def test_skeleton_graph_pickle_attributes():
+    """Test that pickling keeps the types of the attributes."""
+    skeleton_graph = _make_line_of_edges(2)
+    graph = skeleton_graph.graph
+    graph.graph["shape"] = (10, 20, 30)
+    graph.nodes[0]["labels"] = {1: "a", 2: "b"}
+    graph.edges[0, 1, 0]["radius_mean"] = np.float32(1.5)
+
+    loaded_graph = pickle.loads(pickle.dumps(skeleton_graph, protocol=5)).graph
+    assert loaded_graph.graph["shape"] == (10, 20, 30)
+    assert loaded_graph.nodes[0]["labels"] == {1: "a", 2: "b"}
+    radius = loaded_graph.edges[0, 1, 0]["radius_mean"]
+    assert isinstance(radius, np.float32)
+    assert radius == np.float32(1.5)
+    assert loaded_graph.edges[0, 1, 0]["label"] == graph.edges[0, 1, 0]["label"]
+
+    # graphs that cannot be packed are pickled with the default method
+    skeleton_graph = SkeletonGraph(graph=nx.MultiGraph([(0, 1)]))
+    loaded_graph = pickle.loads(pickle.dumps(skeleton_graph)).graph
+    assert list(loaded_graph.edges(keys=True)) == [(0, 1, 0)]
+
+
+def test_skeleton_graph_split_edge():
+    """Test splitting an edge by inserting a node."""
+    skeleton_graph = _make_line_of_edges(2)
+    graph = skeleton_graph.graph
+
+    # the spline of the second edge runs from the end node to the start node
+    edge_data = graph.edges[2, 3, 0]
+    edge_data[EDGE_SPLINE_KEY] = B3Spline.from_points(
+        edge_data[EDGE_COORDINATES_KEY][::-1], n_knots=4
+    )
+    fingerprint = skeleton_graph.fingerprint()
+
+    new_node = skeleton_graph.split_edge((2, 3, 0), 0.2)
+    assert new_node == 4
+    assert not graph.has_edge(2, 3)
+    np.testing.assert_allclose(
+        graph.nodes[new_node][NODE_COORDINATE_KEY], [10, 0, 1], atol=5e-2
+    )
+    for start_node, end_node in ((2, new_node), (new_node, 3)):
+        edge_data = graph.edges[start_node, end_node, 0]
+        path = edge_data[EDGE_COORDINATES_KEY]
+        spline_ends = edge_data[EDGE_SPLINE_KEY].eval(np.array([0.0, 1.0]))
+        node_coordinates = [
+            graph.nodes[start_node][NODE_COORDINATE_KEY],
+            graph.nodes[end_node][NODE_COORDINATE_KEY],
+        ]
+        # both pieces keep the orientation of the original spline
+        np.testing.assert_allclose(spline_ends[::-1], node_coordinates, atol=5e-2)
+        np.testing.assert_allclose(path[[0, -1]], node_coordinates, atol=1)
+    assert skeleton_graph.fingerprint() != fingerprint
+
+    # the key can be omitted if there is only one edge between the nodes
+    new_node = skeleton_graph.split_edge((0, 1), 0.5)
+    assert not graph.has_edge(0, 1)
+    # the other attributes are copied to both new edges
+    assert graph.edges[0, new_node, 0]["label"] == 0
+    assert graph.edges[new_node, 1, 0]["label"] == 0
+    graph.add_edge(0, new_node)
+    with pytest.raises(ValueError, match="Give the key"):
+        skeleton_graph.split_edge((0, new_node), 0.5)
+    with pytest.raises(ValueError, match="not in the graph"):
+        skeleton_graph.split_edge((0, 1), 0.5)
+
+
+def test_skeleton_graph_memory_usage():
+    """Test the memory usage report of a skeleton graph."""
+    skeleton_graph = _make_line_of_edges(10)
+    usage = skeleton_graph.memory_usage()
+
+    # 6 x 3 float64 path and 6 x 3 control points per edge
+    assert usage["edge_paths"] == 10 * 6 * 3 * 8
+    assert usage["splines"] == 10 * 6 * 3 * 8
+    assert usage["node_coordinates"] == 20 * 3 * 8
+    assert usage["cached"] < 1000
+    assert usage["per_edge"].shape == (10,)
+    assert usage["total"] == sum(
+        value for name, value in usage.items() if name not in ("total", "per_edge")
+    )
+
+    # the deep usage includes the Python objects and the spline internals
+    deep_usage = skeleton_graph.memory_usage(deep=True)
+    assert deep_usage["splines"] > usage["splines"]
+    assert deep_usage["total"] > usage["total"]
+
+    skeleton_graph.fingerprint()
+    assert skeleton_graph.memory_usage()["cached"] > usage["cached"]
+
+    # an array shared between attributes is counted once in the deep usage
+    shared_array = np.zeros(1000)
+    skeleton_graph.graph.edges[0, 1, 0]["profile"] = shared_array
+    deep_edge_attributes = skeleton_graph.memory_usage(deep=True)["edge_attributes"]
+    skeleton_graph.graph.edges[2, 3, 0]["profile"] = shared_array
+    assert (
+        skeleton_graph.memory_usage(deep=True)["edge_attributes"]
+        == deep_edge_attributes
+    )
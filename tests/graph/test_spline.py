@@ -1,6 +1,6 @@
 import numpy as np
 
-from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.spline import B3Spline, fit_b3_splines
 
 
 def test_uniform_sampling(simple_spline):
@@ -13,6 +13,20 @@ def test_uniform_sampling(simple_spline):
     np.testing.assert_allclose(spline_points, expected_points, atol=1e-6)
 
 
+def test_single_position(simple_spline):
+    """Test evaluating a spline at a scalar and a length-1 array position."""
+    assert simple_spline.eval(0.5).shape == (3,)
+    np.testing.assert_allclose(simple_spline.eval(0.5), [0.5, 0, 0], atol=1e-6)
+    assert simple_spline.eval(np.array([0.5])).shape == (1, 3)
+    np.testing.assert_allclose(
+        simple_spline.eval(np.array([0.5]))[0], simple_spline.eval(0.5)
+    )
+
+    frames = simple_spline.moving_frame(np.array([0.2, 0.5]))
+    assert simple_spline.moving_frame(0.2).shape == (3, 3)
+    np.testing.assert_allclose(simple_spline.moving_frame(np.array([0.2])), frames[:1])
+
+
 def test_spline_equality(simple_spline):
     """Test spline equality."""
     # create a new spline that is the same as the original
@@ -65,3 +79,116 @@ def test_spline_flipping(simple_spline):
     )
     # test if the coordinates are flipped
     np.testing.assert_allclose(eval_points[::-1], flipped_coords, atol=1e-2)
+
+
+def test_spline_fingerprint(simple_spline, tmp_path):
+    """Test the content hash of a spline."""
+    fingerprint = simple_spline.fingerprint()
+    assert fingerprint == B3Spline(model=simple_spline.model.copy()).fingerprint()
+
+    # the fingerprint survives a round trip through a file
+    file_path = tmp_path / "spline.json"
+    simple_spline.to_json_file(file_path)
+    assert B3Spline.from_json_file(file_path).fingerprint() == fingerprint
+
+    # changing the control points changes the fingerprint
+    shifted_model = simple_spline.model.copy()
+    shifted_model.control_points = shifted_model.control_points + 1
+    assert B3Spline(model=shifted_model).fingerprint() != fingerprint
+
+
+def test_spline_compact_serialization(simple_spline, tmp_path):
+    """Test spline serialization in the compact format."""
+    file_path = tmp_path / "spline.json"
+    simple_spline.to_json_file(file_path, compact=True)
+
+    reloaded_spline = B3Spline.from_json_file(file_path)
+    assert simple_spline == reloaded_spline
+
+
+def test_sample_volume_2d():
+    """Test sampling planes normal to the spline."""
+    # the value of each voxel is its position along the first axis
+    volume = np.zeros((40, 40, 40), dtype=np.float32)
+    volume[:] = np.arange(40)[:, np.newaxis, np.newaxis]
+
+    # spline along the first axis, so the planes are normal to it
+    spline = B3Spline.from_points(np.linspace([5, 20, 20], [35, 20, 20], 30))
+    positions = np.array([0, 0.5, 1])
+    samples = spline.sample_volume_2d(
+        volume,
+        positions,
+        grid_shape=(3, 3),
+        grid_spacing=(2, 2),
+        sample_interpolation_order=1,
+    )
+    assert samples.shape == (3, 3, 3)
+    for plane, expected_value in zip(samples, [5, 20, 35], strict=True):
+        np.testing.assert_allclose(plane, expected_value, atol=1e-3)
+
+
+def test_spline_float32(tmp_path):
+    """Test that single precision splines evaluate and save as float32."""
+    points = np.linspace([0, 0, 0], [10, 0, 0], 10, dtype=np.float32)
+    spline = B3Spline.from_points(points)
+    assert spline.dtype == np.float32
+    assert spline.eval(np.linspace(0, 1, 5)).dtype == np.float32
+    assert spline.moving_frame(np.linspace(0, 1, 5)).dtype == np.float32
+
+    file_path = tmp_path / "spline.json"
+    spline.to_json_file(file_path)
+    assert B3Spline.from_json_file(file_path).dtype == np.float32
+
+
+def test_spline_split_and_subsegment():
+    """Test cutting a spline without refitting."""
+    angles = np.linspace(0, np.pi, 30)
+    points = np.column_stack((10 * np.cos(angles), 10 * np.sin(angles), angles))
+    spline = B3Spline.from_points(points, n_knots=8)
+    atol = 1e-2
+
+    before, after = spline.split(0.3, atol=atol)
+    spline_ends = spline.eval(np.array([0.0, 1.0]))
+    before_ends = before.eval(np.array([0.0, 1.0]))
+    after_ends = after.eval(np.array([0.0, 1.0]))
+    np.testing.assert_allclose(before_ends[0], spline_ends[0], atol=1e-5)
+    np.testing.assert_allclose(after_ends[1], spline_ends[1], atol=1e-5)
+    np.testing.assert_allclose(before_ends[1], after_ends[0], atol=1e-5)
+    np.testing.assert_allclose(
+        before.arc_length + after.arc_length, spline.arc_length, rtol=1e-6
+    )
+
+    # the cut point lies on the original curve close to the requested position
+    cut_arc_length = before.arc_length / spline.arc_length
+    assert abs(cut_arc_length - 0.3) <= atol
+
+    piece = spline.subsegment(0.2, 0.7, atol=atol)
+    piece_ends = piece.eval(np.array([0.0, 1.0]))
+    spline_points = spline.eval(np.linspace(0, 1, 1001))
+    distances = np.linalg.norm(spline_points[:, None] - piece_ends[None], axis=2)
+    np.testing.assert_allclose(distances.min(axis=0), 0, atol=5e-2)
+    np.testing.assert_allclose(piece.arc_length / spline.arc_length, 0.5, atol=2 * atol)
+
+
+def test_fit_b3_splines():
+    """Test that batched fitting matches fitting each spline on its own."""
+    rng = np.random.default_rng(42)
+    points_list = [
+        np.cumsum(rng.normal(size=(n_points, 3)), axis=0)
+        for n_points in (6, 6, 12, 12, 20, 8)
+    ]
+    n_knots = [5, 4, 10, 10, 10, 7]
+    splines = fit_b3_splines(points_list, n_knots=n_knots, dtype=np.float32)
+
+    for points, spline_n_knots, spline in zip(
+        points_list, n_knots, splines, strict=True
+    ):
+        expected_spline = B3Spline.from_points(
+            points, n_knots=spline_n_knots, dtype=np.float32
+        )
+        assert spline.dtype == np.float32
+        np.testing.assert_allclose(
+            spline.model.control_points,
+            expected_spline.model.control_points,
+            rtol=1e-6,
+        )
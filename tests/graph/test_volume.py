@@ -0,0 +1,124 @@
+"""Tests for the skeleplex.graph.volume module."""
+
+import h5py
+import numpy as np
+
+from skeleplex.graph.sample import sample_volume_at_coordinates
+from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.volume import ChunkedVolumeReader
+
+
+def _make_volume_file(file_path) -> np.ndarray:
+    """Write a random volume to a chunked and compressed HDF5 dataset."""
+    volume = np.random.default_rng(0).random((60, 50, 40)).astype(np.float32)
+    with h5py.File(file_path, "w") as file:
+        file.create_dataset(
+            "volume", data=volume, chunks=(16, 16, 16), compression="gzip"
+        )
+    return volume
+
+
+def test_chunked_volume_reader_sample(tmp_path):
+    """Test that sampling through the reader matches sampling the whole volume."""
+    file_path = tmp_path / "volume.h5"
+    volume = _make_volume_file(file_path)
+    spline = B3Spline.from_points(np.linspace([5, 5, 5], [55, 45, 35], 20), n_knots=5)
+    positions = np.linspace(0, 1, 10)
+
+    with (
+        h5py.File(file_path, "r") as file,
+        ChunkedVolumeReader(file["volume"], max_cached_chunks=8) as reader,
+    ):
+        assert reader.chunk_shape == (16, 16, 16)
+        for interpolation_order in (1, 3):
+            expected_samples = spline.sample_volume_2d(
+                volume,
+                positions,
+                grid_shape=(12, 12),
+                sample_interpolation_order=interpolation_order,
+            )
+            samples = spline.sample_volume_2d(
+                reader,
+                positions,
+                grid_shape=(12, 12),
+                sample_interpolation_order=interpolation_order,
+            )
+            # the grids reach outside of the volume
+            assert np.any(np.isnan(expected_samples))
+            np.testing.assert_allclose(samples, expected_samples, atol=1e-6)
+        assert len(reader._chunks) <= 8
+
+
+def test_chunked_volume_reader_iter_sample(tmp_path):
+    """Test sampling a sequence of coordinate batches with prefetching."""
+    file_path = tmp_path / "volume.h5"
+    volume = _make_volume_file(file_path)
+    rng = np.random.default_rng(1)
+    coordinate_batches = [rng.uniform(0, 39, size=(4, 5, 3)) for _ in range(6)]
+
+    with (
+        h5py.File(file_path, "r") as file,
+        ChunkedVolumeReader(file["volume"]) as reader,
+    ):
+        samples = list(
+            reader.iter_sample(
+                iter(coordinate_batches), interpolation_order=1, prefetch_depth=2
+            )
+        )
+    assert len(samples) == len(coordinate_batches)
+    for batch_samples, coordinates in zip(samples, coordinate_batches, strict=True):
+        np.testing.assert_array_equal(
+            batch_samples,
+            sample_volume_at_coordinates(volume, coordinates, interpolation_order=1),
+        )
+
+
+class _CountingVolume:
+    """Wrap a volume and count the reads."""
+
+    def __init__(self, volume: np.ndarray):
+        self.volume = volume
+        self.shape = volume.shape
+        self.dtype = volume.dtype
+        self.n_reads = 0
+
+    def __getitem__(self, slices):
+        self.n_reads += 1
+        return self.volume[slices]
+
+
+def test_chunked_volume_reader_iter_sample_small_cache():
+    """Test that prefetching with a small cache does not read chunks twice."""
+    volume = np.random.default_rng(0).random((64, 64, 64)).astype(np.float32)
+    rng = np.random.default_rng(1)
+    coordinate_batches = [rng.uniform(0, 63, size=(20, 1, 3)) for _ in range(10)]
+
+    reads = {}
+    for max_cached_chunks in (1000, 16):
+        counting_volume = _CountingVolume(volume)
+        with ChunkedVolumeReader(
+            counting_volume,
+            chunk_shape=(16, 16, 16),
+            max_cached_chunks=max_cached_chunks,
+        ) as reader:
+            samples = list(
+                reader.iter_sample(coordinate_batches, interpolation_order=1)
+            )
+            n_batch_chunks = [
+                len(reader._planned_chunks(coordinates, interpolation_order=1))
+                for coordinates in coordinate_batches
+            ]
+            assert len(reader._pinned_chunks) == 0
+        reads[max_cached_chunks] = counting_volume.n_reads
+        for batch_samples, coordinates in zip(samples, coordinate_batches, strict=True):
+            np.testing.assert_array_equal(
+                batch_samples,
+                sample_volume_at_coordinates(
+                    volume, coordinates, interpolation_order=1
+                ),
+            )
+
+    # the large cache reads each chunk once
+    assert reads[1000] <= 64
+    # with the small cache, each chunk is read at most once per batch
+    assert reads[16] <= sum(n_batch_chunks)
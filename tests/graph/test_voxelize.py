@@ -0,0 +1,75 @@
+"""Tests for the skeleplex.graph.voxelize module."""
+
+import h5py
+import networkx as nx
+import numpy as np
+import pytest
+
+from skeleplex.data import simple_t
+from skeleplex.graph import SkeletonGraph
+from skeleplex.graph.constants import EDGE_SPLINE_KEY, NODE_COORDINATE_KEY
+from skeleplex.graph.spline import B3Spline
+from skeleplex.graph.voxelize import voxelize_skeleton_graph
+
+
+def test_voxelize_skeleton_graph():
+    """Test voxelizing the splines of the simple T skeleton."""
+    skeleton_image = simple_t()
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image)
+
+    label_image = np.zeros(skeleton_image.shape, dtype=np.uint16)
+    edges = voxelize_skeleton_graph(skeleton_graph, label_image)
+
+    assert len(edges) == 3
+    np.testing.assert_array_equal(label_image > 0, skeleton_image > 0)
+    assert set(np.unique(label_image)) == {0, 1, 2, 3}
+
+    # the labels can only be written into an integer volume
+    with pytest.raises(ValueError, match="integer type"):
+        voxelize_skeleton_graph(skeleton_graph, label_image.astype(np.float32))
+
+
+def test_voxelize_skeleton_graph_tiled_hdf5(tmp_path):
+    """Test that writing tiles into an HDF5 dataset matches an in-memory array."""
+    skeleton_image = simple_t()
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image)
+
+    expected_image = np.zeros(skeleton_image.shape, dtype=np.uint16)
+    voxelize_skeleton_graph(skeleton_graph, expected_image, radius=1.5)
+
+    with h5py.File(tmp_path / "labels.h5", "w") as file:
+        dataset = file.create_dataset(
+            "labels", shape=skeleton_image.shape, dtype=np.uint16, chunks=(4, 4, 4)
+        )
+        voxelize_skeleton_graph(
+            skeleton_graph, dataset, radius=1.5, tile_shape=(4, 4, 4)
+        )
+        np.testing.assert_array_equal(dataset[()], expected_image)
+
+    # the radius dilates the edges
+    assert np.count_nonzero(expected_image) > np.count_nonzero(skeleton_image)
+
+
+def test_voxelize_skeleton_graph_label_range():
+    """Test that the labels may use the whole range of the output dtype."""
+    graph = nx.MultiGraph()
+    for edge_index in range(255):
+        x, y = edge_index % 15, edge_index // 15
+        path = np.linspace([x, y, 0], [x, y, 5], 6)
+        graph.add_node(2 * edge_index, **{NODE_COORDINATE_KEY: path[0]})
+        graph.add_node(2 * edge_index + 1, **{NODE_COORDINATE_KEY: path[-1]})
+        graph.add_edge(
+            2 * edge_index,
+            2 * edge_index + 1,
+            **{EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=4)},
+        )
+    skeleton_graph = SkeletonGraph(graph=graph)
+
+    label_image = np.zeros((16, 18, 8), dtype=np.uint8)
+    edges = voxelize_skeleton_graph(skeleton_graph, label_image)
+    assert len(edges) == 255
+    assert label_image.max() == 255
+
+    skeleton_graph.graph.add_edge(0, 1, **graph.edges[0, 1, 0])
+    with pytest.raises(ValueError, match="cannot hold 256 edge labels"):
+        voxelize_skeleton_graph(skeleton_graph, label_image)
@@ -0,0 +1,50 @@
+"""Tests for the skeleplex.measure.cross_section module."""
+
+import numpy as np
+from scipy.ndimage import binary_dilation
+from skimage.morphology import ball
+
+from skeleplex.graph import ChunkedVolumeReader, SkeletonGraph
+from skeleplex.measure import profile_cross_sections
+
+
+def test_profile_cross_sections():
+    """Test measuring the cross-sections of a straight tube."""
+    skeleton_image = np.zeros((20, 20, 60), dtype=bool)
+    skeleton_image[10, 10, 5:55] = True
+    volume = binary_dilation(skeleton_image, structure=ball(4)).astype(np.float32)
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image)
+
+    profiles = profile_cross_sections(
+        skeleton_graph, volume, threshold=0.5, n_positions=5, batch_size=2
+    )
+    assert profiles.shape == (1, 5)
+    np.testing.assert_allclose(profiles["position"], [[0.1, 0.3, 0.5, 0.7, 0.9]])
+    # the cross-section of the tube is a digital disk of radius 4
+    np.testing.assert_allclose(profiles["area"], 49)
+    np.testing.assert_allclose(profiles["max_intensity"], 1)
+    np.testing.assert_allclose(profiles["centroid_offset"], 0, atol=1e-6)
+    assert np.all(profiles["mean_intensity"] < 1)
+
+    # sampling through a chunked reader gives the same measurements
+    with ChunkedVolumeReader(volume, chunk_shape=(16, 16, 16)) as reader:
+        chunked_profiles = profile_cross_sections(
+            skeleton_graph, reader, threshold=0.5, n_positions=5
+        )
+    for name in profiles.dtype.names:
+        np.testing.assert_allclose(chunked_profiles[name], profiles[name])
+
+
+def test_profile_cross_sections_single_position():
+    """Test measuring one cross-section per edge."""
+    skeleton_image = np.zeros((20, 20, 60), dtype=bool)
+    skeleton_image[10, 10, 5:55] = True
+    volume = binary_dilation(skeleton_image, structure=ball(4)).astype(np.float32)
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image)
+
+    profiles = profile_cross_sections(
+        skeleton_graph, volume, threshold=0.5, n_positions=1
+    )
+    assert profiles.shape == (1, 1)
+    np.testing.assert_allclose(profiles["position"], 0.5)
+    np.testing.assert_allclose(profiles["area"], 49)
@@ -0,0 +1,92 @@
+"""Tests for the skeleplex.measure.morphometrics module."""
+
+import networkx as nx
+import numpy as np
+
+from skeleplex.graph.constants import (
+    EDGE_COORDINATES_KEY,
+    EDGE_SPLINE_KEY,
+    NODE_COORDINATE_KEY,
+)
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+from skeleplex.graph.spline import B3Spline, eval_splines
+from skeleplex.measure import (
+    compute_edge_morphometrics,
+    spline_curvatures,
+    spline_lengths,
+)
+
+
+def test_eval_splines_matches_spline_eval():
+    """Test batched evaluation against evaluating each spline."""
+    rng = np.random.default_rng(42)
+    splines = [
+        B3Spline.from_points(rng.random((20, 3)), n_knots=n_knots)
+        for n_knots in [4, 6, 4, 8]
+    ]
+    positions = np.linspace(0, 1, 7)
+    values = eval_splines(splines, positions)
+
+    for spline, spline_values in zip(splines, values, strict=True):
+        t = positions * (spline.model.M - 1)
+        np.testing.assert_allclose(spline_values, spline.model.eval(t))
+
+
+def test_spline_lengths_and_curvatures():
+    """Test the batched length and curvature of a circular arc."""
+    radius = 10
+    angles = np.linspace(0, np.pi / 2, 50)
+    arc_points = np.column_stack(
+        [radius * np.cos(angles), radius * np.sin(angles), np.zeros_like(angles)]
+    )
+    arc = B3Spline.from_points(arc_points, n_knots=8)
+    line = B3Spline.from_points(np.linspace([0, 0, 0], [5, 0, 0], 10), n_knots=4)
+
+    lengths = spline_lengths([arc, line])
+    np.testing.assert_allclose(lengths, [arc.arc_length, line.arc_length], rtol=1e-4)
+
+    mean_curvature, max_curvature = spline_curvatures([arc, line])
+    np.testing.assert_allclose(mean_curvature[0], 1 / radius, rtol=1e-2)
+    np.testing.assert_allclose(mean_curvature[1], 0, atol=1e-6)
+    assert max_curvature[0] >= mean_curvature[0]
+
+
+def test_compute_edge_morphometrics():
+    """Test the morphometrics of a directed T graph."""
+    node_coordinates = {
+        0: np.array([10, 0, 0]),
+        1: np.array([10, 10, 0]),
+        2: np.array([0, 10, 0]),
+        3: np.array([20, 10, 0]),
+    }
+    graph = nx.DiGraph()
+    for node, coordinate in node_coordinates.items():
+        graph.add_node(node, **{NODE_COORDINATE_KEY: coordinate})
+    for u, v in [(0, 1), (1, 2), (1, 3)]:
+        path = np.linspace(node_coordinates[u], node_coordinates[v], 20)
+        graph.add_edge(
+            u,
+            v,
+            **{
+                EDGE_COORDINATES_KEY: path,
+                EDGE_SPLINE_KEY: B3Spline.from_points(path, n_knots=5),
+            },
+        )
+
+    table = compute_edge_morphometrics(
+        SkeletonGraph(graph=graph), batch_size=2, n_workers=2
+    )
+
+    assert len(table) == 3
+    np.testing.assert_allclose(table["length"], 10, rtol=1e-4)
+    np.testing.assert_allclose(table["chord_length"], 10)
+    np.testing.assert_allclose(table["tortuosity"], 1, rtol=1e-4)
+    np.testing.assert_allclose(table["max_curvature"], 0, atol=1e-6)
+
+    # the root edge has no parent
+    angles = {
+        (row["start_node"], row["end_node"]): row["branch_angle"] for row in table
+    }
+    assert np.isnan(angles[(0, 1)])
+    np.testing.assert_allclose(angles[(1, 2)], np.pi / 2, atol=1e-3)
+    np.testing.assert_allclose(angles[(1, 3)], np.pi / 2, atol=1e-3)
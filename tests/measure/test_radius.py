@@ -0,0 +1,31 @@
+"""Tests for the skeleplex.measure.radius module."""
+
+import numpy as np
+from scipy.ndimage import binary_dilation
+from skimage.morphology import ball
+
+from skeleplex.graph import SkeletonGraph
+from skeleplex.graph.constants import EDGE_RADIUS_KEY, EDGE_RADIUS_MEDIAN_KEY
+from skeleplex.measure import compute_edge_radii
+
+
+def test_compute_edge_radii():
+    """Test estimating the radius of a straight tube."""
+    skeleton_image = np.zeros((20, 20, 60), dtype=bool)
+    skeleton_image[10, 10, 5:55] = True
+    segmentation = binary_dilation(skeleton_image, structure=ball(4))
+    skeleton_graph = SkeletonGraph.from_skeleton_image(skeleton_image)
+
+    radii = compute_edge_radii(skeleton_graph, segmentation, n_samples=16)
+    assert radii.shape == (1, 16)
+
+    # the nearest background voxel in the cross-section is at (1, 4)
+    ((_, _, edge_data),) = skeleton_graph.graph.edges(data=True)
+    assert edge_data[EDGE_RADIUS_KEY].shape == (16,)
+    np.testing.assert_allclose(edge_data[EDGE_RADIUS_MEDIAN_KEY], np.sqrt(17))
+
+    # restricting the distance transform to the padded ROI does not change it
+    full_radii = compute_edge_radii(
+        skeleton_graph, segmentation, n_samples=16, roi_padding=None
+    )
+    np.testing.assert_allclose(radii, full_radii)
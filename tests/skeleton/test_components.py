@@ -0,0 +1,37 @@
+"""Tests for the skeleplex.skeleton.components module."""
+
+import numpy as np
+import pytest
+
+from skeleplex.skeleton import filter_skeleton_components
+
+
+def _make_skeleton_with_debris() -> np.ndarray:
+    """Make a skeleton image of three disjoint lines of different lengths."""
+    skeleton_image = np.zeros((20, 20, 20), dtype=bool)
+    skeleton_image[2:18, 5, 5] = True
+    # a diagonal line is a single 26-connected component
+    skeleton_image[np.arange(8), np.arange(8) + 10, 15] = True
+    skeleton_image[15, 15, 10:13] = True
+    return skeleton_image
+
+
+def test_filter_skeleton_components():
+    """Test keeping components by size, rank and seed voxel."""
+    skeleton_image = _make_skeleton_with_debris()
+
+    largest = filter_skeleton_components(skeleton_image, n_largest=1)
+    assert largest.sum() == 16
+    assert largest[10, 5, 5]
+
+    large = filter_skeleton_components(skeleton_image, min_size=5)
+    assert large.sum() == 16 + 8
+
+    seeded = filter_skeleton_components(skeleton_image, seed_voxel=(15, 15, 11))
+    assert seeded.sum() == 3
+    assert not filter_skeleton_components(
+        skeleton_image, min_size=5, seed_voxel=(15, 15, 11)
+    ).any()
+
+    with pytest.raises(ValueError):
+        filter_skeleton_components(skeleton_image, seed_voxel=(0, 0, 0))
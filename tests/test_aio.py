@@ -0,0 +1,69 @@
+"""Tests for the skeleplex asyncio API."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from skeleplex.aio import AsyncExecutor
+from skeleplex.data import simple_t
+
+
+def test_async_executor_graph_io(tmp_path):
+    """Test building, writing and reading a graph from asyncio code."""
+
+    async def convert_and_round_trip():
+        async with AsyncExecutor(max_concurrency=2) as executor:
+            skeleton_graph = await executor.from_skeleton_image(simple_t())
+            file_path = tmp_path / "graph.json"
+            await executor.to_json_file(skeleton_graph, file_path, compact=True)
+            loaded_graph = await executor.from_json_file(file_path)
+            spline = next(iter(skeleton_graph.edge_splines.values()))
+            samples = await executor.sample_volume_2d(
+                spline,
+                simple_t().astype(float),
+                np.linspace(0, 1, 3),
+                grid_shape=(5, 5),
+            )
+        return skeleton_graph, loaded_graph, samples
+
+    skeleton_graph, loaded_graph, samples = asyncio.run(convert_and_round_trip())
+    assert loaded_graph.fingerprint() == skeleton_graph.fingerprint()
+    assert samples.shape == (3, 5, 5)
+
+
+def test_async_executor_concurrency_and_cancellation():
+    """Test that the number of running jobs is bounded and jobs can be cancelled."""
+    lock = threading.Lock()
+    n_running = 0
+    max_running = 0
+    n_finished = 0
+
+    def job():
+        nonlocal n_running, max_running, n_finished
+        with lock:
+            n_running += 1
+            max_running = max(max_running, n_running)
+        time.sleep(0.05)
+        with lock:
+            n_running -= 1
+            n_finished += 1
+
+    async def run_jobs():
+        async with AsyncExecutor(max_concurrency=2) as executor:
+            await asyncio.gather(*(executor.run(job) for _ in range(6)))
+
+            # cancel jobs waiting for a slot
+            tasks = [asyncio.create_task(executor.run(job)) for _ in range(6)]
+            await asyncio.sleep(0.01)
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    results = asyncio.run(run_jobs())
+    assert max_running == 2
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    # only the jobs that were already running finished
+    assert n_finished == 6 + 2
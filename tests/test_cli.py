@@ -0,0 +1,85 @@
+"""Tests for the skeleplex command line interface."""
+
+import csv
+
+import h5py
+import numpy as np
+import pytest
+
+from skeleplex.cli import _limit_memory, main, parse_memory_size
+from skeleplex.data import simple_t
+from skeleplex.graph import SkeletonGraph
+
+
+def test_parse_memory_size():
+    """Test parsing memory sizes with units."""
+    assert parse_memory_size("1024") == 1024
+    assert parse_memory_size("2K") == 2048
+    assert parse_memory_size("1.5G") == int(1.5 * 1024**3)
+    assert parse_memory_size("512mb") == 512 * 1024**2
+
+
+def test_convert_command(tmp_path, capsys):
+    """Test converting a directory of skeleton images."""
+    input_directory = tmp_path / "input"
+    input_directory.mkdir()
+    np.save(input_directory / "sample_0.npy", simple_t())
+    with h5py.File(input_directory / "sample_1.h5", "w") as file:
+        file.create_dataset("skeleton", data=simple_t())
+
+    output_directory = tmp_path / "output"
+    summary_path = tmp_path / "summary.csv"
+    exit_code = main(
+        [
+            "convert",
+            str(input_directory),
+            "-o",
+            str(output_directory),
+            "--workers",
+            "2",
+            "--summary",
+            str(summary_path),
+        ]
+    )
+    assert exit_code == 0
+    for name in ["sample_0", "sample_1"]:
+        skeleton_graph = SkeletonGraph.from_json_file(output_directory / f"{name}.json")
+        assert skeleton_graph.graph.number_of_edges() == 3
+
+    with open(summary_path) as file:
+        summaries = list(csv.DictReader(file))
+    assert [summary["status"] for summary in summaries] == ["converted"] * 2
+    assert all(float(summary["total_seconds"]) > 0 for summary in summaries)
+
+    # finished outputs are skipped when resuming
+    capsys.readouterr()
+    exit_code = main(["convert", str(input_directory), "-o", str(output_directory)])
+    assert exit_code == 0
+    assert capsys.readouterr().out.count("skipped") == 2
+
+
+def test_convert_command_output_collision(tmp_path, capsys):
+    """Test that inputs with the same output file are rejected."""
+    input_directory = tmp_path / "input"
+    input_directory.mkdir()
+    np.save(input_directory / "sample.npy", simple_t())
+    with h5py.File(input_directory / "sample.h5", "w") as file:
+        file.create_dataset("skeleton", data=simple_t())
+
+    output_directory = tmp_path / "output"
+    exit_code = main(["convert", str(input_directory), "-o", str(output_directory)])
+    assert exit_code == 2
+    assert "same output file" in capsys.readouterr().err
+    assert not output_directory.exists()
+
+
+def test_limit_memory_failure(caplog, monkeypatch):
+    """Test that a memory limit that cannot be set is logged."""
+    resource = pytest.importorskip("resource")
+
+    def _raise_value_error(*args):
+        raise ValueError("not allowed to raise maximum limit")
+
+    monkeypatch.setattr(resource, "setrlimit", _raise_value_error)
+    _limit_memory(1024)
+    assert "Failed to limit the memory" in caplog.text
@@ -0,0 +1,73 @@
+"""Tests for the skeleplex.visualize.polylines module."""
+
+import networkx as nx
+import numpy as np
+
+from skeleplex.graph.constants import EDGE_SPLINE_KEY, NODE_COORDINATE_KEY
+from skeleplex.graph.skeleton_graph import SkeletonGraph
+from skeleplex.graph.spline import B3Spline
+from skeleplex.visualize import EdgePolylines
+
+
+def _line_and_arc_graph() -> SkeletonGraph:
+    """Return a graph with a straight edge and a curved edge."""
+    angles = np.linspace(0, np.pi, 50)
+    arc_points = np.column_stack(
+        [10 * np.cos(angles), 10 * np.sin(angles), np.zeros_like(angles)]
+    )
+    line_points = np.linspace([10, 0, 0], [30, 0, 0], 20)
+
+    graph = nx.Graph()
+    graph.add_node(0, **{NODE_COORDINATE_KEY: np.array([-10, 0, 0])})
+    graph.add_node(1, **{NODE_COORDINATE_KEY: np.array([10, 0, 0])})
+    graph.add_node(2, **{NODE_COORDINATE_KEY: np.array([30, 0, 0])})
+    graph.add_edge(
+        1, 0, **{EDGE_SPLINE_KEY: B3Spline.from_points(arc_points, n_knots=8)}
+    )
+    graph.add_edge(
+        1, 2, **{EDGE_SPLINE_KEY: B3Spline.from_points(line_points, n_knots=5)}
+    )
+    return SkeletonGraph(graph=graph)
+
+
+def test_edge_polylines_levels_of_detail():
+    """Test that the polylines adapt to the curvature at each level."""
+    edge_polylines = EdgePolylines(_line_and_arc_graph(), angle_tolerances=(5, 45))
+    assert edge_polylines.n_levels == 2
+
+    fine_vertices, fine_offsets = edge_polylines.polylines(level=0)
+    _, coarse_offsets = edge_polylines.polylines(level=1)
+    fine_counts = np.diff(fine_offsets)
+    coarse_counts = np.diff(coarse_offsets)
+
+    # the straight edge only needs its end points
+    assert fine_counts[1] == 2
+    assert coarse_counts[1] == 2
+    # the arc is refined at the finer level
+    assert fine_counts[0] > coarse_counts[0] > 2
+
+    # the end points of the polylines are the end points of the splines
+    np.testing.assert_allclose(fine_vertices[fine_offsets[1]], [10, 0, 0], atol=0.1)
+    np.testing.assert_allclose(fine_vertices[-1], [30, 0, 0], atol=0.1)
+
+
+def test_edge_polylines_layer_data():
+    """Test the batched shapes and vectors layer data."""
+    edge_polylines = EdgePolylines(_line_and_arc_graph())
+    vertices, _ = edge_polylines.polylines(level=0)
+
+    shapes_data = edge_polylines.shapes_data(level=0)
+    assert len(shapes_data["data"]) == 2
+    assert len(shapes_data["edge_color"]) == 2
+    np.testing.assert_array_equal(shapes_data["features"]["edge_id"], [0, 1])
+
+    vectors_data = edge_polylines.vectors_data(level=0)
+    n_segments = len(vertices) - 2
+    assert vectors_data["data"].shape == (n_segments, 2, 3)
+    assert len(vectors_data["edge_color"]) == n_segments
+
+    # the vectors of the straight edge go from start to end
+    straight_vectors = vectors_data["data"][vectors_data["features"]["edge_id"] == 1]
+    np.testing.assert_allclose(
+        straight_vectors[0, 0] + straight_vectors[0, 1], [30, 0, 0], atol=0.1
+    )